@@ -1,11 +1,352 @@
-import aiomysql
+import json
 import os
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional, Tuple
 from dotenv import load_dotenv
 
+from utils.cache import TTLCache
+from utils.migrations import Migration, MigrationRunner
+from utils.ban_search import build_token_query, index_rows, normalize_ban_number, tokenize
+from utils.storage import MySQLBackend, SQLiteBackend
+from utils.metrics import instrument_pool
+
 load_dotenv()
 
+# Columns for list views (history, recent bans, search). `transcript` is TEXT and
+# only needed on the single-record detail view, so list queries never pull it.
+LIST_COLUMNS = (
+    'id', 'ban_number', 'player_name', 'buid', 'offense', 'strike', 'sanction',
+    'submitted_by', 'timestamp', 'is_unban', 'related_ban_id', 'strike_removed'
+)
+DETAIL_COLUMNS = LIST_COLUMNS + ('transcript',)
+LIST_COLUMNS_SQL = ', '.join(LIST_COLUMNS)
+DETAIL_COLUMNS_SQL = ', '.join(DETAIL_COLUMNS)
+
+
+class BanRecord:
+    """One ban_history row. Built straight from a cursor tuple in LIST/DETAIL column order.
+    
+    `timestamp` stays a datetime; the string forms are only produced when a view
+    actually renders them.
+    """
+    __slots__ = LIST_COLUMNS + ('transcript',)
+
+    def __init__(self, id, ban_number, player_name, buid, offense, strike, sanction,
+                 submitted_by, timestamp, is_unban, related_ban_id, strike_removed, transcript=None):
+        self.id = id
+        self.ban_number = ban_number
+        self.player_name = player_name
+        self.buid = buid
+        self.offense = offense or ''
+        self.strike = strike or ''
+        self.sanction = sanction or ''
+        self.submitted_by = submitted_by or ''
+        self.timestamp: Optional[datetime] = timestamp
+        self.is_unban = bool(is_unban)
+        self.related_ban_id = related_ban_id
+        self.strike_removed = bool(strike_removed)
+        self.transcript = transcript or ''
+
+    @classmethod
+    def from_row(cls, row: tuple, with_transcript: bool = False) -> 'BanRecord':
+        # Slicing drops any extra computed columns that follow the projection
+        return cls(*row[:len(DETAIL_COLUMNS if with_transcript else LIST_COLUMNS)])
+
+    @property
+    def date(self) -> str:
+        """YYYY-MM-DD, as shown in lists"""
+        return self.timestamp.strftime('%Y-%m-%d') if self.timestamp else ''
+
+    @property
+    def iso_timestamp(self) -> str:
+        return self.timestamp.isoformat() if self.timestamp else ''
+
+    def to_dict(self) -> Dict:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data['timestamp'] = self.iso_timestamp
+        return data
+
+
+# ban_rollups key for a ban_history row. Offense is cut to 100 characters so
+# the composite primary key stays within InnoDB's key length limit. Written
+# with CASE/SUBSTR so the same expression runs on both storage backends.
+ROLLUP_KEY_SQL = "DATE(timestamp), CASE WHEN is_unban THEN 'unban' ELSE 'ban' END, SUBSTR(offense, 1, 100), submitted_by"
+
+
+async def backfill_rollups(cursor):
+    """Rebuild ban_rollups from ban_history in one grouped pass (run it inside a transaction)"""
+    await cursor.execute("DELETE FROM ban_rollups")
+    await cursor.execute(f"""
+        INSERT INTO ban_rollups (day, action, offense, moderator, records, strikes_removed)
+        SELECT {ROLLUP_KEY_SQL}, COUNT(*), SUM(strike_removed = TRUE)
+        FROM ban_history
+        GROUP BY {ROLLUP_KEY_SQL}
+    """)
+
+
+async def backfill_search_tokens(cursor, batch_size: int = 5000):
+    """Tokenize every existing ban into ban_search_tokens, walking ban_history by id"""
+    last_id = 0
+    while True:
+        await cursor.execute(
+            "SELECT id, player_name, offense FROM ban_history WHERE id > %s ORDER BY id LIMIT %s",
+            (last_id, batch_size)
+        )
+        rows = await cursor.fetchall()
+        if not rows:
+            return
+        token_rows = [token_row for ban_id, name, offense in rows for token_row in index_rows(ban_id, name, offense)]
+        if token_rows:
+            await cursor.executemany(
+                "INSERT IGNORE INTO ban_search_tokens (token, ban_id, field) VALUES (%s, %s, %s)", token_rows
+            )
+        last_id = rows[-1][0]
+
+
+# Which ban_history rows count as an active strike (same rule as get_player_strikes)
+ACTIVE_STRIKE_SQL = "(is_unban = FALSE AND strike_removed = FALSE AND strike != 'Custom' AND strike != 'UNBAN')"
+
+# player_summary row(s) recomputed from ban_history; the latest name is one
+# index dive into idx_buid_timestamp per player
+PLAYER_SUMMARY_SELECT_SQL = f"""
+    SELECT buid,
+           (SELECT h2.player_name FROM ban_history h2 WHERE h2.buid = h.buid
+            ORDER BY h2.timestamp DESC, h2.id DESC LIMIT 1),
+           SUM(is_unban = FALSE), SUM({ACTIVE_STRIKE_SQL}),
+           MAX(CASE WHEN is_unban = FALSE THEN timestamp END)
+    FROM ban_history h
+"""
+PLAYER_SUMMARY_UPSERT_SQL = """
+    ON DUPLICATE KEY UPDATE player_name = VALUES(player_name), total_bans = VALUES(total_bans),
+        active_strikes = VALUES(active_strikes), last_ban_at = VALUES(last_ban_at)
+"""
+
+
+async def backfill_player_summary(cursor):
+    """Rebuild player_summary from ban_history in one grouped pass"""
+    await cursor.execute(f"""
+        INSERT INTO player_summary (buid, player_name, total_bans, active_strikes, last_ban_at)
+        {PLAYER_SUMMARY_SELECT_SQL}
+        WHERE TRUE  -- SQLite needs a WHERE before an upsert on INSERT ... SELECT
+        GROUP BY buid
+        {PLAYER_SUMMARY_UPSERT_SQL}
+    """)
+
+
+# Schema history. Append new versions at the end; never edit one that has shipped.
+BAN_HISTORY_MIGRATIONS = [
+    Migration(1, "baseline tables", [
+        """
+        CREATE TABLE IF NOT EXISTS ban_history (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            ban_number VARCHAR(20) UNIQUE NOT NULL,
+            player_name VARCHAR(255) NOT NULL,
+            buid VARCHAR(50) NOT NULL,
+            offense TEXT NOT NULL,
+            strike VARCHAR(50) NOT NULL,
+            sanction TEXT NOT NULL,
+            transcript TEXT,
+            submitted_by VARCHAR(50) NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_unban BOOLEAN DEFAULT FALSE,
+            related_ban_id INT,
+            strike_removed BOOLEAN DEFAULT FALSE,
+            INDEX idx_buid (buid),
+            INDEX idx_ban_number (ban_number),
+            INDEX idx_timestamp (timestamp),
+            INDEX idx_is_unban (is_unban),
+            INDEX idx_strike_removed (strike_removed)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """,
+        # One row per number series ('ban' -> 0042, 'unban' -> UNBAN-0001).
+        # add_ban claims the next value in the same transaction as its INSERT.
+        """
+        CREATE TABLE IF NOT EXISTS ban_counters (
+            name VARCHAR(20) PRIMARY KEY,
+            value INT UNSIGNED NOT NULL DEFAULT 0
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """,
+        # Ban/unban requests waiting in the moderation channel. ban_data holds the
+        # submitted form as JSON so Approve/Deny work across restarts.
+        """
+        CREATE TABLE IF NOT EXISTS pending_ban_requests (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            player_name VARCHAR(255) NOT NULL,
+            buid VARCHAR(50) NOT NULL,
+            ban_data TEXT NOT NULL,
+            submitted_by VARCHAR(50) NOT NULL,
+            channel_id BIGINT UNSIGNED,
+            message_id BIGINT UNSIGNED,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resolved_by VARCHAR(50),
+            resolved_at TIMESTAMP NULL,
+            result_ban_number VARCHAR(20),
+            INDEX idx_status_created (status, created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """,
+    ]),
+    # Per-player reads filter on buid and then sort by timestamp (history pages)
+    # or on the strike flags (strike counts). The composite indexes answer both
+    # from the index alone; the single-column ones they replace are prefixes
+    # (idx_buid), duplicates of the UNIQUE key (idx_ban_number) or too coarse
+    # to be chosen (idx_is_unban, idx_strike_removed).
+    Migration(2, "composite player indexes", [
+        "ALTER TABLE ban_history ADD INDEX idx_buid_timestamp (buid, timestamp, id)",
+        "ALTER TABLE ban_history ADD INDEX idx_buid_strikes (buid, is_unban, strike_removed, strike)",
+        "ALTER TABLE ban_history ADD INDEX idx_unban_timestamp (is_unban, timestamp)",
+        "ALTER TABLE ban_history DROP INDEX idx_buid",
+        "ALTER TABLE ban_history DROP INDEX idx_ban_number",
+        "ALTER TABLE ban_history DROP INDEX idx_is_unban",
+        "ALTER TABLE ban_history DROP INDEX idx_strike_removed",
+    ]),
+    # Numeric form of ban_number, so "highest number so far" is an index dive
+    # instead of MAX(CAST(...)) over every row. The REGEXP guards keep strict
+    # mode from rejecting the backfill on any hand-edited, non-numeric numbers.
+    Migration(3, "numeric ban_seq column", [
+        "ALTER TABLE ban_history ADD COLUMN ban_seq INT UNSIGNED NULL AFTER ban_number",
+        """
+        UPDATE ban_history SET ban_seq = CAST(ban_number AS UNSIGNED)
+        WHERE ban_seq IS NULL AND ban_number REGEXP '^[0-9]+$'
+        """,
+        """
+        UPDATE ban_history SET ban_seq = CAST(SUBSTRING(ban_number, 7) AS UNSIGNED)
+        WHERE ban_seq IS NULL AND ban_number REGEXP '^UNBAN-[0-9]+$'
+        """,
+        "ALTER TABLE ban_history ADD INDEX idx_unban_seq (is_unban, ban_seq)",
+    ]),
+    # Daily counts per offense x moderator x action, kept current by the write
+    # paths, so trend queries read O(days) rollup rows instead of ban_history.
+    Migration(4, "ban_rollups", [
+        """
+        CREATE TABLE IF NOT EXISTS ban_rollups (
+            day DATE NOT NULL,
+            action VARCHAR(10) NOT NULL,
+            offense VARCHAR(100) NOT NULL,
+            moderator VARCHAR(50) NOT NULL,
+            records INT NOT NULL DEFAULT 0,
+            strikes_removed INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, action, offense, moderator)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """,
+    ], apply=backfill_rollups),
+    # Word index over player names and offenses for search_bans. Prefix
+    # lookups use the primary key; idx_ban_token joins tokens of one ban.
+    Migration(5, "ban_search_tokens", [
+        """
+        CREATE TABLE IF NOT EXISTS ban_search_tokens (
+            token VARCHAR(64) NOT NULL,
+            ban_id INT NOT NULL,
+            field CHAR(1) NOT NULL,
+            PRIMARY KEY (token, ban_id, field),
+            INDEX idx_ban_token (ban_id, token)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_bin;
+        """,
+    ], apply=backfill_search_tokens),
+    # One row per BUID (so a renamed player stays one row), maintained by the
+    # write paths. idx_repeat_offenders is the /repeatoffenders sort order.
+    Migration(6, "player_summary", [
+        """
+        CREATE TABLE IF NOT EXISTS player_summary (
+            buid VARCHAR(50) PRIMARY KEY,
+            player_name VARCHAR(255) NOT NULL,
+            total_bans INT NOT NULL DEFAULT 0,
+            active_strikes INT NOT NULL DEFAULT 0,
+            last_ban_at TIMESTAMP NULL,
+            INDEX idx_repeat_offenders (active_strikes, total_bans, buid)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+        """,
+    ], apply=backfill_player_summary),
+]
+
+# The same schema for the embedded SQLite backend, created in its final shape.
+# SQLite has no in-place ALTER for most of the steps above, and a SQLite file
+# always starts empty, so it gets one baseline at the current version with the
+# same tables and index names. New versions go into both lists.
+# NOCASE matches the case-insensitive comparisons of MySQL's _ci collation; on
+# ban_search_tokens it is also what lets prefix LIKE use the primary key.
+SQLITE_MIGRATIONS = [
+    Migration(6, "baseline tables (sqlite)", [
+        """
+        CREATE TABLE IF NOT EXISTS ban_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ban_number VARCHAR(20) COLLATE NOCASE UNIQUE NOT NULL,
+            ban_seq INTEGER,
+            player_name VARCHAR(255) NOT NULL,
+            buid VARCHAR(50) COLLATE NOCASE NOT NULL,
+            offense TEXT NOT NULL,
+            strike VARCHAR(50) COLLATE NOCASE NOT NULL,
+            sanction TEXT NOT NULL,
+            transcript TEXT,
+            submitted_by VARCHAR(50) NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_unban BOOLEAN DEFAULT FALSE,
+            related_ban_id INTEGER,
+            strike_removed BOOLEAN DEFAULT FALSE
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_timestamp ON ban_history (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_buid_timestamp ON ban_history (buid, timestamp, id)",
+        "CREATE INDEX IF NOT EXISTS idx_buid_strikes ON ban_history (buid, is_unban, strike_removed, strike)",
+        "CREATE INDEX IF NOT EXISTS idx_unban_timestamp ON ban_history (is_unban, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_unban_seq ON ban_history (is_unban, ban_seq)",
+        """
+        CREATE TABLE IF NOT EXISTS ban_counters (
+            name VARCHAR(20) PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS pending_ban_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending',
+            player_name VARCHAR(255) NOT NULL,
+            buid VARCHAR(50) NOT NULL,
+            ban_data TEXT NOT NULL,
+            submitted_by VARCHAR(50) NOT NULL,
+            channel_id BIGINT,
+            message_id BIGINT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            resolved_by VARCHAR(50),
+            resolved_at TIMESTAMP,
+            result_ban_number VARCHAR(20)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_status_created ON pending_ban_requests (status, created_at)",
+        """
+        CREATE TABLE IF NOT EXISTS ban_rollups (
+            day DATE NOT NULL,
+            action VARCHAR(10) NOT NULL,
+            offense VARCHAR(100) COLLATE NOCASE NOT NULL,
+            moderator VARCHAR(50) COLLATE NOCASE NOT NULL,
+            records INTEGER NOT NULL DEFAULT 0,
+            strikes_removed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, action, offense, moderator)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS ban_search_tokens (
+            token VARCHAR(64) COLLATE NOCASE NOT NULL,
+            ban_id INTEGER NOT NULL,
+            field CHAR(1) NOT NULL,
+            PRIMARY KEY (token, ban_id, field)
+        ) WITHOUT ROWID
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_ban_token ON ban_search_tokens (ban_id, token)",
+        """
+        CREATE TABLE IF NOT EXISTS player_summary (
+            buid VARCHAR(50) COLLATE NOCASE PRIMARY KEY,
+            player_name VARCHAR(255) NOT NULL,
+            total_bans INTEGER NOT NULL DEFAULT 0,
+            active_strikes INTEGER NOT NULL DEFAULT 0,
+            last_ban_at TIMESTAMP
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_repeat_offenders ON player_summary (active_strikes, total_bans, buid)",
+    ]),
+]
+
+
 class BanTracker:
     def __init__(self):
         # Ban tracking database connection details (Sparked Host)
@@ -14,24 +355,41 @@ class BanTracker:
         self.user = os.getenv('BAN_DB_USER', 'u176355_SL273gExDt')
         self.password = os.getenv('BAN_DB_PASSWORD', 'j+Z6UFX1L@B6gDhOru1jqeEo')
         self.database = os.getenv('BAN_DB_NAME', 's176355_ban-history')
+        # 'mysql' (default) or 'sqlite' for a single embedded database file
+        self.backend_name = os.getenv('BAN_DB_BACKEND', 'mysql').lower()
+        self.sqlite_path = os.getenv('BAN_DB_SQLITE_PATH', 'data/ban_history.sqlite3')
+        # Upper bound on pooled MySQL connections (SQLite always uses one)
+        self.pool_size = int(os.getenv('BAN_DB_POOL_SIZE', 10))
+        self.backend = None
         self.pool = None
         
-        print(f"DEBUG: Ban tracker using connection to {self.host}/{self.database}")
+        # Per-BUID history/strike cache, kept current by the write paths below
+        self._player_cache = TTLCache(
+            maxsize=int(os.getenv('BAN_CACHE_SIZE', 512)),
+            ttl=float(os.getenv('BAN_CACHE_TTL', 300))
+        )
+        # Latest /banstats figures, filled by refresh_statistics()
+        self.stats_snapshot: Optional[Dict] = None
+        
+        if self.backend_name == 'sqlite':
+            print(f"DEBUG: Ban tracker using SQLite database {self.sqlite_path}")
+        else:
+            print(f"DEBUG: Ban tracker using connection to {self.host}/{self.database}")
+    
+    def _make_backend(self):
+        """Build the storage backend from the current settings"""
+        if self.backend_name == 'sqlite':
+            return SQLiteBackend(self.sqlite_path)
+        if self.backend_name != 'mysql':
+            raise ValueError(f"Unknown BAN_DB_BACKEND '{self.backend_name}' (expected 'mysql' or 'sqlite')")
+        return MySQLBackend(self.host, self.port, self.user, self.password, self.database,
+                            maxsize=self.pool_size)
     
     async def initialize(self):
         """Initialize the database connection pool and create tables"""
         try:
-            self.pool = await aiomysql.create_pool(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                db=self.database,
-                charset='utf8mb4',
-                autocommit=True,
-                minsize=1,
-                maxsize=10
-            )
+            self.backend = self._make_backend()
+            self.pool = instrument_pool(await self.backend.create_pool(), 'ban')
             await self._create_tables()
             print("✅ Ban tracker database connection established")
         except Exception as e:
@@ -45,138 +403,249 @@ class BanTracker:
             await self.pool.wait_closed()
             print("✅ Ban tracker database connection closed")
     
+    def _invalidate_player(self, buid: Optional[str]):
+        """Drop any cached history/strike data for a player"""
+        if buid:
+            self._player_cache.invalidate(('history', buid))
+            self._player_cache.invalidate(('strikes', buid))
+            self._player_cache.invalidate(('first_page', buid))
+    
+    def cache_stats(self) -> Dict[str, Optional[float]]:
+        """Hit/miss counters for the per-player cache"""
+        return self._player_cache.stats()
+    
     async def _create_tables(self):
-        """Create the ban tracking tables if they don't exist"""
-        create_table_query = """
-        CREATE TABLE IF NOT EXISTS ban_history (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            ban_number VARCHAR(20) UNIQUE NOT NULL,
-            player_name VARCHAR(255) NOT NULL,
-            buid VARCHAR(50) NOT NULL,
-            offense TEXT NOT NULL,
-            strike VARCHAR(50) NOT NULL,
-            sanction TEXT NOT NULL,
-            transcript TEXT,
-            submitted_by VARCHAR(50) NOT NULL,
-            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            is_unban BOOLEAN DEFAULT FALSE,
-            related_ban_id INT,
-            strike_removed BOOLEAN DEFAULT FALSE,
-            INDEX idx_buid (buid),
-            INDEX idx_ban_number (ban_number),
-            INDEX idx_timestamp (timestamp),
-            INDEX idx_is_unban (is_unban),
-            INDEX idx_strike_removed (strike_removed)
-        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
-        """
-        
+        """Bring the schema up to date and seed the number counters"""
         try:
+            if self.backend.name == 'sqlite':
+                runner = MigrationRunner(SQLITE_MIGRATIONS, lock_name='ban_history_migrations', table_options="")
+            else:
+                runner = MigrationRunner(BAN_HISTORY_MIGRATIONS, lock_name='ban_history_migrations')
+            applied = await runner.run(self.pool)
+            if applied:
+                print(f"✅ Applied ban history migrations: {', '.join(map(str, applied))}")
+            print("✅ Ban history schema verified")
             async with self.pool.acquire() as connection:
                 async with connection.cursor() as cursor:
-                    await cursor.execute(create_table_query)
-                    print("✅ Ban history table created/verified")
+                    await self._seed_counters(cursor)
+                    print("✅ Ban number counters created/verified")
         except Exception as e:
             print(f"❌ Failed to create ban history table: {e}")
             raise e
     
-    async def _get_next_number(self, is_unban: bool = False) -> str:
-        """Get the next ban or unban number"""
-        try:
-            async with self.pool.acquire() as connection:
-                async with connection.cursor() as cursor:
-                    if is_unban:
-                        # Get highest UNBAN number
-                        query = """
-                        SELECT ban_number FROM ban_history 
-                        WHERE ban_number LIKE 'UNBAN-%' 
-                        ORDER BY CAST(SUBSTRING(ban_number, 7) AS UNSIGNED) DESC 
-                        LIMIT 1
-                        """
-                        await cursor.execute(query)
-                        result = await cursor.fetchone()
-                        
-                        if result:
-                            # Extract number from UNBAN-XXXX format
-                            number = int(result[0].split('-')[1]) + 1
-                        else:
-                            number = 1
-                        
-                        return f"UNBAN-{number:04d}"
-                    else:
-                        # Get highest regular ban number (excluding UNBAN entries)
-                        query = """
-                        SELECT ban_number FROM ban_history 
-                        WHERE ban_number NOT LIKE 'UNBAN-%' 
-                        ORDER BY CAST(ban_number AS UNSIGNED) DESC 
-                        LIMIT 1
-                        """
-                        await cursor.execute(query)
-                        result = await cursor.fetchone()
-                        
-                        if result:
-                            number = int(result[0]) + 1
-                        else:
-                            number = 1
-                        
-                        return f"{number:04d}"
+    async def _seed_counters(self, cursor):
+        """Seed the number counters from the highest numbers already in ban_history.
         
-        except Exception as e:
-            print(f"❌ Error generating ban number: {e}")
-            # Fallback to timestamp-based number
-            import time
-            timestamp = int(time.time())
-            if is_unban:
-                return f"UNBAN-{timestamp}"
-            else:
-                return str(timestamp)
+        Runs on every startup; GREATEST() means an existing counter is never moved
+        backwards, while rows written by older versions of the bot are caught up with.
+        Both MAX() lookups are a single dive into idx_unban_seq.
+        """
+        await cursor.execute("SELECT COALESCE(MAX(ban_seq), 0) FROM ban_history WHERE is_unban = FALSE")
+        highest_ban = (await cursor.fetchone())[0]
+        await cursor.execute("SELECT COALESCE(MAX(ban_seq), 0) FROM ban_history WHERE is_unban = TRUE")
+        highest_unban = (await cursor.fetchone())[0]
+        
+        seed_query = """
+        INSERT INTO ban_counters (name, value) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE value = GREATEST(value, VALUES(value))
+        """
+        await cursor.executemany(seed_query, [('ban', int(highest_ban)), ('unban', int(highest_unban))])
+    
+    @staticmethod
+    def _format_number(number: int, is_unban: bool) -> str:
+        """Render a counter value in the ban (0042) or unban (UNBAN-0001) format"""
+        return f"UNBAN-{number:04d}" if is_unban else f"{number:04d}"
+    
+    async def _claim_number_range(self, cursor, is_unban: bool = False, count: int = 1) -> int:
+        """Claim `count` consecutive ban or unban sequence values inside the caller's
+        transaction and return the first one.
+        
+        LAST_INSERT_ID(expr) hands the incremented value back in the UPDATE's OK
+        packet, so the claim costs a single round trip and the counter row stays
+        locked until the caller commits or rolls back.
+        """
+        counter = 'unban' if is_unban else 'ban'
+        await cursor.execute(
+            "UPDATE ban_counters SET value = LAST_INSERT_ID(value + %s) WHERE name = %s",
+            (count, counter)
+        )
+        if cursor.rowcount == 0:
+            raise Exception(f"Ban number counter '{counter}' is missing")
+        return cursor.lastrowid - count + 1
+    
+    async def _insert_bans(self, cursor, entries: List[Dict]) -> List[str]:
+        """Insert ban_history rows plus their rollup, summary and search rows.
+        
+        Numbers are allocated as one range per series and the rows go in as a
+        single multi-row INSERT, so N bans cost the same handful of statements
+        as one. Must run inside the caller's transaction. Returns the ban
+        numbers in `entries` order.
+        """
+        numbers: List[Tuple[int, str]] = [None] * len(entries)
+        for is_unban in (False, True):
+            positions = [i for i, entry in enumerate(entries) if bool(entry.get('is_unban')) == is_unban]
+            if not positions:
+                continue
+            first = await self._claim_number_range(cursor, is_unban, len(positions))
+            for offset, i in enumerate(positions):
+                numbers[i] = (first + offset, self._format_number(first + offset, is_unban))
+        
+        await cursor.executemany("""
+            INSERT INTO ban_history
+            (ban_number, ban_seq, player_name, buid, offense, strike, sanction, transcript,
+             submitted_by, is_unban, related_ban_id, strike_removed)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, [
+            (ban_number, ban_seq, e['player_name'], e['buid'], e['offense'], e['strike'], e['sanction'],
+             e['transcript'], e['submitted_by'], bool(e.get('is_unban')), e.get('related_ban_id'), False)
+            for (ban_seq, ban_number), e in zip(numbers, entries)
+        ])
+        
+        ban_numbers = [ban_number for _, ban_number in numbers]
+        placeholders = ", ".join(["%s"] * len(ban_numbers))
+        await cursor.execute(f"SELECT ban_number, id FROM ban_history WHERE ban_number IN ({placeholders})", ban_numbers)
+        ids = dict(await cursor.fetchall())
+        id_list = [ids[number] for number in ban_numbers]
+        id_placeholders = ", ".join(["%s"] * len(id_list))
+        
+        await cursor.execute(f"""
+            INSERT INTO ban_rollups (day, action, offense, moderator, records)
+            SELECT {ROLLUP_KEY_SQL}, COUNT(*) FROM ban_history WHERE id IN ({id_placeholders})
+            GROUP BY {ROLLUP_KEY_SQL}
+            ON DUPLICATE KEY UPDATE records = records + VALUES(records)
+        """, id_list)
+        await cursor.execute(f"""
+            INSERT INTO player_summary (buid, player_name, total_bans, active_strikes, last_ban_at)
+            {PLAYER_SUMMARY_SELECT_SQL}
+            WHERE id IN ({id_placeholders})
+            GROUP BY buid
+            ON DUPLICATE KEY UPDATE player_name = VALUES(player_name),
+                total_bans = total_bans + VALUES(total_bans),
+                active_strikes = active_strikes + VALUES(active_strikes),
+                last_ban_at = GREATEST(COALESCE(last_ban_at, VALUES(last_ban_at)),
+                                       COALESCE(VALUES(last_ban_at), last_ban_at))
+        """, id_list)
+        token_rows = [
+            token_row for ban_id, e in zip(id_list, entries)
+            for token_row in index_rows(ban_id, e['player_name'], e['offense'])
+        ]
+        if token_rows:
+            await cursor.executemany(
+                "INSERT IGNORE INTO ban_search_tokens (token, ban_id, field) VALUES (%s, %s, %s)", token_rows
+            )
+        return ban_numbers
     
     async def add_ban(self, player_name: str, buid: str, offense: str, strike: str, 
                      sanction: str, transcript: str, submitted_by: str, 
                      is_unban: bool = False, related_ban_id: int = None) -> str:
         """Add a ban record and return the ban number"""
+        entry = {
+            'player_name': player_name, 'buid': buid, 'offense': offense, 'strike': strike,
+            'sanction': sanction, 'transcript': transcript, 'submitted_by': submitted_by,
+            'is_unban': is_unban, 'related_ban_id': related_ban_id
+        }
+        ban_number = (await self.add_bans([entry]))[0]
+        print(f"✅ {'Unban' if is_unban else 'Ban'} {ban_number} added for {player_name}")
+        return ban_number
+    
+    async def add_bans(self, entries: List[Dict]) -> List[str]:
+        """Add several ban records in one transaction and return their ban numbers.
+        
+        Each entry has the add_ban keyword arguments as keys. Either every
+        record is written or none is.
+        """
         if not self.pool:
             raise Exception("Database not initialized")
+        if not entries:
+            return []
         
         try:
-            ban_number = await self._get_next_number(is_unban)
-            
-            query = """
-            INSERT INTO ban_history 
-            (ban_number, player_name, buid, offense, strike, sanction, transcript, 
-             submitted_by, is_unban, related_ban_id, strike_removed)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
             async with self.pool.acquire() as connection:
-                async with connection.cursor() as cursor:
-                    await cursor.execute(
-                        query, (ban_number, player_name, buid, offense, strike, 
-                               sanction, transcript, submitted_by, is_unban, 
-                               related_ban_id, False)
-                    )
-                    
-            print(f"✅ {'Unban' if is_unban else 'Ban'} {ban_number} added for {player_name}")
-            return ban_number
+                # Number claim and INSERT share one transaction, so concurrent
+                # approvals serialise on the counter row instead of colliding
+                # on the UNIQUE ban_number key.
+                await connection.begin()
+                try:
+                    async with connection.cursor() as cursor:
+                        ban_numbers = await self._insert_bans(cursor, entries)
+                    await connection.commit()
+                except Exception:
+                    await connection.rollback()
+                    raise
+            
+            for entry in entries:
+                self._invalidate_player(entry['buid'])
+            return ban_numbers
             
         except Exception as e:
-            print(f"❌ Error adding ban record: {e}")
+            print(f"❌ Error adding ban record(s): {e}")
             raise e
     
+    async def _lock_ban_row(self, cursor, ban_number: str) -> Optional[Tuple]:
+        """SELECT ... FOR UPDATE id, buid, strike_removed, whether it is an active strike, and the rollup key"""
+        await cursor.execute(f"""
+            SELECT id, buid, strike_removed, {ACTIVE_STRIKE_SQL}, {ROLLUP_KEY_SQL}
+            FROM ban_history WHERE ban_number = %s FOR UPDATE
+        """, (ban_number,))
+        return await cursor.fetchone()
+    
+    async def _refresh_player_summary(self, cursor, buid: str):
+        """Recompute one player's summary row from their history (after a delete)"""
+        await cursor.execute("SELECT 1 FROM ban_history WHERE buid = %s LIMIT 1", (buid,))
+        if not await cursor.fetchone():
+            await cursor.execute("DELETE FROM player_summary WHERE buid = %s", (buid,))
+            return
+        await cursor.execute(f"""
+            INSERT INTO player_summary (buid, player_name, total_bans, active_strikes, last_ban_at)
+            {PLAYER_SUMMARY_SELECT_SQL}
+            WHERE buid = %s
+            GROUP BY buid
+            {PLAYER_SUMMARY_UPSERT_SQL}
+        """, (buid,))
+    
     async def remove_strike(self, ban_number: str) -> bool:
-        """Remove/mark a strike as removed for a specific ban number"""
+        """Remove/mark a strike as removed for a specific ban number.
+        
+        The removal is counted in the rollup of the day the ban was issued, not
+        the day it was removed: ban_history keeps no removal date, and this way
+        the incremental count always matches what backfill_rollups rebuilds.
+        
+        Returns False when the ban does not exist or its strike was already removed.
+        """
         if not self.pool:
             return False
         
         try:
-            query = "UPDATE ban_history SET strike_removed = TRUE WHERE ban_number = %s"
-            
             async with self.pool.acquire() as connection:
-                async with connection.cursor() as cursor:
-                    await cursor.execute(query, (ban_number,))
-                    success = cursor.rowcount > 0
-                    
+                await connection.begin()
+                try:
+                    async with connection.cursor() as cursor:
+                        row = await self._lock_ban_row(cursor, ban_number)
+                        if row and not row[2]:
+                            await cursor.execute(
+                                "UPDATE ban_history SET strike_removed = TRUE WHERE ban_number = %s", (ban_number,)
+                            )
+                            await cursor.execute("""
+                                UPDATE ban_rollups SET strikes_removed = strikes_removed + 1
+                                WHERE day = %s AND action = %s AND offense = %s AND moderator = %s
+                            """, row[4:])
+                            if row[3]:
+                                await cursor.execute(
+                                    "UPDATE player_summary SET active_strikes = active_strikes - 1 WHERE buid = %s",
+                                    (row[1],)
+                                )
+                    await connection.commit()
+                except Exception:
+                    await connection.rollback()
+                    raise
+            
+            # Only a strike this call actually removed counts; repeating the removal is not a success
+            success = row is not None and not row[2]
             if success:
+                self._invalidate_player(row[1])
                 print(f"✅ Strike removed for ban {ban_number}")
+            elif row:
+                print(f"⚠️ Strike for ban {ban_number} was already removed")
             else:
                 print(f"⚠️ No ban found with number {ban_number}")
                 
@@ -194,67 +663,415 @@ class BanTracker:
             return False
         
         try:
-            query = "DELETE FROM ban_history WHERE ban_number = %s"
             async with self.pool.acquire() as connection:
-                async with connection.cursor() as cursor:
-                    await cursor.execute(query, (ban_number,))
-                    # cursor.rowcount will be > 0 if a row was deleted
-                    if cursor.rowcount > 0:
-                        print(f"✅ Ban record {ban_number} deleted successfully.")
-                        return True
-                    else:
-                        print(f"⚠️ No ban record found with number {ban_number} to delete.")
-                        return False
+                await connection.begin()
+                try:
+                    async with connection.cursor() as cursor:
+                        row = await self._lock_ban_row(cursor, ban_number)
+                        if row:
+                            await cursor.execute("DELETE FROM ban_history WHERE ban_number = %s", (ban_number,))
+                            await cursor.execute("""
+                                UPDATE ban_rollups
+                                SET records = records - 1, strikes_removed = strikes_removed - %s
+                                WHERE day = %s AND action = %s AND offense = %s AND moderator = %s
+                            """, (1 if row[2] else 0, *row[4:]))
+                            await cursor.execute("""
+                                DELETE FROM ban_rollups
+                                WHERE day = %s AND action = %s AND offense = %s AND moderator = %s AND records <= 0
+                            """, row[4:])
+                            await cursor.execute("DELETE FROM ban_search_tokens WHERE ban_id = %s", (row[0],))
+                            await self._refresh_player_summary(cursor, row[1])
+                    await connection.commit()
+                except Exception:
+                    await connection.rollback()
+                    raise
+            
+            if row:
+                self._invalidate_player(row[1])
+                print(f"✅ Ban record {ban_number} deleted successfully.")
+                return True
+            else:
+                print(f"⚠️ No ban record found with number {ban_number} to delete.")
+                return False
         except Exception as e:
             print(f"❌ Error deleting ban record {ban_number}: {e}")
             return False
     
-    async def get_player_history(self, buid: str) -> List[Dict]:
-        """Get all ban history for a player"""
+    async def rebuild_rollups(self) -> bool:
+        """Recompute ban_rollups from scratch (backfill / repair after manual SQL edits)"""
+        if not self.pool:
+            return False
+        
+        try:
+            async with self.pool.acquire() as connection:
+                await connection.begin()
+                try:
+                    async with connection.cursor() as cursor:
+                        await backfill_rollups(cursor)
+                    await connection.commit()
+                except Exception:
+                    await connection.rollback()
+                    raise
+            print("✅ Ban rollups rebuilt")
+            return True
+        except Exception as e:
+            print(f"❌ Error rebuilding ban rollups: {e}")
+            return False
+    
+    async def get_ban_trends(self, days: int = 30, offense: Optional[str] = None,
+                             moderator: Optional[str] = None, top: int = 5) -> Dict:
+        """Daily ban/unban counts for the last `days` days, read from ban_rollups.
+        
+        'daily' has one (date, bans, unbans) entry per day, zero-filled, oldest
+        first. 'top_offenses' / 'top_moderators' rank the same window.
+        'strikes_removed' counts removed strikes on bans issued in the window.
+        """
+        trends = {'daily': [], 'top_offenses': [], 'top_moderators': [], 'strikes_removed': 0}
+        if not self.pool:
+            return trends
+        
+        where = "day >= %s"
+        filters: list = []
+        if offense:
+            where += " AND offense = %s"
+            filters.append(offense[:100])
+        if moderator:
+            where += " AND moderator = %s"
+            filters.append(moderator)
+        
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    # The window is anchored on the database's date, which the rollup days come from
+                    await cursor.execute("SELECT CURRENT_DATE")
+                    today = self._as_date((await cursor.fetchone())[0])
+                    params = [today - timedelta(days=days - 1)] + filters
+                    await cursor.execute(f"""
+                        SELECT day, SUM(CASE WHEN action = 'ban' THEN records ELSE 0 END),
+                               SUM(CASE WHEN action = 'unban' THEN records ELSE 0 END),
+                               SUM(strikes_removed)
+                        FROM ban_rollups WHERE {where}
+                        GROUP BY day
+                    """, params)
+                    per_day = {}
+                    for day, bans, unbans, removed in await cursor.fetchall():
+                        per_day[self._as_date(day)] = (int(bans), int(unbans))
+                        trends['strikes_removed'] += int(removed or 0)
+                    for column, key in (('offense', 'top_offenses'), ('moderator', 'top_moderators')):
+                        await cursor.execute(f"""
+                            SELECT {column}, SUM(records) AS total FROM ban_rollups
+                            WHERE {where} AND action = 'ban'
+                            GROUP BY {column} ORDER BY total DESC LIMIT %s
+                        """, (*params, top))
+                        trends[key] = [(value, int(total)) for value, total in await cursor.fetchall()]
+            
+            for offset in range(days - 1, -1, -1):
+                day = today - timedelta(days=offset)
+                bans, unbans = per_day.get(day, (0, 0))
+                trends['daily'].append((day, bans, unbans))
+            return trends
+        except Exception as e:
+            print(f"❌ Error getting ban trends: {e}")
+            return trends
+    
+    @staticmethod
+    def _as_date(value) -> date:
+        """DATE values come back as date from MySQL and as 'YYYY-MM-DD' text from SQLite expressions"""
+        return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+    
+    @staticmethod
+    def _as_datetime(value) -> datetime:
+        return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    
+    async def create_pending_request(self, ban_data: Dict, player_name: str, buid: str, submitted_by: str) -> int:
+        """Persist a submitted ban/unban form and return its request ID"""
+        if not self.pool:
+            raise Exception("Database not initialized")
+        
+        query = """
+        INSERT INTO pending_ban_requests (player_name, buid, ban_data, submitted_by)
+        VALUES (%s, %s, %s, %s)
+        """
+        async with self.pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(query, (player_name, buid, json.dumps(ban_data), submitted_by))
+                return cursor.lastrowid
+    
+    async def attach_pending_message(self, request_id: int, channel_id: int, message_id: int):
+        """Record where the request's Approve/Deny message was posted"""
+        if not self.pool:
+            return
+        
+        query = "UPDATE pending_ban_requests SET channel_id = %s, message_id = %s WHERE id = %s"
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, (channel_id, message_id, request_id))
+        except Exception as e:
+            print(f"❌ Error attaching message to pending request {request_id}: {e}")
+    
+    async def get_pending_request(self, request_id: int) -> Optional[Dict]:
+        """Load a moderation request (any status) with its ban_data decoded"""
+        if not self.pool:
+            return None
+        
+        try:
+            query = "SELECT * FROM pending_ban_requests WHERE id = %s"
+            async with self.pool.acquire() as connection:
+                async with connection.cursor(self.backend.dict_cursor) as cursor:
+                    await cursor.execute(query, (request_id,))
+                    row = await cursor.fetchone()
+            if not row:
+                return None
+            row['ban_data'] = json.loads(row['ban_data'])
+            return row
+        except Exception as e:
+            print(f"❌ Error loading pending request {request_id}: {e}")
+            return None
+    
+    async def list_pending_requests(self) -> List[Dict]:
+        """List open requests, oldest first (served by idx_status_created).
+        
+        'is_unban' tells unban requests apart without shipping ban_data.
+        """
         if not self.pool:
             return []
         
         try:
             query = """
-            SELECT * FROM ban_history 
+            SELECT id, player_name, buid, submitted_by, channel_id, message_id, created_at,
+                   COALESCE(JSON_TYPE(JSON_EXTRACT(ban_data, '$.unban_data')), 'NULL') != 'NULL' AS is_unban
+            FROM pending_ban_requests
+            WHERE status = 'pending'
+            ORDER BY created_at
+            """
+            async with self.pool.acquire() as connection:
+                async with connection.cursor(self.backend.dict_cursor) as cursor:
+                    await cursor.execute(query)
+                    return list(await cursor.fetchall())
+        except Exception as e:
+            print(f"❌ Error listing pending requests: {e}")
+            return []
+    
+    async def requeue_unfinished_requests(self) -> int:
+        """Hand requests stuck in 'processing' back to the queue; returns how many.
+        
+        A request sits in 'processing' only while an approval is running, so at
+        startup any such row belongs to an approval that died with the previous
+        process before recording a ban.
+        """
+        if not self.pool:
+            return 0
+        
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute("""
+                        UPDATE pending_ban_requests
+                        SET status = 'pending', resolved_by = NULL, resolved_at = NULL
+                        WHERE status = 'processing' AND result_ban_number IS NULL
+                    """)
+                    return cursor.rowcount
+        except Exception as e:
+            print(f"❌ Error requeueing unfinished requests: {e}")
+            return 0
+    
+    async def resolve_pending_request(self, request_id: int, status: str, resolved_by: str,
+                                      ban_number: Optional[str] = None, from_status: str = 'pending') -> bool:
+        """Move a request from `from_status` to `status`.
+        
+        The status check is part of the UPDATE, so when two moderators click at
+        the same time only one of them gets True back.
+        """
+        if not self.pool:
+            return False
+        
+        try:
+            query = """
+            UPDATE pending_ban_requests
+            SET status = %s, resolved_by = %s, resolved_at = CURRENT_TIMESTAMP,
+                result_ban_number = COALESCE(%s, result_ban_number)
+            WHERE id = %s AND status = %s
+            """
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, (status, resolved_by, ban_number, request_id, from_status))
+                    return cursor.rowcount > 0
+        except Exception as e:
+            print(f"❌ Error resolving pending request {request_id}: {e}")
+            return False
+    
+    async def claim_pending_requests(self, request_ids: List[int], resolved_by: str) -> List[Dict]:
+        """Move every still-pending request in `request_ids` to 'processing' and return them.
+        
+        Requests someone else already handled are silently left out, so the
+        caller only ever works on requests it owns. Database errors are raised
+        rather than returned as an empty list, so they can't pass for
+        "already handled".
+        """
+        if not request_ids:
+            return []
+        if not self.pool:
+            raise RuntimeError("Ban database is not connected")
+        
+        placeholders = ", ".join(["%s"] * len(request_ids))
+        try:
+            async with self.pool.acquire() as connection:
+                await connection.begin()
+                try:
+                    async with connection.cursor(self.backend.dict_cursor) as cursor:
+                        await cursor.execute(f"""
+                            SELECT * FROM pending_ban_requests
+                            WHERE id IN ({placeholders}) AND status = 'pending'
+                            ORDER BY id FOR UPDATE
+                        """, request_ids)
+                        claimed = list(await cursor.fetchall())
+                        if claimed:
+                            claimed_placeholders = ", ".join(["%s"] * len(claimed))
+                            await cursor.execute(f"""
+                                UPDATE pending_ban_requests
+                                SET status = 'processing', resolved_by = %s, resolved_at = CURRENT_TIMESTAMP
+                                WHERE id IN ({claimed_placeholders})
+                            """, [resolved_by] + [row['id'] for row in claimed])
+                    await connection.commit()
+                except Exception:
+                    await connection.rollback()
+                    raise
+            for row in claimed:
+                row['ban_data'] = json.loads(row['ban_data'])
+            return claimed
+        except Exception as e:
+            print(f"❌ Error claiming pending requests {request_ids}: {e}")
+            raise
+    
+    async def resolve_pending_requests(self, resolutions: List[Tuple[int, Optional[str]]], status: str,
+                                       resolved_by: str, from_status: str = 'processing') -> int:
+        """Bulk form of resolve_pending_request for (request_id, ban_number) pairs; returns rows moved"""
+        if not self.pool or not resolutions:
+            return 0
+        
+        query = """
+        UPDATE pending_ban_requests
+        SET status = %s, resolved_by = %s, resolved_at = CURRENT_TIMESTAMP,
+            result_ban_number = COALESCE(%s, result_ban_number)
+        WHERE id = %s AND status = %s
+        """
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.executemany(query, [
+                        (status, resolved_by, ban_number, request_id, from_status)
+                        for request_id, ban_number in resolutions
+                    ])
+                    return cursor.rowcount
+        except Exception as e:
+            print(f"❌ Error resolving pending requests: {e}")
+            return 0
+    
+    async def get_player_history(self, buid: str) -> List['BanRecord']:
+        """Get all ban history for a player (without transcripts)"""
+        if not self.pool:
+            return []
+        
+        cached = self._player_cache.get(('history', buid))
+        if cached is not None:
+            return list(cached)
+        
+        try:
+            query = f"""
+            SELECT {LIST_COLUMNS_SQL} FROM ban_history 
             WHERE buid = %s 
             ORDER BY timestamp DESC
             """
             
             async with self.pool.acquire() as connection:
-                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                async with connection.cursor() as cursor:
                     await cursor.execute(query, (buid,))
-                    rows = await cursor.fetchall()
-                    
-                    history = []
-                    for row in rows:
-                        history.append({
-                            'id': row['id'],
-                            'ban_number': row['ban_number'],
-                            'player_name': row['player_name'],
-                            'buid': row['buid'],
-                            'offense': row['offense'] or '',
-                            'strike': row['strike'] or '',
-                            'sanction': row['sanction'] or '',
-                            'transcript': row['transcript'] or '',
-                            'submitted_by': row['submitted_by'] or '',
-                            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else '',
-                            'is_unban': bool(row['is_unban']),
-                            'related_ban_id': row['related_ban_id'],
-                            'strike_removed': bool(row['strike_removed'])
-                        })
-                    
-                    return history
+                    history = [BanRecord.from_row(row) for row in await cursor.fetchall()]
+            
+            self._player_cache.set(('history', buid), history)
+            return list(history)
                     
         except Exception as e:
             print(f"❌ Error getting player history for {buid}: {e}")
             return []
     
+    async def get_player_history_page(self, buid: str, cursor: Optional[Tuple[datetime, int]] = None,
+                                      limit: int = 4) -> Dict:
+        """Get one page of a player's history, newest first, using keyset pagination.
+        
+        `cursor` is the (timestamp, id) of the last row of the previous page, as
+        returned in 'next_cursor'. The first page (no cursor) also carries the
+        player's total record count and active strikes, computed by window
+        functions in the same query; later pages leave them as None. Transcripts
+        are not selected; use get_ban_by_number for the full record.
+        
+        The first page is cached per BUID alongside the history, so opening
+        /banhistory again for the same player does not query.
+        """
+        page = {'entries': [], 'next_cursor': None, 'total': None, 'active_strikes': None}
+        if not self.pool:
+            return page
+        
+        if cursor is None:
+            cached = self._player_cache.get(('first_page', buid))
+            if cached is not None and cached[0] == limit:
+                return {**cached[1], 'entries': list(cached[1]['entries'])}
+            query = f"""
+            SELECT {LIST_COLUMNS_SQL},
+                   COUNT(*) OVER () AS total_records,
+                   SUM(CASE WHEN is_unban = FALSE AND strike_removed = FALSE
+                            AND strike != 'Custom' AND strike != 'UNBAN' THEN 1 ELSE 0 END) OVER () AS active_strikes
+            FROM ban_history
+            WHERE buid = %s
+            ORDER BY timestamp DESC, id DESC
+            LIMIT %s
+            """
+            params = (buid, limit + 1)
+        else:
+            query = f"""
+            SELECT {LIST_COLUMNS_SQL}
+            FROM ban_history
+            WHERE buid = %s AND (timestamp < %s OR (timestamp = %s AND id < %s))
+            ORDER BY timestamp DESC, id DESC
+            LIMIT %s
+            """
+            params = (buid, cursor[0], cursor[0], cursor[1], limit + 1)
+        
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as db_cursor:
+                    await db_cursor.execute(query, params)
+                    rows = await db_cursor.fetchall()
+            
+            if rows and cursor is None:
+                # total_records and active_strikes follow the projected columns
+                page['total'] = int(rows[0][len(LIST_COLUMNS)])
+                page['active_strikes'] = int(rows[0][len(LIST_COLUMNS) + 1] or 0)
+            
+            # One extra row was fetched only to learn whether another page exists
+            has_more = len(rows) > limit
+            page['entries'] = [BanRecord.from_row(row) for row in rows[:limit]]
+            if has_more:
+                last = page['entries'][-1]
+                page['next_cursor'] = (last.timestamp, last.id)
+            if cursor is None:
+                self._player_cache.set(('first_page', buid), (limit, {**page, 'entries': list(page['entries'])}))
+            return page
+            
+        except Exception as e:
+            print(f"❌ Error getting history page for {buid}: {e}")
+            return page
+    
     async def get_player_strikes(self, buid: str) -> int:
         """Count active strikes for a player (excluding unbans and removed strikes)"""
         if not self.pool:
             return 0
         
+        cached = self._player_cache.get(('strikes', buid))
+        if cached is not None:
+            return cached
+        
         try:
             query = """
             SELECT COUNT(*) as strike_count 
@@ -270,174 +1087,214 @@ class BanTracker:
                 async with connection.cursor() as cursor:
                     await cursor.execute(query, (buid,))
                     result = await cursor.fetchone()
-                    return result[0] if result else 0
+                    strikes = result[0] if result else 0
+                    self._player_cache.set(('strikes', buid), strikes)
+                    return strikes
                     
         except Exception as e:
             print(f"❌ Error counting strikes for {buid}: {e}")
             return 0
     
-    async def get_recent_bans(self, limit: int = 10) -> List[Dict]:
-        """Get recent ban submissions"""
+    @staticmethod
+    def _is_active_strike(entry: 'BanRecord') -> bool:
+        """Mirror of the get_player_strikes WHERE clause for an already-fetched row"""
+        return (not entry.is_unban and not entry.strike_removed
+                and entry.strike.lower() not in ('custom', 'unban'))
+    
+    async def get_player_summary(self, buid: str) -> Dict:
+        """Get a player's history together with the figures derived from it.
+        
+        Everything is computed in one pass over get_player_history, so a player
+        view costs at most one query (none when the history is cached).
+        """
+        history = await self.get_player_history(buid)
+        
+        active_strikes = 0
+        offense_strikes: Dict[str, int] = {}
+        last_offense = None
+        for entry in history:
+            if entry.is_unban:
+                continue
+            if last_offense is None:
+                last_offense = entry
+            if self._is_active_strike(entry):
+                active_strikes += 1
+                offense_strikes[entry.offense] = offense_strikes.get(entry.offense, 0) + 1
+        
+        return {
+            'history': history,
+            'player_name': history[0].player_name if history else None,
+            'active_strikes': active_strikes,
+            'last_offense': last_offense,
+            'offense_strikes': offense_strikes
+        }
+    
+    async def get_recent_bans(self, limit: int = 10) -> List['BanRecord']:
+        """Get recent ban submissions (without transcripts)"""
         if not self.pool:
             return []
         
         try:
-            query = """
-            SELECT * FROM ban_history 
+            query = f"""
+            SELECT {LIST_COLUMNS_SQL} FROM ban_history 
             ORDER BY timestamp DESC 
             LIMIT %s
             """
             
             async with self.pool.acquire() as connection:
-                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                async with connection.cursor() as cursor:
                     await cursor.execute(query, (limit,))
-                    rows = await cursor.fetchall()
-                    
-                    recent = []
-                    for row in rows:
-                        recent.append({
-                            'id': row['id'],
-                            'ban_number': row['ban_number'],
-                            'player_name': row['player_name'],
-                            'buid': row['buid'],
-                            'offense': row['offense'] or '',
-                            'strike': row['strike'] or '',
-                            'sanction': row['sanction'] or '',
-                            'transcript': row['transcript'] or '',
-                            'submitted_by': row['submitted_by'] or '',
-                            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else '',
-                            'is_unban': bool(row['is_unban']),
-                            'related_ban_id': row['related_ban_id'],
-                            'strike_removed': bool(row['strike_removed'])
-                        })
-                    
-                    return recent
+                    return [BanRecord.from_row(row) for row in await cursor.fetchall()]
                     
         except Exception as e:
             print(f"❌ Error getting recent bans: {e}")
             return []
     
-    async def get_ban_by_number(self, ban_number: str) -> Optional[Dict]:
-        """Get a ban record by ban number"""
+    async def get_ban_by_number(self, ban_number: str) -> Optional['BanRecord']:
+        """Get a full ban record (including transcript) by ban number"""
         if not self.pool:
             return None
         
         try:
-            query = "SELECT * FROM ban_history WHERE ban_number = %s"
+            query = f"SELECT {DETAIL_COLUMNS_SQL} FROM ban_history WHERE ban_number = %s"
             
             async with self.pool.acquire() as connection:
-                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                async with connection.cursor() as cursor:
                     await cursor.execute(query, (ban_number,))
                     row = await cursor.fetchone()
-                    
-                    if row:
-                        return {
-                            'id': row['id'],
-                            'ban_number': row['ban_number'],
-                            'player_name': row['player_name'],
-                            'buid': row['buid'],
-                            'offense': row['offense'] or '',
-                            'strike': row['strike'] or '',
-                            'sanction': row['sanction'] or '',
-                            'transcript': row['transcript'] or '',
-                            'submitted_by': row['submitted_by'] or '',
-                            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else '',
-                            'is_unban': bool(row['is_unban']),
-                            'related_ban_id': row['related_ban_id'],
-                            'strike_removed': bool(row['strike_removed'])
-                        }
-                    return None
+            return BanRecord.from_row(row, with_transcript=True) if row else None
                     
         except Exception as e:
             print(f"❌ Error getting ban by number {ban_number}: {e}")
             return None
     
     async def get_ban_statistics(self) -> Dict[str, int]:
-        """Get general ban statistics"""
+        """Get general ban statistics in a single pass over ban_history"""
         if not self.pool:
             return {}
         
         try:
+            query = """
+            SELECT
+                COALESCE(SUM(is_unban = FALSE), 0) AS total_bans,
+                COALESCE(SUM(is_unban = TRUE), 0) AS total_unbans,
+                COALESCE(SUM(is_unban = FALSE AND strike_removed = FALSE
+                             AND strike != 'Custom' AND strike != 'UNBAN'), 0) AS active_strikes,
+                COUNT(DISTINCT CASE WHEN is_unban = FALSE THEN buid END) AS unique_players_banned,
+                COALESCE(SUM(is_unban = FALSE AND timestamp >= %s), 0) AS bans_this_month
+            FROM ban_history
+            """
             async with self.pool.acquire() as connection:
-                async with connection.cursor() as cursor:
-                    stats = {}
-                    
-                    # Total bans (excluding unbans)
-                    await cursor.execute("SELECT COUNT(*) FROM ban_history WHERE is_unban = FALSE")
-                    result = await cursor.fetchone()
-                    stats['total_bans'] = result[0] if result else 0
-                    
-                    # Total unbans
-                    await cursor.execute("SELECT COUNT(*) FROM ban_history WHERE is_unban = TRUE")
-                    result = await cursor.fetchone()
-                    stats['total_unbans'] = result[0] if result else 0
-                    
-                    # Active strikes (not removed)
-                    await cursor.execute("""
-                        SELECT COUNT(*) FROM ban_history 
-                        WHERE is_unban = FALSE AND strike_removed = FALSE 
-                        AND strike != 'Custom' AND strike != 'UNBAN'
-                    """)
-                    result = await cursor.fetchone()
-                    stats['active_strikes'] = result[0] if result else 0
-                    
-                    # Unique players banned
-                    await cursor.execute("SELECT COUNT(DISTINCT buid) FROM ban_history WHERE is_unban = FALSE")
-                    result = await cursor.fetchone()
-                    stats['unique_players_banned'] = result[0] if result else 0
-                    
-                    # Bans this month
-                    await cursor.execute("""
-                        SELECT COUNT(*) FROM ban_history 
-                        WHERE is_unban = FALSE 
-                        AND timestamp >= DATE_SUB(NOW(), INTERVAL 1 MONTH)
-                    """)
-                    result = await cursor.fetchone()
-                    stats['bans_this_month'] = result[0] if result else 0
-                    
-                    return stats
+                async with connection.cursor(self.backend.dict_cursor) as cursor:
+                    # "This month" is measured on the database clock, which stamped the rows
+                    await cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+                    now = self._as_datetime((await cursor.fetchone())['now'])
+                    await cursor.execute(query, (now - timedelta(days=30),))
+                    row = await cursor.fetchone()
+            return {key: int(value) for key, value in row.items()}
                     
         except Exception as e:
             print(f"❌ Error getting ban statistics: {e}")
             return {}
     
-    async def search_bans(self, search_term: str, limit: int = 20) -> List[Dict]:
-        """Search bans by player name, BUID, or ban number"""
+    async def refresh_statistics(self, top: int = 10) -> Optional[Dict]:
+        """Recompute the dashboard snapshot served by /banstats.
+        
+        Runs the totals query plus the per-offense and per-moderator breakdowns
+        and swaps the result into `self.stats_snapshot`. Called periodically by
+        HistoryCog, so commands only ever read the snapshot. On failure the
+        previous snapshot is kept.
+        """
+        if not self.pool:
+            return None
+        
+        totals = await self.get_ban_statistics()
+        if not totals:
+            return None
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute("""
+                        SELECT offense, COUNT(*) AS bans FROM ban_history
+                        WHERE is_unban = FALSE
+                        GROUP BY offense
+                        ORDER BY bans DESC
+                        LIMIT %s
+                    """, (top,))
+                    by_offense = [(offense, int(count)) for offense, count in await cursor.fetchall()]
+                    await cursor.execute("""
+                        SELECT submitted_by, SUM(is_unban = FALSE) AS bans, SUM(is_unban = TRUE) AS unbans
+                        FROM ban_history
+                        GROUP BY submitted_by
+                        ORDER BY COUNT(*) DESC
+                        LIMIT %s
+                    """, (top,))
+                    by_moderator = [(mod, int(bans), int(unbans)) for mod, bans, unbans in await cursor.fetchall()]
+        except Exception as e:
+            print(f"❌ Error refreshing ban statistics breakdowns: {e}")
+            return None
+        
+        self.stats_snapshot = {
+            'totals': totals,
+            'by_offense': by_offense,
+            'by_moderator': by_moderator,
+            'refreshed_at': datetime.utcnow()
+        }
+        return self.stats_snapshot
+    
+    async def search_bans(self, search_term: str, limit: int = 20) -> List['BanRecord']:
+        """Search bans by ban number, BUID, player name or offense, best matches first.
+        
+        Exact ban-number and BUID hits come first (unique key / idx_buid_timestamp).
+        The rest comes from ban_search_tokens: every word of the term must prefix
+        a word of the player name or offense, ranked by name hits, then
+        whole-word hits, then recency. Nothing here scans ban_history.
+        """
         if not self.pool:
             return []
         
+        term = search_term.strip()
+        if not term:
+            return []
+        
         try:
-            query = """
-            SELECT * FROM ban_history 
-            WHERE player_name LIKE %s 
-            OR buid LIKE %s 
-            OR ban_number LIKE %s 
-            OR offense LIKE %s
-            ORDER BY timestamp DESC 
-            LIMIT %s
-            """
-            
-            search_pattern = f"%{search_term}%"
-            
             async with self.pool.acquire() as connection:
-                async with connection.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query, (search_pattern, search_pattern, search_pattern, search_pattern, limit))
-                    rows = await cursor.fetchall()
+                async with connection.cursor() as cursor:
+                    results: List[BanRecord] = []
+                    seen = set()
+                    
+                    def take(rows):
+                        for row in rows:
+                            record = BanRecord.from_row(row)
+                            if record.id not in seen and len(results) < limit:
+                                seen.add(record.id)
+                                results.append(record)
+                    
+                    ban_number = normalize_ban_number(term)
+                    if ban_number:
+                        await cursor.execute(
+                            f"SELECT {LIST_COLUMNS_SQL} FROM ban_history WHERE ban_number = %s", (ban_number,)
+                        )
+                        take(await cursor.fetchall())
+                    
+                    await cursor.execute(f"""
+                        SELECT {LIST_COLUMNS_SQL} FROM ban_history
+                        WHERE buid = %s ORDER BY timestamp DESC, id DESC LIMIT %s
+                    """, (term, limit))
+                    take(await cursor.fetchall())
                     
-                    results = []
-                    for row in rows:
-                        results.append({
-                            'id': row['id'],
-                            'ban_number': row['ban_number'],
-                            'player_name': row['player_name'],
-                            'buid': row['buid'],
-                            'offense': row['offense'] or '',
-                            'strike': row['strike'] or '',
-                            'sanction': row['sanction'] or '',
-                            'timestamp': row['timestamp'].isoformat() if row['timestamp'] else '',
-                            'is_unban': bool(row['is_unban']),
-                            'strike_removed': bool(row['strike_removed'])
-                        })
+                    tokens = tokenize(term)
+                    if tokens and len(results) < limit:
+                        query, params = build_token_query(tokens, limit)
+                        await cursor.execute(query, params)
+                        ranked_ids = [row[0] for row in await cursor.fetchall() if row[0] not in seen]
+                        if ranked_ids:
+                            placeholders = ", ".join(["%s"] * len(ranked_ids))
+                            await cursor.execute(
+                                f"SELECT {LIST_COLUMNS_SQL} FROM ban_history WHERE id IN ({placeholders})", ranked_ids
+                            )
+                            by_id = {row[0]: row for row in await cursor.fetchall()}
+                            take(by_id[ban_id] for ban_id in ranked_ids if ban_id in by_id)
                     
                     return results
                     
@@ -447,39 +1304,65 @@ class BanTracker:
     
     async def get_players_with_multiple_bans(self, min_bans: int = 2) -> List[Dict]:
         """Get players who have multiple bans"""
+        offenders = []
+        cursor = None
+        while True:
+            page = await self.get_repeat_offenders_page(min_bans, cursor, limit=500)
+            offenders.extend(page['entries'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return offenders
+    
+    async def get_repeat_offenders_page(self, min_bans: int = 2, cursor: Optional[Tuple[int, int, str]] = None,
+                                        limit: int = 10) -> Dict:
+        """One page of player_summary, most active strikes first.
+        
+        Walks idx_repeat_offenders backwards; `cursor` is the
+        (active_strikes, total_bans, buid) of the previous page's last row.
+        """
+        page = {'entries': [], 'next_cursor': None}
         if not self.pool:
-            return []
+            return page
         
-        try:
-            query = """
-            SELECT buid, player_name, COUNT(*) as ban_count,
-                   SUM(CASE WHEN is_unban = FALSE AND strike_removed = FALSE THEN 1 ELSE 0 END) as active_strikes
-            FROM ban_history 
-            WHERE is_unban = FALSE
-            GROUP BY buid, player_name
-            HAVING ban_count >= %s
-            ORDER BY ban_count DESC, active_strikes DESC
+        query = """
+        SELECT buid, player_name, total_bans, active_strikes, last_ban_at
+        FROM player_summary
+        WHERE total_bans >= %s
+        """
+        params: list = [min_bans]
+        if cursor is not None:
+            strikes, bans, buid = cursor
+            query += """
+            AND (active_strikes < %s
+                 OR (active_strikes = %s AND total_bans < %s)
+                 OR (active_strikes = %s AND total_bans = %s AND buid < %s))
             """
-            
+            params += [strikes, strikes, bans, strikes, bans, buid]
+        query += " ORDER BY active_strikes DESC, total_bans DESC, buid DESC LIMIT %s"
+        params.append(limit + 1)
+        
+        try:
             async with self.pool.acquire() as connection:
-                async with connection.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query, (min_bans,))
-                    rows = await cursor.fetchall()
-                    
-                    repeat_offenders = []
-                    for row in rows:
-                        repeat_offenders.append({
-                            'buid': row['buid'],
-                            'player_name': row['player_name'],
-                            'total_bans': row['ban_count'],
-                            'active_strikes': row['active_strikes']
-                        })
-                    
-                    return repeat_offenders
+                async with connection.cursor(self.backend.dict_cursor) as db_cursor:
+                    await db_cursor.execute(query, params)
+                    rows = await db_cursor.fetchall()
+            
+            for row in rows[:limit]:
+                page['entries'].append({
+                    'buid': row['buid'],
+                    'player_name': row['player_name'],
+                    'total_bans': int(row['total_bans']),
+                    'active_strikes': int(row['active_strikes']),
+                    'last_ban_at': row['last_ban_at']
+                })
+            if len(rows) > limit:
+                last = page['entries'][-1]
+                page['next_cursor'] = (last['active_strikes'], last['total_bans'], last['buid'])
+            return page
                     
         except Exception as e:
             print(f"❌ Error getting repeat offenders: {e}")
-            return []
+            return page
     
     async def health_check(self) -> Dict[str, any]:
         """Check database connection and basic functionality"""
@@ -502,10 +1385,13 @@ class BanTracker:
                     # Check if we can connect
                     health['database_connected'] = True
                     
-                    # Check if tables exist
-                    await cursor.execute("SHOW TABLES LIKE 'ban_history'")
-                    result = await cursor.fetchone()
-                    health['tables_exist'] = bool(result)
+                    # Check if tables exist (a portable probe; SHOW TABLES is MySQL-only)
+                    try:
+                        await cursor.execute("SELECT 1 FROM ban_history LIMIT 1")
+                        await cursor.fetchall()
+                        health['tables_exist'] = True
+                    except Exception:
+                        health['tables_exist'] = False
                     
                     if health['tables_exist']:
                         # Check if we can read
@@ -0,0 +1,291 @@
+# ban_io.py
+"""
+Streaming import/export of ban_history as CSV or JSONL.
+
+    python -m ban_io export bans.jsonl
+    python -m ban_io export bans.csv --resume          # continue an interrupted export
+    python -m ban_io import legacy.csv
+    python -m ban_io import legacy.csv --resume        # skip the records already imported
+
+Uses the BAN_DB_* settings from .env, like the bot. The format follows the file
+extension (.csv / .jsonl) unless --format is given. Columns are the
+ban_history columns (see DETAIL_COLUMNS); extra columns are ignored and missing
+optional ones get defaults. Legacy data in another database (e.g. Postgres)
+can be brought over by exporting it to CSV first (`\\copy ... TO ... CSV HEADER`).
+
+Both directions work in chunks, so memory use does not grow with the table.
+Progress is written to `<file>.checkpoint` after every committed chunk:
+exports record the last exported id, imports the number of input records done.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from ban_history import (BanTracker, DETAIL_COLUMNS, DETAIL_COLUMNS_SQL, backfill_player_summary,
+                         backfill_rollups, backfill_search_tokens)
+from utils.ban_search import normalize_ban_number
+
+BOOLEAN_COLUMNS = ('is_unban', 'strike_removed')
+IMPORT_COLUMNS = ('ban_number', 'ban_seq', 'player_name', 'buid', 'offense', 'strike', 'sanction',
+                  'transcript', 'submitted_by', 'timestamp', 'is_unban', 'related_ban_id', 'strike_removed')
+
+
+def detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def read_checkpoint(path: str) -> int:
+    try:
+        with open(f"{path}.checkpoint", "r") as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def write_checkpoint(path: str, value: int):
+    tmp_path = f"{path}.checkpoint.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(str(value))
+    os.replace(tmp_path, f"{path}.checkpoint")
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 't')
+
+
+def _parse_timestamp(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if value:
+        return datetime.fromisoformat(str(value).strip().replace('Z', '').replace(' ', 'T'))
+    return datetime.utcnow()
+
+
+def prepare_record(record: Dict, keep_ids: bool) -> tuple:
+    """Map one input record onto the INSERT parameters (id first when keep_ids)"""
+    ban_number = normalize_ban_number(str(record['ban_number'])) or str(record['ban_number']).strip()
+    is_unban = _parse_bool(record.get('is_unban', False)) or ban_number.startswith('UNBAN-')
+    digits = ban_number[6:] if ban_number.startswith('UNBAN-') else ban_number
+    related = record.get('related_ban_id') if keep_ids else None
+    values = (
+        ban_number, int(digits) if digits.isdigit() else None,
+        record['player_name'], record['buid'], record.get('offense') or '', record.get('strike') or '',
+        record.get('sanction') or '', record.get('transcript') or '', str(record.get('submitted_by') or 'import'),
+        _parse_timestamp(record.get('timestamp')), is_unban,
+        int(related) if related not in (None, '') else None,
+        _parse_bool(record.get('strike_removed', False)),
+    )
+    return ((int(record['id']),) if keep_ids else ()) + values
+
+
+def iter_records(path: str, fmt: str) -> Iterator[Dict]:
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+async def export_bans(tracker: BanTracker, path: str, fmt: str, chunk_size: int, resume: bool) -> int:
+    """Stream ban_history to `path` in id order. Returns rows written this run."""
+    last_id = read_checkpoint(path) if resume else 0
+    mode = "a" if resume and last_id else "w"
+    written, started = 0, time.perf_counter()
+
+    with open(path, mode, newline="", encoding="utf-8") as out:
+        writer = None
+        if fmt == 'csv':
+            writer = csv.writer(out)
+            if mode == "w":
+                writer.writerow(DETAIL_COLUMNS)
+
+        async with tracker.pool.acquire() as connection:
+            # Streaming cursor (SSCursor on MySQL): rows come off the socket instead of
+            # the whole result set being buffered
+            async with connection.cursor(tracker.backend.stream_cursor) as cursor:
+                await cursor.execute(
+                    f"SELECT {DETAIL_COLUMNS_SQL} FROM ban_history WHERE id > %s ORDER BY id", (last_id,)
+                )
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        if writer:
+                            writer.writerow([_serialize(value) for value in row])
+                        else:
+                            out.write(json.dumps({c: _serialize(v) for c, v in zip(DETAIL_COLUMNS, row)}) + "\n")
+                    out.flush()
+                    last_id = rows[-1][0]
+                    write_checkpoint(path, last_id)
+                    written += len(rows)
+                    print(f"  … {written:,} rows exported (up to id {last_id})")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Exported {written:,} rows to {path} in {elapsed:.1f}s ({written / elapsed if elapsed else 0:,.0f} rows/s)")
+    return written
+
+
+async def import_bans(tracker: BanTracker, path: str, fmt: str, chunk_size: int, resume: bool,
+                      keep_ids: bool = False) -> int:
+    """Stream records from `path` into ban_history. Returns rows inserted this run.
+
+    Records whose ban_number (or id, with keep_ids) already exists in the table
+    or earlier in the file are skipped, so re-running an import is safe. Every
+    skipped record is logged with its number and reason, and the totals per
+    reason are printed at the end. Rollups, player summaries and search tokens
+    are rebuilt once at the end, and the number counters re-seeded.
+    """
+    done = read_checkpoint(path) if resume else 0
+    columns = (('id',) if keep_ids else ()) + IMPORT_COLUMNS
+    number_index = columns.index('ban_number')
+    # Plain INSERT: INSERT IGNORE would also turn truncation and NOT NULL errors into warnings
+    query = f"""
+        INSERT INTO ban_history ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+    """
+    seen, inserted, started = 0, 0, time.perf_counter()
+    skipped: Dict[str, int] = {}
+    batch: List[tuple] = []  # (record number, INSERT parameters)
+    batch_numbers: Dict[str, int] = {}
+    batch_ids: Dict[int, int] = {}
+
+    def skip(record_no: int, reason: str, detail: str):
+        skipped[reason] = skipped.get(reason, 0) + 1
+        print(f"⚠️ Skipping record {record_no}: {detail}")
+
+    async with tracker.pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            async def existing(column: str, values) -> set:
+                placeholders = ', '.join(['%s'] * len(values))
+                await cursor.execute(f"SELECT {column} FROM ban_history WHERE {column} IN ({placeholders})",
+                                     tuple(values))
+                return {row[0] for row in await cursor.fetchall()}
+
+            async def flush():
+                nonlocal inserted
+                taken_numbers = await existing('ban_number', batch_numbers)
+                taken_ids = await existing('id', batch_ids) if keep_ids else set()
+                rows = []
+                for record_no, values in batch:
+                    if values[number_index] in taken_numbers:
+                        skip(record_no, "ban_number exists", f"ban_number {values[number_index]} already exists")
+                    elif keep_ids and values[0] in taken_ids:
+                        skip(record_no, "id exists", f"id {values[0]} already exists")
+                    else:
+                        rows.append((record_no, values))
+
+                if rows:
+                    # One multi-row INSERT per chunk, in a transaction so a bad row leaves nothing behind
+                    await connection.begin()
+                    try:
+                        await cursor.executemany(query, [values for _, values in rows])
+                        await connection.commit()
+                        inserted += len(rows)
+                    except Exception:
+                        await connection.rollback()
+                        # Find the offending rows: insert one at a time, each committed on its own
+                        for record_no, values in rows:
+                            try:
+                                await cursor.execute(query, values)
+                                inserted += 1
+                            except Exception as e:
+                                skip(record_no, "rejected by database", f"rejected by the database ({e})")
+
+                write_checkpoint(path, seen)
+                print(f"  … {seen:,} records read, {inserted:,} inserted, {sum(skipped.values()):,} skipped")
+                batch.clear()
+                batch_numbers.clear()
+                batch_ids.clear()
+
+            for record in iter_records(path, fmt):
+                seen += 1
+                if seen <= done:
+                    continue
+                try:
+                    values = prepare_record(record, keep_ids)
+                except (KeyError, ValueError) as e:
+                    skip(seen, "unreadable", repr(e))
+                    continue
+                ban_number = values[number_index]
+                if ban_number in batch_numbers:
+                    skip(seen, "duplicate in file", f"ban_number {ban_number} repeats record {batch_numbers[ban_number]}")
+                    continue
+                if keep_ids and values[0] in batch_ids:
+                    skip(seen, "duplicate in file", f"id {values[0]} repeats record {batch_ids[values[0]]}")
+                    continue
+                # Repeats in earlier chunks are caught by the existence check, since those rows are committed
+                batch_numbers[ban_number] = seen
+                if keep_ids:
+                    batch_ids[values[0]] = seen
+                batch.append((seen, values))
+                if len(batch) >= chunk_size:
+                    await flush()
+            if batch:
+                await flush()
+            write_checkpoint(path, seen)
+
+            print("🔧 Rebuilding rollups, player summaries and search tokens...")
+            # DELETE + INSERT ... SELECT in one transaction, so the bot never reads empty rollups
+            await connection.begin()
+            try:
+                await backfill_rollups(cursor)
+                await connection.commit()
+            except Exception:
+                await connection.rollback()
+                raise
+            await backfill_player_summary(cursor)
+            await backfill_search_tokens(cursor)
+            await tracker._seed_counters(cursor)
+
+    tracker._player_cache.clear()
+    elapsed = time.perf_counter() - started
+    print(f"✅ Imported {inserted:,} of {seen - done:,} records from {path} in {elapsed:.1f}s "
+          f"({(seen - done) / elapsed if elapsed else 0:,.0f} rows/s)")
+    if skipped:
+        print("⚠️ Skipped " + ", ".join(f"{count:,} ({reason})" for reason, count in skipped.items()))
+    return inserted
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("direction", choices=("import", "export"))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--resume", action="store_true", help="Continue from <path>.checkpoint")
+    parser.add_argument("--keep-ids", action="store_true",
+                        help="Import: keep the id and related_ban_id columns (restoring into an empty table)")
+    args = parser.parse_args()
+
+    tracker = BanTracker()
+    await tracker.initialize()
+    try:
+        fmt = detect_format(args.path, args.format)
+        if args.direction == "export":
+            await export_bans(tracker, args.path, fmt, args.chunk_size, args.resume)
+        else:
+            await import_bans(tracker, args.path, fmt, args.chunk_size, args.resume, args.keep_ids)
+    finally:
+        await tracker.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
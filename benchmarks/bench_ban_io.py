@@ -0,0 +1,82 @@
+# benchmarks/bench_ban_io.py
+"""
+Throughput and memory of ban_io import/export against a local, throwaway MySQL.
+
+Writes a synthetic CSV of --rows bans, imports it into a scratch database,
+exports it back out as JSONL and reports rows/sec plus the peak Python heap
+(tracemalloc) of each direction. Peak memory should stay flat as --rows grows.
+
+    python -m benchmarks.bench_ban_io --rows 200000 --chunk-size 2000
+
+Connection settings come from BENCH_DB_HOST / BENCH_DB_PORT / BENCH_DB_USER /
+BENCH_DB_PASSWORD (defaults: localhost:3306, root, empty password).
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import aiomysql
+
+from ban_history import BanTracker
+from ban_io import export_bans, import_bans
+from benchmarks.bench_player_search import random_name
+
+
+def write_csv(path: str, rows: int, rng: random.Random):
+    base = datetime(2022, 1, 1)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("ban_number", "player_name", "buid", "offense", "strike", "sanction",
+                         "submitted_by", "timestamp", "is_unban", "strike_removed"))
+        for seq in range(1, rows + 1):
+            writer.writerow((f"{seq:04d}", random_name(rng), f"{rng.getrandbits(64):016x}", "Team Killing",
+                             "Strike 1", "3 Day Ban", rng.randint(1, 40),
+                             (base + timedelta(minutes=seq)).isoformat(), 0, int(rng.random() < 0.1)))
+
+
+async def measured(label: str, rows: int, coro):
+    tracemalloc.start()
+    started = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {rows / elapsed:10,.0f} rows/s  peak heap {peak / 1024 / 1024:6.1f} MiB")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--database", default="koth_bench_ban_io")
+    args = parser.parse_args()
+
+    host, port = os.getenv("BENCH_DB_HOST", "localhost"), int(os.getenv("BENCH_DB_PORT", 3306))
+    user, password = os.getenv("BENCH_DB_USER", "root"), os.getenv("BENCH_DB_PASSWORD", "")
+    conn = await aiomysql.connect(host=host, port=port, user=user, password=password, autocommit=True)
+    async with conn.cursor() as cursor:
+        await cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+        await cursor.execute(f"CREATE DATABASE `{args.database}`")
+    conn.close()
+
+    tracker = BanTracker()
+    tracker.host, tracker.port, tracker.user, tracker.password = host, port, user, password
+    tracker.database = args.database
+    await tracker.initialize()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = os.path.join(tmp, "bans.csv"), os.path.join(tmp, "bans.jsonl")
+        write_csv(source, args.rows, random.Random(42))
+        await measured("import", args.rows, import_bans(tracker, source, "csv", args.chunk_size, resume=False))
+        await measured("export", args.rows, export_bans(tracker, target, "jsonl", args.chunk_size, resume=False))
+    await tracker.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
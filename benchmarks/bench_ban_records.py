@@ -0,0 +1,82 @@
+# benchmarks/bench_ban_records.py
+"""
+Cost of turning ban_history rows into Python objects, fully offline.
+
+Compares the original read path (DictCursor rows with every column including
+the transcript blob, re-packed into a 13-key dict with an isoformat() call per
+row) against the projected path (plain tuples in LIST_COLUMNS order fed to
+BanRecord.from_row, timestamps left as datetimes). Reports wall time and peak
+allocation per batch via tracemalloc.
+
+    python -m benchmarks.bench_ban_records --rows 1000 --repeat 200
+"""
+import argparse
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from ban_history import BanRecord, LIST_COLUMNS
+
+
+def build_rows(count: int, transcript_size: int):
+    """(dict rows as DictCursor returned them, tuple rows in LIST_COLUMNS order)"""
+    base = datetime(2024, 1, 1)
+    transcript = "x" * transcript_size
+    dict_rows, tuple_rows = [], []
+    for i in range(count):
+        row = {
+            'id': i, 'ban_number': f"{i:04d}", 'player_name': f"Player{i}", 'buid': f"uid-{i % 97}",
+            'offense': "Teamkilling", 'strike': "Strike 1", 'sanction': "24h ban",
+            'submitted_by': "123456789012345678", 'timestamp': base + timedelta(minutes=i),
+            'is_unban': 0, 'related_ban_id': None, 'strike_removed': 0, 'transcript': transcript,
+        }
+        dict_rows.append(row)
+        tuple_rows.append(tuple(row[c] for c in LIST_COLUMNS))
+    return dict_rows, tuple_rows
+
+
+def legacy_convert(rows):
+    return [{
+        'id': row['id'], 'ban_number': row['ban_number'], 'player_name': row['player_name'],
+        'buid': row['buid'], 'offense': row['offense'], 'strike': row['strike'],
+        'sanction': row['sanction'], 'transcript': row['transcript'] or '',
+        'submitted_by': row['submitted_by'], 'timestamp': row['timestamp'].isoformat(),
+        'is_unban': bool(row['is_unban']), 'related_ban_id': row['related_ban_id'],
+        'strike_removed': bool(row['strike_removed']),
+    } for row in rows]
+
+
+def projected_convert(rows):
+    return [BanRecord.from_row(row) for row in rows]
+
+
+def measure(label: str, func, rows, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    per_batch_ms = (time.perf_counter() - started) / repeat * 1000
+
+    tracemalloc.start()
+    result = func(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:<24} {per_batch_ms:8.3f} ms/batch  peak {peak / 1024:8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--transcript-size", type=int, default=120,
+                        help="Bytes of transcript text per row (only the legacy path carries it)")
+    args = parser.parse_args()
+
+    dict_rows, tuple_rows = build_rows(args.rows, args.transcript_size)
+    print(f"{args.rows} rows, {args.repeat} batches")
+    measure("dict rows (original)", legacy_convert, dict_rows, args.repeat)
+    measure("BanRecord.from_row", projected_convert, tuple_rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
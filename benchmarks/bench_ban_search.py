@@ -0,0 +1,135 @@
+# benchmarks/bench_ban_search.py
+"""
+Latency of BanTracker.search_bans: the original four-way LIKE scan vs. the token index.
+
+Needs a local, throwaway MySQL 8.x / MariaDB 10.2+ server. A scratch database
+is migrated with BanTracker's own migrations and filled with synthetic bans
+(and their ban_search_tokens rows); nothing touches the real ban database.
+
+    python -m benchmarks.bench_ban_search --rows 500000 --queries 200
+
+Connection settings come from BENCH_DB_HOST / BENCH_DB_PORT / BENCH_DB_USER /
+BENCH_DB_PASSWORD (defaults: localhost:3306, root, empty password).
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+import aiomysql
+
+from ban_history import BanTracker, LIST_COLUMNS_SQL
+from punishments import punishments
+from utils.ban_search import index_rows
+from benchmarks.bench_player_search import random_name, report
+
+OFFENSES = [name for name in punishments if name != "Custom Punishment"]
+
+LEGACY_QUERY = f"""
+    SELECT {LIST_COLUMNS_SQL} FROM ban_history
+    WHERE player_name LIKE %s OR buid LIKE %s OR ban_number LIKE %s OR offense LIKE %s
+    ORDER BY timestamp DESC
+    LIMIT %s
+"""
+
+
+async def load_bans(tracker: BanTracker, rows: int, rng: random.Random):
+    async with tracker.pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute("SELECT COUNT(*) FROM ban_history")
+            if (await cursor.fetchone())[0] >= rows:
+                print(f"Reusing existing {rows:,}+ rows")
+                return
+            for table in ("ban_search_tokens", "ban_rollups", "ban_history"):
+                await cursor.execute(f"DELETE FROM {table}")
+
+            base = datetime.utcnow() - timedelta(days=3 * 365)
+            chunk = 5_000
+            started = time.perf_counter()
+            for offset in range(0, rows, chunk):
+                bans, tokens = [], []
+                for seq in range(offset + 1, min(offset + chunk, rows) + 1):
+                    name, offense = random_name(rng), rng.choice(OFFENSES)
+                    bans.append((seq, f"{seq:04d}", seq, name, f"{rng.getrandbits(64):016x}", offense,
+                                 "Strike 1", "3 Day Ban", "", str(rng.randint(1, 40)),
+                                 base + timedelta(minutes=seq * 3)))
+                    tokens.extend(index_rows(seq, name, offense))
+                await cursor.executemany("""
+                    INSERT INTO ban_history (id, ban_number, ban_seq, player_name, buid, offense, strike,
+                        sanction, transcript, submitted_by, timestamp)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, bans)
+                await cursor.executemany(
+                    "INSERT IGNORE INTO ban_search_tokens (token, ban_id, field) VALUES (%s, %s, %s)", tokens
+                )
+            await cursor.execute("ANALYZE TABLE ban_history, ban_search_tokens")
+            await cursor.fetchall()
+            print(f"Loaded {rows:,} bans in {time.perf_counter() - started:.1f}s")
+
+
+async def time_legacy(tracker: BanTracker, terms: list) -> list:
+    samples = []
+    async with tracker.pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            for term in terms:
+                pattern = f"%{term}%"
+                started = time.perf_counter()
+                await cursor.execute(LEGACY_QUERY, (pattern, pattern, pattern, pattern, 20))
+                await cursor.fetchall()
+                samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def time_indexed(tracker: BanTracker, terms: list) -> list:
+    samples = []
+    for term in terms:
+        started = time.perf_counter()
+        await tracker.search_bans(term, limit=20)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--database", default="koth_bench_bans")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    host, port = os.getenv("BENCH_DB_HOST", "localhost"), int(os.getenv("BENCH_DB_PORT", 3306))
+    user, password = os.getenv("BENCH_DB_USER", "root"), os.getenv("BENCH_DB_PASSWORD", "")
+    conn = await aiomysql.connect(host=host, port=port, user=user, password=password, autocommit=True)
+    async with conn.cursor() as cursor:
+        await cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{args.database}`")
+    conn.close()
+
+    tracker = BanTracker()
+    tracker.host, tracker.port, tracker.user, tracker.password = host, port, user, password
+    tracker.database = args.database
+    await tracker.initialize()
+    await load_bans(tracker, args.rows, rng)
+
+    # Name fragments, offense words, two-word queries and ban numbers, as moderators type them
+    terms = []
+    for _ in range(args.queries):
+        kind = rng.random()
+        if kind < 0.4:
+            terms.append(random_name(rng).lower()[:rng.randint(3, 6)])
+        elif kind < 0.7:
+            terms.append(rng.choice(OFFENSES).split()[0].lower())
+        elif kind < 0.9:
+            terms.append(f"{random_name(rng).lower()[:4]} {rng.choice(OFFENSES).split()[0].lower()[:4]}")
+        else:
+            terms.append(str(rng.randint(1, args.rows)))
+
+    report("LIKE", await time_legacy(tracker, terms))
+    report("TOKENS", await time_indexed(tracker, terms))
+    await tracker.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,356 @@
+# benchmarks/bench_ban_workflow.py
+"""
+End-to-end load test of the /ban_player wizard, from the slash command to Approve.
+
+Drives BanCog's real views and callbacks with fake discord.Interaction objects:
+search modal -> player select -> offense -> strike -> (sanction) -> transcript
+type -> transcript -> Submit for Review -> Approve. Nothing talks to Discord;
+every REST call the bot would make (edit_message, followup.send, channel.send,
+message.edit, add_reaction) can be given a simulated latency with --api-latency.
+
+The ban database is a local stand-in: a scratch SQLite file by default, or a
+throwaway MySQL database with --backend mysql (BENCH_DB_HOST / BENCH_DB_PORT /
+BENCH_DB_USER / BENCH_DB_PASSWORD, defaults localhost:3306, root, empty
+password). Reports per-step latency and approvals/sec at --concurrency
+moderators working in parallel.
+
+    python -m benchmarks.bench_ban_workflow --flows 500 --concurrency 8
+    python -m benchmarks.bench_ban_workflow --backend mysql --pool-size 4 --concurrency 16 --api-latency 80
+
+Only ban flows are driven; unban flows branch off at the offense step into
+history lookups that the approve step already exercises.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+import discord
+
+from ban_history import ban_tracker
+from cogs.ban_cog import BanCog
+from punishments import punishments
+from utils.config_manager import ConfigStore
+from utils.form_state import FormStateStore
+from utils.permissions_utils import permissions
+from utils.transcript_catalog import transcript_catalog
+from benchmarks.bench_player_search import random_name, report
+
+GUILD_ID = 1
+PENDING_CHANNEL_ID = 500
+MODERATOR_ROLE_ID = 700
+TRANSCRIPT_CHANNEL_ID = 600
+STEPS = ("command", "search", "player", "offense", "strike", "sanction",
+         "transcript_type", "transcript", "confirm", "approve")
+
+
+class FakeAPI:
+    """Simulated Discord REST latency, shared by every fake object"""
+    latency = 0.0
+    calls = 0
+
+    @classmethod
+    async def call(cls):
+        cls.calls += 1
+        if cls.latency:
+            await asyncio.sleep(cls.latency)
+
+
+class FakeMessage:
+    _next_id = 10_000
+
+    def __init__(self, channel_id: int, content=None, embed=None, view=None):
+        FakeMessage._next_id += 1
+        self.id = FakeMessage._next_id
+        self.channel_id = channel_id
+        self.content = content
+        self.embeds = [embed] if embed else []
+        self.view = view
+        self.attachments = []
+        self.jump_url = f"https://discord.com/channels/{GUILD_ID}/{channel_id}/{self.id}"
+
+    def apply(self, kwargs):
+        if "content" in kwargs:
+            self.content = kwargs["content"]
+        if "embed" in kwargs:
+            self.embeds = [kwargs["embed"]] if kwargs["embed"] else []
+        if "view" in kwargs:
+            self.view = kwargs["view"]
+
+    async def edit(self, **kwargs):
+        await FakeAPI.call()
+        self.apply(kwargs)
+        return self
+
+    async def add_reaction(self, emoji):
+        await FakeAPI.call()
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str, history=()):
+        self.id = channel_id
+        self.name = name
+        self.category = None
+        self._history = list(history)
+        self.sent = {}
+
+    def permissions_for(self, member):
+        return SimpleNamespace(read_message_history=True)
+
+    async def history(self, limit: int = 100):
+        await FakeAPI.call()
+        for message in self._history[:limit]:
+            yield message
+
+    async def send(self, content=None, *, embed=None, view=None):
+        await FakeAPI.call()
+        message = FakeMessage(self.id, content, embed, view)
+        self.sent[message.id] = message
+        return message
+
+
+def build_guild(transcripts: int) -> SimpleNamespace:
+    uploads = []
+    for number in range(transcripts, 0, -1):
+        message = FakeMessage(TRANSCRIPT_CHANNEL_ID)
+        message.attachments = [SimpleNamespace(filename=f"report-{number}.html")]
+        uploads.append(message)
+    channels = {
+        PENDING_CHANNEL_ID: FakeChannel(PENDING_CHANNEL_ID, "pending-bans"),
+        TRANSCRIPT_CHANNEL_ID: FakeChannel(TRANSCRIPT_CHANNEL_ID, "report-transcripts", uploads),
+    }
+    return SimpleNamespace(id=GUILD_ID, me=object(), text_channels=list(channels.values()),
+                           get_channel=channels.get)
+
+
+class FakeResponse:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+        self._done = False
+        self.modal = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_modal(self, modal):
+        await FakeAPI.call()
+        self._done, self.modal = True, modal
+
+    async def defer(self, **kwargs):
+        await FakeAPI.call()
+        self._done = True
+
+    async def edit_message(self, **kwargs):
+        await FakeAPI.call()
+        self._done = True
+        self._interaction.message.apply(kwargs)
+
+    async def send_message(self, content=None, **kwargs):
+        await FakeAPI.call()
+        self._done = True
+        self._interaction.message = FakeMessage(0, content, kwargs.get("embed"), kwargs.get("view"))
+
+
+class FakeFollowup:
+    def __init__(self, interaction: 'FakeInteraction'):
+        self._interaction = interaction
+
+    async def send(self, content=None, *, embed=None, view=None, ephemeral=False):
+        await FakeAPI.call()
+        message = FakeMessage(0, content, embed, view)
+        if view is not None:
+            # The wizard's ephemeral message; later steps are interactions on it
+            self._interaction.message = message
+        return message
+
+
+class FakeInteraction:
+    """The parts of discord.Interaction that BanCog touches"""
+
+    def __init__(self, user, guild, message: FakeMessage = None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id
+        self.message = message
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+    async def edit_original_response(self, **kwargs):
+        await FakeAPI.call()
+        self.message.apply(kwargs)
+
+    async def original_response(self):
+        return self.message
+
+
+class FakePlayerDB:
+    """In-memory stand-in for the game server's PlayerProfiles search"""
+
+    def __init__(self, players: list, latency: float):
+        self.by_name = {p["Name"].lower(): p for p in players}
+        self.latency = latency
+
+    async def find_players(self, search_term: str) -> list:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        exact = self.by_name.get(search_term.lower())
+        return [exact] if exact else []
+
+
+def make_user(user_id: int, role_ids=()) -> SimpleNamespace:
+    return SimpleNamespace(id=user_id, display_name=f"mod{user_id}", mention=f"<@{user_id}>", avatar=None,
+                           roles=[SimpleNamespace(id=role_id) for role_id in role_ids])
+
+
+def pick(view: discord.ui.View, item_type):
+    return next(item for item in view.children if isinstance(item, item_type))
+
+
+class Workflow:
+    def __init__(self, cog: BanCog, guild, players: list, rng: random.Random):
+        self.cog, self.guild, self.players, self.rng = cog, guild, players, rng
+        self.offenses = [name for name, strikes in punishments.items() if strikes]
+        self.samples = defaultdict(list)
+        self.approved = 0
+        self.failed = 0
+
+    async def timed(self, step: str, coro):
+        started = time.perf_counter()
+        await coro
+        self.samples[step].append((time.perf_counter() - started) * 1000)
+
+    async def choose(self, step: str, user, message: FakeMessage, item_type, value: str):
+        item = pick(message.view, item_type)
+        # What discord.py fills in from the component interaction payload
+        item._values = [value]
+        await self.timed(step, item.callback(FakeInteraction(user, self.guild, message)))
+
+    async def run(self, user, approver):
+        cog, rng = self.cog, self.rng
+        player = rng.choice(self.players)
+
+        interaction = FakeInteraction(user, self.guild)
+        await self.timed("command", cog.ban_player_command.callback(cog, interaction))
+        modal = interaction.response.modal
+        modal.search_term_input._value = player["Name"]
+
+        interaction = FakeInteraction(user, self.guild)
+        await self.timed("search", modal.on_submit(interaction))
+        message = interaction.message
+
+        await self.choose("player", user, message, BanCog.PlayerSelect, player["BohemiaUID"])
+        offense = rng.choice(self.offenses)
+        await self.choose("offense", user, message, BanCog.OffenseSelect, offense)
+        strike = rng.choice(list(punishments[offense]))
+        await self.choose("strike", user, message, BanCog.StrikeSelect, strike)
+        if isinstance(punishments[offense][strike], list):
+            await self.choose("sanction", user, message, BanCog.SanctionActualSelect,
+                              rng.choice(punishments[offense][strike]))
+        await self.choose("transcript_type", user, message, BanCog.TranscriptTypeSelect, "report")
+        if isinstance(message.view, BanCog.TranscriptSelectView):
+            select = pick(message.view, BanCog.TranscriptActualSelect)
+            value = rng.choice(list(select.transcript_map) or ["add_later"])
+            await self.choose("transcript", user, message, BanCog.TranscriptActualSelect, value)
+
+        button = pick(message.view, BanCog.InitialConfirmationButton)
+        await self.timed("confirm", button.callback(FakeInteraction(user, self.guild, message)))
+
+        # The submitter is shown the moderation message's jump URL
+        mod_message_id = int(message.content.rstrip("/").rsplit("/", 1)[-1])
+        mod_message = self.guild.get_channel(PENDING_CHANNEL_ID).sent.pop(mod_message_id)
+        approve = pick(mod_message.view, BanCog.ApproveBanButton)
+        await self.timed("approve", approve.callback(FakeInteraction(approver, self.guild, mod_message)))
+        if mod_message.embeds and mod_message.embeds[0].title.startswith("Ban Approved"):
+            self.approved += 1
+        else:
+            self.failed += 1
+
+
+async def open_database(args, tmp_dir: str):
+    if args.backend == "sqlite":
+        ban_tracker.backend_name = "sqlite"
+        ban_tracker.sqlite_path = os.path.join(tmp_dir, "ban_history.sqlite3")
+    else:
+        import aiomysql
+        host, port = os.getenv("BENCH_DB_HOST", "localhost"), int(os.getenv("BENCH_DB_PORT", 3306))
+        user, password = os.getenv("BENCH_DB_USER", "root"), os.getenv("BENCH_DB_PASSWORD", "")
+        conn = await aiomysql.connect(host=host, port=port, user=user, password=password, autocommit=True)
+        async with conn.cursor() as cursor:
+            await cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+            await cursor.execute(f"CREATE DATABASE `{args.database}`")
+        conn.close()
+        ban_tracker.backend_name = "mysql"
+        ban_tracker.host, ban_tracker.port, ban_tracker.user, ban_tracker.password = host, port, user, password
+        ban_tracker.database = args.database
+        ban_tracker.pool_size = args.pool_size
+    await ban_tracker.initialize()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", type=int, default=500, help="Wizards to run to approval")
+    parser.add_argument("--concurrency", type=int, default=8, help="Moderators working in parallel")
+    parser.add_argument("--players", type=int, default=2000, help="Distinct players (fewer = more repeat offenders)")
+    parser.add_argument("--transcripts", type=int, default=50)
+    parser.add_argument("--api-latency", type=float, default=0, help="Simulated ms per Discord REST call")
+    parser.add_argument("--player-db-latency", type=float, default=0, help="Simulated ms per player search")
+    parser.add_argument("--backend", choices=("sqlite", "mysql"), default="sqlite")
+    parser.add_argument("--pool-size", type=int, default=10, help="MySQL pool maxsize")
+    parser.add_argument("--database", default="koth_bench_workflow")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    FakeAPI.latency = args.api_latency / 1000
+    players = {}
+    while len(players) < args.players:
+        name = random_name(rng)
+        players[name.lower()] = {"Name": name, "Level": rng.randint(1, 300), "Last Played": "1H",
+                                 "BohemiaUID": f"{rng.getrandbits(64):016x}"}
+    players = list(players.values())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        await open_database(args, tmp_dir)
+        guild = build_guild(args.transcripts)
+        config = ConfigStore(os.path.join(tmp_dir, "config.json"), reload_interval=0)
+        config.load()
+        config.set("channels", {"pending_bans": PENDING_CHANNEL_ID}, guild_id=guild.id)
+        config.set("moderator_roles", [MODERATOR_ROLE_ID], guild_id=guild.id)
+        permissions.bind(config)
+        bot = SimpleNamespace(
+            user_form_state=FormStateStore(), config=config,
+            player_db=FakePlayerDB(players, args.player_db_latency / 1000),
+            is_moderator_check_func=permissions.is_moderator,
+        )
+        cog = BanCog(bot)
+        # Normally seeded by cog_load before anyone opens the wizard
+        await transcript_catalog.seed(guild, "report")
+        workflow = Workflow(cog, guild, players, rng)
+
+        remaining = iter(range(args.flows))
+
+        async def moderator(index: int):
+            # Each moderator has their own form state; a separate user approves
+            user, approver = make_user(100 + index), make_user(900 + index, [MODERATOR_ROLE_ID])
+            for _ in remaining:
+                await workflow.run(user, approver)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(moderator(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        for step in STEPS:
+            if workflow.samples[step]:
+                report(step, workflow.samples[step])
+        print(f"\n{args.backend}, {args.concurrency} moderators, {args.api_latency:g}ms API latency: "
+              f"{workflow.approved} approved, {workflow.failed} failed in {elapsed:.1f}s "
+              f"-> {workflow.approved / elapsed:,.1f} approvals/s ({FakeAPI.calls:,} simulated API calls)")
+        await ban_tracker.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+# benchmarks/bench_channel_fallback.py
+"""
+Wall-clock cost of the channel fallback player search, fully offline.
+
+Fake guild/channel objects stand in for discord.py: each `history()` call
+sleeps for `--latency` ms (one REST page of up to 100 messages) and then yields
+synthetic messages, some of which carry `Name = ... | BohemiaUID = ...` dumps.
+
+Compares the original sequential scan with ChannelPlayerIndex cold (first
+search, concurrent reads) and warm (every later search, no reads at all).
+
+    python -m benchmarks.bench_channel_fallback --channels 60 --latency 250
+"""
+import argparse
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from utils.channel_index import ChannelPlayerIndex
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, name: str, messages: list, latency: float):
+        self.id = channel_id
+        self.name = name
+        self.category = None
+        self._messages = messages  # newest first
+        self.last_message_id = messages[0].id if messages else None
+        self._latency = latency
+
+    def permissions_for(self, member):
+        return SimpleNamespace(read_message_history=True)
+
+    async def history(self, limit: int = 100, after=None, oldest_first=None):
+        await asyncio.sleep(self._latency)
+        if after is None:
+            for message in self._messages[:limit]:
+                yield message
+        else:
+            newer = [m for m in reversed(self._messages) if m.id > after.id]
+            for message in newer[:limit]:
+                yield message
+
+
+def build_guild(channels: int, dumps_every: int, latency: float, rng: random.Random):
+    next_id = 1
+    text_channels = []
+    for c in range(channels):
+        messages = []
+        for m in range(100):
+            if c % dumps_every == 0 and m % 10 == 0:
+                names = [f"Player{rng.randint(0, 5000)}" for _ in range(5)]
+                content = ", ".join(
+                    f"Name = {n} | Level = {rng.randint(1, 300)} | Last Played = {rng.randint(0, 99)}H | BohemiaUID = uid-{n}"
+                    for n in names
+                )
+            else:
+                content = "just chatting"
+            messages.append(SimpleNamespace(id=next_id, content=content))
+            next_id += 1
+        messages.reverse()
+        text_channels.append(FakeChannel(1000 + c, f"channel-{c}", messages, latency))
+    return SimpleNamespace(text_channels=text_channels, me=object())
+
+
+async def sequential_baseline(guild, search_term: str) -> list:
+    """The pre-index implementation: one channel after another, no reuse."""
+    players = []
+    term = search_term.lower()
+    for channel in guild.text_channels:
+        async for message in channel.history(limit=100):
+            if "Name = " in message.content and "BohemiaUID = " in message.content:
+                for line in message.content.replace(",", "\n").splitlines():
+                    data = dict(part.split(" = ", 1) for part in line.strip().split(" | ") if " = " in part)
+                    if "Name" in data and term in data["Name"].lower():
+                        if not any(p["BohemiaUID"] == data["BohemiaUID"] for p in players):
+                            players.append(data)
+                        if len(players) >= 15:
+                            break
+        if len(players) >= 15:
+            break
+    return players
+
+
+async def timed(label: str, coro):
+    started = time.perf_counter()
+    result = await coro
+    print(f"{label:<28} {time.perf_counter() - started:7.2f}s  ({len(result)} players)")
+    return result
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=60)
+    parser.add_argument("--dumps-every", type=int, default=6, help="Every Nth channel holds player dumps")
+    parser.add_argument("--latency", type=float, default=250, help="Simulated ms per history page")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--term", default="player12")
+    args = parser.parse_args()
+
+    guild = build_guild(args.channels, args.dumps_every, args.latency / 1000, random.Random(7))
+    index = ChannelPlayerIndex()
+    index.concurrency = args.concurrency
+    # Keep the benchmark off the disk: start empty and skip the snapshot writes
+    index._loaded = True
+    index.save = _no_save
+
+    async def indexed_search():
+        await index.refresh_guild(guild, args.term, limit=15)
+        return index.search(guild, args.term, limit=15)
+
+    await timed("sequential (original)", sequential_baseline(guild, args.term))
+    await timed(f"index cold (x{index.concurrency})", indexed_search())
+    await timed("index warm", indexed_search())
+
+
+async def _no_save():
+    return None
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
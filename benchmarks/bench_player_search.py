@@ -0,0 +1,140 @@
+# benchmarks/bench_player_search.py
+"""
+Latency of PlayerDatabaseConnection.find_players: LIKE scan vs. ngram FULLTEXT.
+
+Needs a local, throwaway MySQL 5.7+/8.x server (MariaDB has no ngram parser, so
+only the LIKE numbers are produced there). A scratch database is created and
+filled with synthetic PlayerProfiles rows; nothing touches the real game DB.
+
+    python -m benchmarks.bench_player_search --rows 1000000 --queries 200
+
+Connection settings come from BENCH_DB_HOST / BENCH_DB_PORT / BENCH_DB_USER /
+BENCH_DB_PASSWORD (defaults: localhost:3306, root, empty password).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import aiomysql
+
+from utils.db_utils import PlayerDatabaseConnection
+
+SYLLABLES = ["ka", "ro", "mi", "zen", "tor", "vex", "lu", "shi", "dar", "qu", "nix", "pha", "gor", "el", "sy"]
+
+
+def random_name(rng: random.Random) -> str:
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    if rng.random() < 0.3:
+        name += str(rng.randint(1, 9999))
+    return name.capitalize()
+
+
+async def load_table(conn_args: dict, database: str, rows: int, rng: random.Random):
+    conn = await aiomysql.connect(autocommit=True, **conn_args)
+    async with conn.cursor() as cursor:
+        await cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+        await cursor.execute(f"USE `{database}`")
+        await cursor.execute("DROP TABLE IF EXISTS PlayerProfiles")
+        await cursor.execute("""
+            CREATE TABLE PlayerProfiles (
+                BohemiaUID VARCHAR(64) PRIMARY KEY,
+                Name VARCHAR(64) NOT NULL,
+                Level INT NOT NULL,
+                LastPlayed DATETIME,
+                INDEX idx_last_played (LastPlayed)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """)
+        now = datetime.utcnow()
+        chunk = 10_000
+        started = time.perf_counter()
+        for offset in range(0, rows, chunk):
+            batch = [
+                (f"{offset + i:032x}", random_name(rng), rng.randint(1, 500),
+                 now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)))
+                for i in range(min(chunk, rows - offset))
+            ]
+            await cursor.executemany(
+                "INSERT INTO PlayerProfiles (BohemiaUID, Name, Level, LastPlayed) VALUES (%s, %s, %s, %s)", batch
+            )
+        print(f"Loaded {rows:,} rows in {time.perf_counter() - started:.1f}s")
+    conn.close()
+
+
+async def ensure_fulltext(conn_args: dict, database: str) -> bool:
+    conn = await aiomysql.connect(autocommit=True, db=database, **conn_args)
+    try:
+        async with conn.cursor() as cursor:
+            await cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+            await cursor.execute("ALTER TABLE PlayerProfiles ADD FULLTEXT INDEX ft_name_ngram (Name) WITH PARSER ngram")
+        return True
+    except aiomysql.MySQLError as e:
+        if e.args and e.args[0] == 1061:  # Duplicate key name: index already there
+            return True
+        print(f"FULLTEXT ngram index unavailable on this server: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+async def time_queries(player_db: PlayerDatabaseConnection, terms: list) -> list:
+    samples = []
+    for term in terms:
+        started = time.perf_counter()
+        await player_db.find_players(term)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(label: str, samples: list):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<10} n={len(samples):<5} p50={statistics.median(ordered):8.2f}ms  p99={p99:8.2f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--database", default="koth_bench_players")
+    parser.add_argument("--skip-load", action="store_true", help="Reuse the table from a previous run")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    conn_args = dict(
+        host=os.getenv("BENCH_DB_HOST", "localhost"), port=int(os.getenv("BENCH_DB_PORT", 3306)),
+        user=os.getenv("BENCH_DB_USER", "root"), password=os.getenv("BENCH_DB_PASSWORD", ""),
+        charset="utf8mb4",
+    )
+    if not args.skip_load:
+        await load_table(conn_args, args.database, args.rows, rng)
+
+    # Mix of short and longer fragments, the way moderators actually type names
+    terms = []
+    for _ in range(args.queries):
+        name = random_name(rng).lower()
+        start = rng.randint(0, max(0, len(name) - 3))
+        terms.append(name[start:start + rng.randint(3, 6)])
+
+    player_db = PlayerDatabaseConnection()
+    player_db.host, player_db.port = conn_args["host"], conn_args["port"]
+    player_db.user, player_db.password = conn_args["user"], conn_args["password"]
+    player_db.database = args.database
+
+    await player_db.initialize()
+    player_db.name_search_mode = "like"
+    report("LIKE", await time_queries(player_db, terms))
+
+    if await ensure_fulltext(conn_args, args.database):
+        await player_db._detect_name_index()
+        if player_db.name_search_mode == "fulltext":
+            report("FULLTEXT", await time_queries(player_db, terms))
+    await player_db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,10 +5,11 @@ from discord import app_commands
 from typing import List, Dict, Optional
 
 from ban_history import ban_tracker
+from utils.channel_index import channel_player_index
+from utils.permissions_utils import MODERATOR, require
 # --- FIX: PlayerSearchModal is removed from this top-level import to prevent circular dependency ---
 from ui.shared_ui import PlayerSearchView, search_channels_for_players_fallback
 # PlayerDatabaseConnection is accessed via self.bot.player_db
-# is_moderator from utils.permissions_utils accessed via self.bot.is_moderator_check_func (defined in main.py)
 
 class AdminCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -53,6 +54,21 @@ class AdminCog(commands.Cog):
         await interaction.response.send_modal(modal)
 
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild:
+            channel_player_index.ingest_message(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        # The raw event also fires for messages that are no longer in the client cache
+        if payload.guild_id:
+            channel_player_index.ingest_message(payload.message)
+
+    @commands.Cog.listener()
+    async def on_disconnect(self):
+        channel_player_index.connection_lost()
+
     @app_commands.command(name="find_player", description="Search for a player in the database or channels.")
     async def find_player_command(self, interaction: discord.Interaction):
         # --- FIX: Import is moved here to happen at runtime, breaking the import cycle. ---
@@ -67,19 +83,22 @@ class AdminCog(commands.Cog):
 
     @app_commands.command(name="delete_ban", description="ADMIN: Deletes a ban record by its Ban Number.")
     @app_commands.checks.has_permissions(manage_guild=True)
+    @require(MODERATOR, denied="❌ You do not have the necessary role to use this command.")
     async def delete_ban_command(self, interaction: discord.Interaction, ban_number: str):
-        if not self.bot.is_moderator_check_func(interaction):
-            await interaction.response.send_message(
-                "❌ You do not have the necessary role to use this command.",
-                ephemeral=True
-            )
-            return
-            
         success = await ban_tracker.delete_ban(ban_number)
         if success:
             await interaction.response.send_message(f"🗑️ Ban record `{ban_number}` has been deleted.", ephemeral=True)
         else:
             await interaction.response.send_message(f"⚠️ Could not delete ban record `{ban_number}`. It might not exist or an error occurred.", ephemeral=True)
 
+    @app_commands.command(name="rebuild_rollups", description="ADMIN: Recomputes the ban trend rollups from the full history.")
+    @app_commands.checks.has_permissions(manage_guild=True)
+    async def rebuild_rollups_command(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        if await ban_tracker.rebuild_rollups():
+            await interaction.followup.send("📊 Ban trend rollups have been rebuilt.", ephemeral=True)
+        else:
+            await interaction.followup.send("⚠️ Could not rebuild the ban trend rollups. Check the bot logs.", ephemeral=True)
+
 async def setup(bot: commands.Bot):
     await bot.add_cog(AdminCog(bot))
\ No newline at end of file
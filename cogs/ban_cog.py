@@ -4,49 +4,62 @@ from discord.ext import commands
 from discord import app_commands
 import re
 import traceback
+import asyncio
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 import math
 
 from punishments import punishments
 from ban_history import ban_tracker
-from ui.shared_ui import search_channels_for_players_fallback
+from ui.shared_ui import TrackedView, search_channels_for_players_fallback
+from utils.transcript_catalog import transcript_catalog
+from utils.permissions_utils import MODERATOR, require
 
 async def get_transcript_options(guild: discord.Guild, channel_name_contains: str) -> List[str]:
-    transcript_channel = next((c for c in guild.text_channels if channel_name_contains.lower() in c.name.lower()), None)
-    if not transcript_channel or not transcript_channel.permissions_for(guild.me).read_message_history:
-        return []
-    transcripts = []
-    try:
-        async for message in transcript_channel.history(limit=30):
-            if message.attachments:
-                for att in message.attachments:
-                    if att.filename.endswith(".html"):
-                        transcripts.append(generate_transcript_link(message, transcript_channel.name))
-                        if len(transcripts) >= 20: break
-                if len(transcripts) >= 20: break
-    except discord.Forbidden:
-        print(f"No permission to read history in {transcript_channel.name}")
-    except Exception as e:
-        print(f"Error fetching transcripts from {transcript_channel.name}: {e}")
-    return transcripts
-
-def generate_transcript_link(message: discord.Message, channel_name: str) -> str:
-    for attachment in message.attachments:
-        if attachment.filename.endswith(".html"):
-            match = re.search(r"(\d+)", attachment.filename)
-            label = f"File: {attachment.filename[:80]}"
-            if match:
-                number = int(match.group(1))
-                label_prefix = "Ticket" if "ticket" in channel_name.lower() else "Report"
-                label = f"{label_prefix}-{number:04d}"
-            return f"[{label}](<{message.jump_url}>)"
-    return f"[Attachment Link](<{message.jump_url}>)"
+    return await transcript_catalog.get_links(guild, channel_name_contains)
 
 
 class BanCog(commands.Cog):
+    # Moderation messages edited in parallel during a bulk approval
+    BULK_EDIT_CONCURRENCY = 4
+
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self._seed_task: Optional[asyncio.Task] = None
+        # request_id -> live Approve/Deny view, so a request resolved elsewhere (bulk approve) can stop it
+        self._request_views: Dict[int, 'BanCog.ModerationActionView'] = {}
+
+    async def cog_load(self):
+        # Extensions are loaded from on_ready, so the guild list is already populated
+        self._seed_task = asyncio.create_task(self._seed_transcript_catalog())
+        await self._register_pending_views()
+
+    async def cog_unload(self):
+        if self._seed_task and not self._seed_task.done():
+            self._seed_task.cancel()
+
+    async def _register_pending_views(self):
+        """Re-attach Approve/Deny handlers to every open request from the database."""
+        requeued = await ban_tracker.requeue_unfinished_requests()
+        if requeued:
+            print(f"ℹ️ Returned {requeued} interrupted approval(s) to the pending queue.")
+        pending = await ban_tracker.list_pending_requests()
+        registered = 0
+        for request in pending:
+            if request.get("message_id"):
+                view = self._request_views[request["id"]] = self.ModerationActionView(request["id"], self)
+                self.bot.add_view(view, message_id=request["message_id"])
+                registered += 1
+        print(f"✅ Re-registered {registered} pending ban request view(s).")
+
+    async def _seed_transcript_catalog(self):
+        for guild in self.bot.guilds:
+            for kind in ("report", "ticket"):
+                await transcript_catalog.seed(guild, kind)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        transcript_catalog.ingest_message(message)
 
     async def _update_interaction_message(self, interaction: discord.Interaction, **kwargs):
         """Helper function to reliably edit the original interaction message."""
@@ -61,7 +74,7 @@ class BanCog(commands.Cog):
             except discord.NotFound:
                 view.message = None
 
-    class PlayerView(discord.ui.View):
+    class PlayerView(TrackedView):
         def __init__(self, players: List[Dict], search_term: str, cog_ref: 'BanCog'):
             super().__init__(timeout=300)
             self.players = players
@@ -180,7 +193,7 @@ class BanCog(commands.Cog):
             view = self.cog_ref.OffenseView(player, self.cog_ref)
             await self.cog_ref._update_interaction_message(interaction, content="", embed=embed, view=view)
 
-    class OffenseView(discord.ui.View):
+    class OffenseView(TrackedView):
         def __init__(self, player: Dict, cog_ref: 'BanCog'):
             super().__init__(timeout=300)
             self.player = player
@@ -259,7 +272,7 @@ class BanCog(commands.Cog):
             embed = discord.Embed(title="Select Transcript Type", description="Link a report or ticket transcript to this ban.")
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
-    class StrikeView(discord.ui.View):
+    class StrikeView(TrackedView):
         def __init__(self, player: Dict, offense: str, cog_ref: 'BanCog'):
             super().__init__(timeout=300)
             self.player = player
@@ -317,7 +330,7 @@ class BanCog(commands.Cog):
             
             await self.cog_ref._update_interaction_message(interaction, embed=embed, view=next_view)
 
-    class SanctionChooserView(discord.ui.View):
+    class SanctionChooserView(TrackedView):
         def __init__(self, player: Dict, offense: str, strike_level: str, sanction_list: List[str], cog_ref: 'BanCog'):
             super().__init__(timeout=180)
             self.player, self.offense, self.strike_level, self.cog_ref, self.sanction_list = \
@@ -352,7 +365,7 @@ class BanCog(commands.Cog):
             view = self.cog_ref.TranscriptTypeView(self.player, self.offense, self.strike_level, chosen_sanction, None, self.cog_ref)
             await self.cog_ref._update_interaction_message(interaction, embed=embed, view=view)
 
-    class UnbanReportView(discord.ui.View):
+    class UnbanReportView(TrackedView):
         def __init__(self, player_buid: str, unban_type: str, cog_ref: 'BanCog'):
             super().__init__(timeout=300)
             self.player_buid, self.unban_type, self.cog_ref = player_buid, unban_type, cog_ref
@@ -380,12 +393,12 @@ class BanCog(commands.Cog):
             history = await ban_tracker.get_player_history(self.player_buid)
             options = []
             if history:
-                for ban_record in sorted(history, key=lambda x: x['timestamp'], reverse=True):
-                    if not ban_record.get("is_unban", False):
-                        strike_removed = " (Strike Removed)" if ban_record.get("strike_removed") else ""
-                        label = f"{ban_record['ban_number']} - {ban_record['offense'][:40]}{strike_removed}"
-                        desc = f"{ban_record['timestamp'][:10]} ({ban_record['strike']})"
-                        options.append(discord.SelectOption(label=label, description=desc, value=ban_record["ban_number"]))
+                for ban_record in sorted(history, key=lambda x: x.timestamp or datetime.min, reverse=True):
+                    if not ban_record.is_unban:
+                        strike_removed = " (Strike Removed)" if ban_record.strike_removed else ""
+                        label = f"{ban_record.ban_number} - {ban_record.offense[:40]}{strike_removed}"
+                        desc = f"{ban_record.date} ({ban_record.strike})"
+                        options.append(discord.SelectOption(label=label, description=desc, value=ban_record.ban_number))
                     if len(options) >= 24: break
             
             if not options:
@@ -414,7 +427,7 @@ class BanCog(commands.Cog):
             state["unban_data"] = {
                 "ban_number_to_unban": selected_ban_number, 
                 "remove_strike": self.remove_strike,
-                "related_ban_id": original_ban_details.get('id') if original_ban_details else None
+                "related_ban_id": original_ban_details.id if original_ban_details else None
             }
             state["strike"] = "UNBAN"
             state["sanction"] = "Player Unbanned"
@@ -425,7 +438,7 @@ class BanCog(commands.Cog):
             view = self.cog_ref.TranscriptTypeView(state["player"], state["offense"], "UNBAN", "Player Unbanned", state.get("unban_data"), self.cog_ref)
             await self.cog_ref._update_interaction_message(interaction, embed=embed, view=view)
 
-    class TranscriptTypeView(discord.ui.View):
+    class TranscriptTypeView(TrackedView):
         def __init__(self, player: Dict, offense: str, strike: str, sanction: str, unban_data: Optional[Dict], cog_ref: 'BanCog'):
             super().__init__(timeout=180)
             self.player, self.offense, self.strike, self.sanction, self.unban_data, self.cog_ref = \
@@ -464,7 +477,7 @@ class BanCog(commands.Cog):
             if transcripts_found:
                 embed.title = f"Select Transcript"
                 embed.description = f"Select a transcript from '{transcript_type_keyword}' channels."
-                next_view = self.cog_ref.TranscriptSelectView(transcripts_found, self.parent_view)
+                next_view = self.cog_ref.TranscriptSelectView(transcripts_found, transcript_type_keyword, self.parent_view)
             else:
                 state["transcript_link"] = "N/A (No transcripts found)"
                 embed.title = "Confirm Submission"
@@ -474,12 +487,13 @@ class BanCog(commands.Cog):
 
             await self.cog_ref._update_interaction_message(interaction, embed=embed, view=next_view)
 
-    class TranscriptSelectView(discord.ui.View):
-        def __init__(self, transcripts: List[str], parent_view: 'TranscriptTypeView'):
+    class TranscriptSelectView(TrackedView):
+        def __init__(self, transcripts: List[str], transcript_kind: str, parent_view: 'TranscriptTypeView'):
             super().__init__(timeout=180)
             self.message: Optional[discord.Message] = None
             self.cog_ref = parent_view.cog_ref
             self.add_item(self.cog_ref.TranscriptActualSelect(transcripts, self.cog_ref))
+            self.add_item(self.cog_ref.FindTranscriptButton(transcript_kind, self.cog_ref, row=1))
             self.add_item(self.cog_ref.BackButton("transcript_type", cog_ref=self.cog_ref, row=1))
         async def on_timeout(self):
             if self.message:
@@ -511,17 +525,38 @@ class BanCog(commands.Cog):
             elif chosen_value in self.transcript_map: link_for_output = f"[{self.transcript_map[chosen_value]}](<{chosen_value}>)"
             elif chosen_value.startswith("http"): link_for_output = f"[Transcript Link](<{chosen_value}>)"
             
-            user_id = interaction.user.id
-            self.cog_ref.bot.user_form_state[user_id]["transcript_link"] = link_for_output
-            state = self.cog_ref.bot.user_form_state[user_id]
-            
-            embed = interaction.message.embeds[0]
-            embed.title = "Confirm Submission"
-            embed.description = f"**Preview of Submission:**\n{self.cog_ref._build_confirmation_preview_text(user_id)}"
-            view = self.cog_ref.ConfirmationView(state["player"], state["offense"], state["strike"], state["sanction"], state.get("unban_data"), self.cog_ref)
-            await self.cog_ref._update_interaction_message(interaction, embed=embed, view=view)
+            await self.cog_ref._show_confirmation(interaction, link_for_output)
+
+    class FindTranscriptButton(discord.ui.Button):
+        def __init__(self, transcript_kind: str, cog_ref: 'BanCog', row: Optional[int] = None):
+            super().__init__(label="🔎 Find by Number", style=discord.ButtonStyle.primary, row=row)
+            self.transcript_kind, self.cog_ref = transcript_kind, cog_ref
+
+        async def callback(self, interaction: discord.Interaction):
+            await interaction.response.send_modal(self.cog_ref.TranscriptNumberModal(self.transcript_kind, self.cog_ref))
+
+    class TranscriptNumberModal(discord.ui.Modal, title="Find Transcript by Number"):
+        number_input = discord.ui.TextInput(label="Ticket/Report Number", placeholder="e.g. 1234", required=True, max_length=10)
+
+        def __init__(self, transcript_kind: str, cog_ref: 'BanCog'):
+            super().__init__(timeout=180)
+            self.transcript_kind, self.cog_ref = transcript_kind, cog_ref
+
+        async def on_submit(self, interaction: discord.Interaction):
+            raw_number = self.number_input.value.strip().lstrip("#")
+            if not raw_number.isdigit() or not interaction.guild:
+                await interaction.response.send_message("Please enter a numeric ticket/report number.", ephemeral=True)
+                return
+
+            entry = await transcript_catalog.find_by_number(interaction.guild, self.transcript_kind, int(raw_number))
+            if not entry:
+                await interaction.response.send_message(
+                    f"No {self.transcript_kind} transcript #{int(raw_number):04d} found.", ephemeral=True
+                )
+                return
+            await self.cog_ref._show_confirmation(interaction, entry.link)
 
-    class ConfirmationView(discord.ui.View):
+    class ConfirmationView(TrackedView):
         def __init__(self, player_data: Dict, offense: str, strike: str, sanction: str, unban_data: Optional[Dict], cog_ref: 'BanCog'):
             super().__init__(timeout=300)
             self.message: Optional[discord.Message] = None
@@ -575,19 +610,30 @@ class BanCog(commands.Cog):
                     embed.add_field(name="Offense", value=final_offense, inline=False)
                     embed.add_field(name="Strike Level", value=full_ban_data["strike"], inline=True)
                     embed.add_field(name="Sanction", value=full_ban_data["sanction"], inline=True)
-                    previous_strikes = await ban_tracker.get_player_strikes(player_data.get('BohemiaUID', ''))
-                    if previous_strikes > 0:
-                        embed.add_field(name="⚠️ Previous Active Strikes", value=str(previous_strikes), inline=True)
-                
-                embed.set_footer(text=f"Submitter User ID: {interaction.user.id}")
-
-                mod_view = self.cog_ref.ModerationActionView(full_ban_data, player_name, self.cog_ref)
+                    summary = await ban_tracker.get_player_summary(player_data.get('BohemiaUID', ''))
+                    if summary['active_strikes'] > 0:
+                        embed.add_field(name="⚠️ Previous Active Strikes", value=str(summary['active_strikes']), inline=True)
+                    if summary['last_offense']:
+                        last = summary['last_offense']
+                        embed.add_field(name="Last Offense", value=f"{last.ban_number} - {last.offense[:100]} ({last.date})", inline=False)
                 
-                target_channel_id = self.cog_ref.bot.config.get("channels", {}).get("pending_bans")
+                target_channel_id = self.cog_ref.bot.config.get("channels", {}, guild_id=interaction.guild_id).get("pending_bans")
                 if not (interaction.guild and target_channel_id and (target_channel := interaction.guild.get_channel(target_channel_id))):
                     await self.cog_ref._update_interaction_message(interaction, content="Error: Moderation channel not found.", embed=None, view=None); return
 
-                mod_message = await target_channel.send(embed=embed, view=mod_view)
+                request_id = await ban_tracker.create_pending_request(
+                    full_ban_data, player_name, player_data.get('BohemiaUID', 'N/A'), str(interaction.user.id)
+                )
+                embed.set_footer(text=f"Submitter User ID: {interaction.user.id} | Request #{request_id}")
+                mod_view = self.cog_ref.ModerationActionView(request_id, self.cog_ref)
+                self.cog_ref._request_views[request_id] = mod_view
+
+                try:
+                    mod_message = await target_channel.send(embed=embed, view=mod_view)
+                except discord.HTTPException:
+                    await ban_tracker.resolve_pending_request(request_id, "failed", str(interaction.user.id))
+                    raise
+                await ban_tracker.attach_pending_message(request_id, target_channel.id, mod_message.id)
                 await self.cog_ref._update_interaction_message(
                     interaction,
                     content=f"✅ Your request for **{player_name}** has been submitted: {mod_message.jump_url}",
@@ -603,28 +649,40 @@ class BanCog(commands.Cog):
                 if interaction.user.id in self.cog_ref.bot.user_form_state:
                     del self.cog_ref.bot.user_form_state[interaction.user.id]
 
-    class ModerationActionView(discord.ui.View):
-        def __init__(self, ban_data: Dict, player_name: str, cog_ref: 'BanCog'):
+    class ModerationActionView(TrackedView):
+        """Approve/Deny buttons for a stored request; custom_ids embed the request ID so
+        the view can be re-registered with bot.add_view after a restart."""
+        def __init__(self, request_id: int, cog_ref: 'BanCog'):
             super().__init__(timeout=None)
-            self.add_item(cog_ref.ApproveBanButton(ban_data, cog_ref))
-            self.add_item(cog_ref.DenyBanButton(player_name, cog_ref))
+            self.add_item(cog_ref.ApproveBanButton(request_id, cog_ref))
+            self.add_item(cog_ref.DenyBanButton(request_id, cog_ref))
 
     class ApproveBanButton(discord.ui.Button):
-        def __init__(self, ban_data: Dict, cog_ref: 'BanCog'):
-            super().__init__(label="Approve", style=discord.ButtonStyle.success)
-            self.ban_data, self.cog_ref = ban_data, cog_ref
+        def __init__(self, request_id: int, cog_ref: 'BanCog'):
+            super().__init__(label="Approve", style=discord.ButtonStyle.success, custom_id=f"ban_request:approve:{request_id}")
+            self.request_id, self.cog_ref = request_id, cog_ref
 
+        @require(MODERATOR)
         async def callback(self, interaction: discord.Interaction):
-            if not self.cog_ref.bot.is_moderator_check_func(interaction):
-                await interaction.response.send_message("❌ You don't have permission.", ephemeral=True)
-                return
-            
             await interaction.response.defer()
-            pd = self.ban_data["player_data"]
-            unban_info = self.ban_data.get("unban_data")
+            moderator_id = str(interaction.user.id)
+            # Claim first so a second click (or a second moderator) can't approve twice
+            if not await ban_tracker.resolve_pending_request(self.request_id, "processing", moderator_id):
+                await interaction.followup.send("⚠️ This request has already been handled or could not be loaded.", ephemeral=True)
+                return
+            request = await ban_tracker.get_pending_request(self.request_id)
+            if not request:
+                await ban_tracker.resolve_pending_request(self.request_id, "pending", moderator_id, from_status="processing")
+                await interaction.followup.send("⚠️ Could not load this request from the database. Please try again.", ephemeral=True)
+                return
+            ban_data = request["ban_data"]
+
+            pd = ban_data["player_data"]
+            unban_info = ban_data.get("unban_data")
             is_unban_req = bool(unban_info)
-            final_offense_text = self.ban_data["offense"]
+            final_offense_text = ban_data["offense"]
 
+            ban_number = None
             try:
                 if is_unban_req and unban_info:
                     original_ban_to_unban = unban_info["ban_number_to_unban"]
@@ -635,52 +693,63 @@ class BanCog(commands.Cog):
                         final_offense_text += f" (Strike Kept on {original_ban_to_unban})"
                     ban_number = await ban_tracker.add_ban(
                         player_name=pd.get("Name","N/A"), buid=pd.get("BohemiaUID","N/A"), offense=final_offense_text,
-                        strike="UNBAN", sanction=self.ban_data.get("sanction","Player Unbanned"),
-                        transcript=self.ban_data.get("transcript","N/A"), submitted_by=str(self.ban_data.get("submitted_by_id","Unknown")),
+                        strike="UNBAN", sanction=ban_data.get("sanction","Player Unbanned"),
+                        transcript=ban_data.get("transcript","N/A"), submitted_by=str(ban_data.get("submitted_by_id","Unknown")),
                         is_unban=True, related_ban_id=unban_info.get("related_ban_id")
                     )
                     action_verb = "Unban"
                 else:
                     ban_number = await ban_tracker.add_ban(
-                        player_name=pd.get("Name","N/A"), buid=pd.get("BohemiaUID","N/A"), offense=self.ban_data.get("offense","N/A"),
-                        strike=self.ban_data.get("strike","N/A"), sanction=self.ban_data.get("sanction","N/A"),
-                        transcript=self.ban_data.get("transcript","N/A"), submitted_by=str(self.ban_data.get("submitted_by_id","Unknown"))
+                        player_name=pd.get("Name","N/A"), buid=pd.get("BohemiaUID","N/A"), offense=ban_data.get("offense","N/A"),
+                        strike=ban_data.get("strike","N/A"), sanction=ban_data.get("sanction","N/A"),
+                        transcript=ban_data.get("transcript","N/A"), submitted_by=str(ban_data.get("submitted_by_id","Unknown"))
                     )
                     action_verb = "Ban"
 
-                original_embed = interaction.message.embeds[0]
-                original_embed.title = f"{action_verb} Approved: {pd.get('Name', 'N/A')}"
-                original_embed.color = discord.Color.green()
-                original_embed.add_field(name=f"{action_verb} ID", value=ban_number, inline=False)
-                original_embed.add_field(name="Approved By", value=interaction.user.mention, inline=False)
+                original_embed = self.cog_ref._approved_embed(
+                    interaction.message.embeds[0], action_verb, pd.get('Name', 'N/A'), ban_number, interaction.user.mention
+                )
                 
+                await ban_tracker.resolve_pending_request(self.request_id, "approved", moderator_id, ban_number=ban_number, from_status="processing")
                 await interaction.message.edit(embed=original_embed, view=None)
+                self.cog_ref._stop_request_view(self.request_id)
                 await interaction.message.add_reaction("✅")
 
             except Exception as e:
                 print(f"Error during ban approval process: {e}")
                 traceback.print_exc()
-                error_embed = interaction.message.embeds[0]
-                error_embed.add_field(name="Approval Error", value=f"An error occurred: {e}", inline=False)
-                error_embed.color = discord.Color.dark_red()
-                await interaction.message.edit(embed=error_embed, view=None)
-                await interaction.followup.send(f"An error occurred during approval: {e}", ephemeral=True)
+                if ban_number is None:
+                    # Nothing was recorded: hand the request back to the queue and keep the buttons
+                    await ban_tracker.resolve_pending_request(self.request_id, "pending", moderator_id, from_status="processing")
+                    await interaction.followup.send(
+                        f"❌ Approval failed and no ban was recorded; the request is back in the queue. Error: {e}", ephemeral=True
+                    )
+                else:
+                    # The ban exists, so the request must not be approved a second time
+                    await ban_tracker.resolve_pending_request(self.request_id, "approved", moderator_id, ban_number=ban_number, from_status="processing")
+                    await interaction.followup.send(
+                        f"⚠️ {ban_number} was recorded, but the request message could not be updated: {e}", ephemeral=True
+                    )
 
     class DenyBanButton(discord.ui.Button):
-        def __init__(self, player_name: str, cog_ref: 'BanCog'):
-            super().__init__(label="Deny", style=discord.ButtonStyle.danger)
-            self.player_name, self.cog_ref = player_name, cog_ref
+        def __init__(self, request_id: int, cog_ref: 'BanCog'):
+            super().__init__(label="Deny", style=discord.ButtonStyle.danger, custom_id=f"ban_request:deny:{request_id}")
+            self.request_id, self.cog_ref = request_id, cog_ref
 
+        @require(MODERATOR)
         async def callback(self, interaction: discord.Interaction):
-            if not self.cog_ref.bot.is_moderator_check_func(interaction):
-                await interaction.response.send_message("❌ You don't have permission.", ephemeral=True)
+            if not await ban_tracker.resolve_pending_request(self.request_id, "denied", str(interaction.user.id)):
+                await interaction.response.send_message("⚠️ This request has already been handled.", ephemeral=True)
                 return
             
+            request = await ban_tracker.get_pending_request(self.request_id)
+            player_name = request["player_name"] if request else "Unknown"
             embed = interaction.message.embeds[0]
-            embed.title = f"Request Denied: {self.player_name}"
+            embed.title = f"Request Denied: {player_name}"
             embed.color = discord.Color.red()
             embed.add_field(name="Denied By", value=interaction.user.mention, inline=False)
             await interaction.response.edit_message(embed=embed, view=None)
+            self.cog_ref._stop_request_view(self.request_id)
             await interaction.message.add_reaction("❌")
 
     class BackButton(discord.ui.Button):
@@ -745,6 +814,18 @@ class BanCog(commands.Cog):
                 del self.cog_ref.bot.user_form_state[interaction.user.id]
             await interaction.response.edit_message(content="❌ Ban form cancelled.", view=None, embed=None)
 
+    async def _show_confirmation(self, interaction: discord.Interaction, transcript_link: str):
+        """Store the chosen transcript and move the form on to the confirmation step."""
+        user_id = interaction.user.id
+        self.bot.user_form_state[user_id]["transcript_link"] = transcript_link
+        state = self.bot.user_form_state[user_id]
+
+        embed = interaction.message.embeds[0]
+        embed.title = "Confirm Submission"
+        embed.description = f"**Preview of Submission:**\n{self._build_confirmation_preview_text(user_id)}"
+        view = self.ConfirmationView(state["player"], state["offense"], state["strike"], state["sanction"], state.get("unban_data"), self)
+        await self._update_interaction_message(interaction, embed=embed, view=view)
+
     def _build_confirmation_preview_text(self, user_id: int) -> str:
         state = self.bot.user_form_state.get(user_id, {})
         player = state.get("player", {})
@@ -775,6 +856,192 @@ class BanCog(commands.Cog):
                 f"**Transcript:** {transcript}"
             )
 
+    @staticmethod
+    def _approved_embed(embed: discord.Embed, action_verb: str, player_name: str, ban_number: str, approver_mention: str) -> discord.Embed:
+        embed.title = f"{action_verb} Approved: {player_name}"
+        embed.color = discord.Color.green()
+        embed.add_field(name=f"{action_verb} ID", value=ban_number, inline=False)
+        embed.add_field(name="Approved By", value=approver_mention, inline=False)
+        return embed
+
+    def _stop_request_view(self, request_id: int):
+        """Drop a resolved request's Approve/Deny view from the bot's view store."""
+        view = self._request_views.pop(request_id, None)
+        if view:
+            view.stop()
+
+    @staticmethod
+    def _approved_request_embed(request: Dict, ban_number: str, approver_mention: str) -> discord.Embed:
+        """The approved moderation message, rebuilt from the stored request (no fetch of the old embed)."""
+        ban_data = request["ban_data"]
+        pd = ban_data.get("player_data", {})
+        embed = discord.Embed(color=discord.Color.green(), timestamp=request.get("created_at"))
+        embed.add_field(name="Player", value=request["player_name"], inline=True)
+        embed.add_field(name="BUID", value=pd.get("BohemiaUID", "N/A"), inline=True)
+        embed.add_field(name="Transcript", value=ban_data.get("transcript") or "N/A", inline=False)
+        embed.add_field(name="Offense", value=ban_data.get("offense") or "N/A", inline=False)
+        embed.add_field(name="Strike Level", value=ban_data.get("strike") or "N/A", inline=True)
+        embed.add_field(name="Sanction", value=ban_data.get("sanction") or "N/A", inline=True)
+        embed.add_field(name="Submitted By", value=f"<@{ban_data.get('submitted_by_id', request.get('submitted_by'))}>", inline=True)
+        embed.set_footer(text=f"Submitter User ID: {ban_data.get('submitted_by_id', request.get('submitted_by'))} | Request #{request['id']}")
+        return BanCog._approved_embed(embed, "Ban", request["player_name"], ban_number, approver_mention)
+
+    async def _mark_request_message_approved(self, guild: discord.Guild, request: Dict, ban_number: str,
+                                             approver_mention: str, semaphore: asyncio.Semaphore) -> bool:
+        """Edit one request's moderation message to its approved state (bulk approve): a single REST call."""
+        channel = guild.get_channel(request.get("channel_id") or 0)
+        if not channel or not request.get("message_id"):
+            return False
+        embed = self._approved_request_embed(request, ban_number, approver_mention)
+        async with semaphore:
+            try:
+                await channel.get_partial_message(request["message_id"]).edit(embed=embed, view=None)
+                return True
+            except discord.HTTPException as e:
+                print(f"Could not update moderation message for request #{request['id']}: {e}")
+                return False
+            finally:
+                self._stop_request_view(request["id"])
+
+    class BulkApproveView(TrackedView):
+        def __init__(self, pending: List[Dict], cog_ref: 'BanCog'):
+            super().__init__(timeout=300)
+            self.cog_ref = cog_ref
+            self.selected_ids: List[int] = []
+            options = [
+                discord.SelectOption(
+                    label=f"#{request['id']} {request['player_name']}"[:100],
+                    description=f"{request['buid']} · {request['created_at']:%Y-%m-%d %H:%M}"[:100],
+                    value=str(request["id"])
+                )
+                for request in pending[:25]
+            ]
+            self.add_item(cog_ref.BulkApproveSelect(options, self))
+            self.add_item(cog_ref.BulkApproveButton(self))
+
+    class BulkApproveSelect(discord.ui.Select):
+        def __init__(self, options: List[discord.SelectOption], parent_view: 'BanCog.BulkApproveView'):
+            super().__init__(placeholder="Choose the requests to approve...", options=options,
+                             min_values=1, max_values=len(options))
+            self.parent_view = parent_view
+
+        async def callback(self, interaction: discord.Interaction):
+            self.parent_view.selected_ids = [int(value) for value in self.values]
+            await interaction.response.defer()
+
+    class BulkApproveButton(discord.ui.Button):
+        def __init__(self, parent_view: 'BanCog.BulkApproveView'):
+            super().__init__(label="Approve Selected", style=discord.ButtonStyle.success)
+            self.parent_view = parent_view
+
+        @require(MODERATOR)
+        async def callback(self, interaction: discord.Interaction):
+            cog = self.parent_view.cog_ref
+            if not self.parent_view.selected_ids:
+                await interaction.response.send_message("Select at least one request first.", ephemeral=True)
+                return
+
+            await interaction.response.edit_message(content="⏳ Approving selected requests...", view=None)
+            summary = await cog._bulk_approve(interaction, self.parent_view.selected_ids)
+            await interaction.edit_original_response(content=summary)
+
+    async def _bulk_approve(self, interaction: discord.Interaction, request_ids: List[int]) -> str:
+        """Approve many ban requests with one transaction, then update their messages concurrently."""
+        moderator_id = str(interaction.user.id)
+        try:
+            claimed = await ban_tracker.claim_pending_requests(request_ids, moderator_id)
+        except Exception as e:
+            return f"❌ Could not claim the selected requests (database error), nothing was approved: {e}"
+        skipped = len(request_ids) - len(claimed)
+
+        # Unbans also touch the original ban's strike; they keep the one-by-one flow
+        unbans = [r for r in claimed if r["ban_data"].get("unban_data")]
+        bans = [r for r in claimed if not r["ban_data"].get("unban_data")]
+        if unbans:
+            await ban_tracker.resolve_pending_requests([(r["id"], None) for r in unbans], "pending", moderator_id)
+        if not bans:
+            return f"⚠️ Nothing approved. {skipped} request(s) were already handled, {len(unbans)} unban request(s) must be approved individually."
+
+        entries = []
+        for request in bans:
+            ban_data = request["ban_data"]
+            pd = ban_data["player_data"]
+            entries.append({
+                "player_name": pd.get("Name", "N/A"), "buid": pd.get("BohemiaUID", "N/A"),
+                "offense": ban_data.get("offense", "N/A"), "strike": ban_data.get("strike", "N/A"),
+                "sanction": ban_data.get("sanction", "N/A"), "transcript": ban_data.get("transcript", "N/A"),
+                "submitted_by": str(ban_data.get("submitted_by_id", "Unknown")),
+            })
+        try:
+            ban_numbers = await ban_tracker.add_bans(entries)
+        except Exception as e:
+            traceback.print_exc()
+            # Nothing was written; hand the requests back to the queue
+            await ban_tracker.resolve_pending_requests([(r["id"], None) for r in bans], "pending", moderator_id)
+            return f"❌ Bulk approval failed, no bans were recorded: {e}"
+
+        await ban_tracker.resolve_pending_requests(
+            [(r["id"], number) for r, number in zip(bans, ban_numbers)], "approved", moderator_id
+        )
+        print(f"✅ Bulk approved {len(ban_numbers)} ban(s): {', '.join(ban_numbers)}")
+
+        semaphore = asyncio.Semaphore(self.BULK_EDIT_CONCURRENCY)
+        updated = await asyncio.gather(*(
+            self._mark_request_message_approved(interaction.guild, r, number, interaction.user.mention, semaphore)
+            for r, number in zip(bans, ban_numbers)
+        ))
+
+        lines = [f"✅ Approved {len(ban_numbers)} ban(s): {', '.join(ban_numbers)}"]
+        if sum(updated) < len(updated):
+            lines.append(f"⚠️ {len(updated) - sum(updated)} moderation message(s) could not be updated.")
+        if skipped:
+            lines.append(f"ℹ️ {skipped} request(s) were already handled by someone else.")
+        if unbans:
+            lines.append(f"ℹ️ {len(unbans)} unban request(s) were left for individual approval.")
+        return "\n".join(lines)
+
+    @app_commands.command(name="bulkapprove", description="Approve several pending ban requests at once.")
+    @app_commands.guild_only()
+    @require(MODERATOR)
+    async def bulkapprove_command(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        pending = [r for r in await ban_tracker.list_pending_requests() if not r.get("is_unban")]
+        if not pending:
+            await interaction.followup.send("✅ No pending ban requests to approve.", ephemeral=True)
+            return
+
+        view = self.BulkApproveView(pending, self)
+        more = f" Showing the oldest 25 of {len(pending)}." if len(pending) > 25 else ""
+        await interaction.followup.send(
+            f"Select the ban requests to approve.{more} Unban requests are approved individually.", view=view, ephemeral=True
+        )
+
+    @app_commands.command(name="pendingbans", description="List ban/unban requests still waiting for review.")
+    @app_commands.guild_only()
+    @require(MODERATOR)
+    async def pendingbans_command(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        pending = await ban_tracker.list_pending_requests()
+        if not pending:
+            await interaction.followup.send("✅ No pending ban requests.", ephemeral=True)
+            return
+
+        lines = []
+        for request in pending:
+            if request.get("message_id") and request.get("channel_id"):
+                link = f"https://discord.com/channels/{interaction.guild.id}/{request['channel_id']}/{request['message_id']}"
+                target = f"[open]({link})"
+            else:
+                target = "message not posted"
+            marker = "🔓 " if request.get("is_unban") else ""
+            lines.append(f"**{marker}#{request['id']}** {request['player_name']} (`{request['buid']}`) - <@{request['submitted_by']}> - {target}")
+
+        description = "\n".join(lines)
+        if len(description) > 4000:
+            description = description[:3990] + "\n..."
+        embed = discord.Embed(title=f"Pending Ban Requests ({len(pending)})", description=description, color=discord.Color.orange())
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="ban_player", description="Start the ban or unban process for a player.")
     @app_commands.guild_only()
     async def ban_player_command(self, interaction: discord.Interaction):
@@ -3,7 +3,9 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 
-class HelpView(discord.ui.View):
+from ui.shared_ui import TrackedView
+
+class HelpView(TrackedView):
     def __init__(self, bot: commands.Bot):
         super().__init__(timeout=300) # View times out after 5 minutes
         self.bot = bot
@@ -75,7 +77,7 @@ class HelpView(discord.ui.View):
                         "2. **Select Player:** Choose the correct player from the list.\n"
                         "3. **Select Offense:** Choose a predefined offense, a custom one, or an unban option.\n"
                         "4. **Select Strike/Sanction:** Follow the prompts for punishment details.\n"
-                        "5. **Link Transcript:** The bot will ask if this is from a 'Report' or a 'Ticket'. It automatically finds recent `.html` files in channels with 'report' or 'ticket' in their names. You can also select other options like 'Witness' or 'Add Later'.\n"
+                        "5. **Link Transcript:** The bot will ask if this is from a 'Report' or a 'Ticket'. It automatically finds recent `.html` files in channels with 'report' or 'ticket' in their names, and **Find by Number** looks up older ones. You can also select other options like 'Witness' or 'Add Later'.\n"
                         "6. **Submit:** Your request will be posted for moderator approval."
                     ),
                     inline=False
@@ -94,7 +96,15 @@ class HelpView(discord.ui.View):
                 embed.add_field(name="`/banhistory buid:<BohemiaUID>`", value="Shows the complete, paginated ban history for a specific player.", inline=False)
                 embed.add_field(name="`/recentbans [limit]`", value="Displays the most recent ban submissions approved by moderators. Default is 10.", inline=False)
                 embed.add_field(name="`/searchban ban_number:<ID>`", value="Looks up and displays the full details for a single ban by its unique Ban ID.", inline=False)
+                embed.add_field(name="`/bansearch query:<text>`", value="Searches bans by player name, offense words, BUID or ban number, best matches first. Suggestions appear as you type.", inline=False)
+                embed.add_field(name="`/repeatoffenders [min_bans]`", value="Pages through players with several bans, sorted by active strikes.", inline=False)
                 embed.add_field(name="`/find_player`", value="A utility command to quickly search for a player's BUID by name.", inline=False)
+                embed.add_field(name="`/banstats`", value="Shows overall ban totals plus the most common offenses and the most active moderators. Figures are refreshed every few minutes.", inline=False)
+                embed.add_field(name="`/bantrends [days] [offense] [moderator]`", value="Shows a day-by-day chart of bans and unbans, optionally for one offense or moderator.", inline=False)
+                embed.add_field(name="`/pendingbans`", value="Lists ban/unban requests still waiting for approval, with links to each request.", inline=False)
+                embed.add_field(name="`/bulkapprove`", value="Moderators: pick several pending ban requests and approve them in one go. Unban requests are still approved one at a time.", inline=False)
+                embed.add_field(name="`/botmetrics`", value="Moderators: command latencies, database timings, Discord API usage and event-loop lag since the bot started.", inline=False)
+                embed.add_field(name="`/loopstalls`", value="Moderators: the code paths that blocked the bot's event loop, worst first, with the stack of the worst one. Add `clear:True` to reset after a fix.", inline=False)
 
             elif category == "Admin & Setup":
                 embed.title="⚙️ Admin & Setup Commands"
@@ -103,6 +113,7 @@ class HelpView(discord.ui.View):
                 embed.add_field(name="`/setup channel channel:<#channel>`", value="Sets the specific channel where new ban requests are posted for review.", inline=False)
                 embed.add_field(name="`/setup check`", value="Displays the current configuration and checks if the bot has the required permissions.", inline=False)
                 embed.add_field(name="`/delete_ban ban_number:<ID>`", value="Permanently deletes a ban record from the database. This action is irreversible.", inline=False)
+                embed.add_field(name="`/rebuild_rollups`", value="Recomputes the daily figures behind `/bantrends` from the full ban history.", inline=False)
             
             embed.set_footer(text=f"Bot Help | Selected: {category}")
             return embed
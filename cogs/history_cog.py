@@ -1,34 +1,88 @@
 # cogs/history_cog.py
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import traceback
 import math
-from datetime import datetime
+import asyncio
+import os
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
 
 from ban_history import ban_tracker
+from punishments import punishments
+from ui.shared_ui import TrackedView
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def render_sparkline(values: List[int]) -> str:
+    """One block character per value, scaled to the largest value"""
+    peak = max(values, default=0)
+    if peak == 0:
+        return SPARK_CHARS[0] * len(values)
+    return "".join(SPARK_CHARS[round(v / peak * (len(SPARK_CHARS) - 1))] for v in values)
 
 # --- New Pagination View for Ban History ---
-class HistoryPaginationView(discord.ui.View):
-    def __init__(self, history_entries: List[Dict], buid: str, player_name: str, items_per_page: int = 4):
+class HistoryPaginationView(TrackedView):
+    """Pages through a player's history with keyset cursors.
+
+    Only the current page and its neighbours are held in memory; the next page
+    is prefetched in the background so "Next" normally answers without waiting
+    on the database.
+    """
+    def __init__(self, first_page: Dict, buid: str, player_name: str, items_per_page: int = 4):
         super().__init__(timeout=300) # View times out after 5 minutes of inactivity
-        self.history_entries = history_entries
         self.buid = buid
         self.player_name = player_name
         self.items_per_page = items_per_page
         
         self.current_page = 0
-        self.total_pages = math.ceil(len(self.history_entries) / self.items_per_page)
+        self.total_pages = max(1, math.ceil((first_page['total'] or 0) / self.items_per_page))
+        
+        # cursors[i] fetches page i; pages holds the entries of recently visited pages
+        self.cursors: List[Optional[tuple]] = [None, first_page['next_cursor']]
+        self.pages: Dict[int, List[Dict]] = {0: first_page['entries']}
+        self._prefetch: Optional[asyncio.Task] = None
         
         self.message: Optional[discord.Message] = None
+        self._start_prefetch()
+
+    def _start_prefetch(self):
+        next_index = self.current_page + 1
+        if next_index < self.total_pages and next_index < len(self.cursors) and next_index not in self.pages:
+            self._prefetch = asyncio.create_task(self._load_page(next_index))
+
+    async def _load_page(self, index: int) -> List[Dict]:
+        if index in self.pages:
+            return self.pages[index]
+        if index >= len(self.cursors):
+            return []
+        page = await ban_tracker.get_player_history_page(self.buid, self.cursors[index], self.items_per_page)
+        if not page['entries']:
+            # Lookup failed or rows were deleted meanwhile; don't cache, let the next click retry
+            return []
+        self.pages[index] = page['entries']
+        if index + 1 >= len(self.cursors):
+            self.cursors.append(page['next_cursor'])
+        return page['entries']
+
+    async def _go_to(self, index: int) -> bool:
+        """Move to page `index`; False (staying put) if it could not be loaded."""
+        if self._prefetch and not self._prefetch.done() and index == self.current_page + 1:
+            await self._prefetch
+        if not await self._load_page(index):
+            return False
+        self.current_page = index
+        # Keep memory per view flat: only the pages next to the current one stay cached
+        for cached in [i for i in self.pages if abs(i - index) > 1]:
+            del self.pages[cached]
+        self._start_prefetch()
+        return True
 
     async def create_page_embed(self) -> discord.Embed:
         """Creates an embed for the current page."""
-        start_index = self.current_page * self.items_per_page
-        end_index = start_index + self.items_per_page
-        
-        page_entries = self.history_entries[start_index:end_index]
+        page_entries = self.pages.get(self.current_page, [])
 
         embed = discord.Embed(
             title=f"Ban History for {self.player_name}",
@@ -40,14 +94,14 @@ class HistoryPaginationView(discord.ui.View):
             embed.description += "\n\nNo records on this page."
         
         for ban in page_entries:
-            unban_marker = "🔓 " if ban.get("is_unban", False) else "⚖️ "
-            strike_marker = " (Strike Removed)" if ban.get("strike_removed", False) else ""
+            unban_marker = "🔓 " if ban.is_unban else "⚖️ "
+            strike_marker = " (Strike Removed)" if ban.strike_removed else ""
             
-            ban_num = ban.get('ban_number', 'N/A')
-            timestamp = ban.get('timestamp', 'N/A')[:10]
-            offense = ban.get('offense', 'N/A')
-            strike = ban.get('strike', 'N/A')
-            sanction = ban.get('sanction', 'N/A')
+            ban_num = ban.ban_number or 'N/A'
+            timestamp = ban.date or 'N/A'
+            offense = ban.offense or 'N/A'
+            strike = ban.strike or 'N/A'
+            sanction = ban.sanction or 'N/A'
             
             field_name = f"{unban_marker} {ban_num} on {timestamp}{strike_marker}"
             field_value = f"**Offense:** {offense}\n**Punishment:** ({strike}) {sanction}"
@@ -67,6 +121,8 @@ class HistoryPaginationView(discord.ui.View):
         await interaction.response.edit_message(embed=embed, view=self)
 
     async def on_timeout(self):
+        if self._prefetch:
+            self._prefetch.cancel()
         # Disable all buttons when the view times out
         if self.message:
             for item in self.children:
@@ -80,23 +136,111 @@ class HistoryPaginationView(discord.ui.View):
     @discord.ui.button(label="⬅️ Previous", style=discord.ButtonStyle.secondary, custom_id="history_prev")
     async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.current_page > 0:
-            self.current_page -= 1
-            await self.update_view(interaction)
+            if await self._go_to(self.current_page - 1):
+                await self.update_view(interaction)
+            else:
+                await interaction.response.send_message("⚠️ Couldn't load that page, please try again.", ephemeral=True)
         else:
             await interaction.response.defer()
 
     @discord.ui.button(label="Next ➡️", style=discord.ButtonStyle.secondary, custom_id="history_next")
     async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         if self.current_page < self.total_pages - 1:
-            self.current_page += 1
-            await self.update_view(interaction)
+            if await self._go_to(self.current_page + 1):
+                await self.update_view(interaction)
+            else:
+                await interaction.response.send_message("⚠️ Couldn't load that page, please try again.", ephemeral=True)
         else:
             await interaction.response.defer()
 
 
+class RepeatOffendersView(TrackedView):
+    """Pages through player_summary with keyset cursors, most active strikes first."""
+    def __init__(self, first_page: Dict, min_bans: int, per_page: int = 10):
+        super().__init__(timeout=300)
+        self.min_bans = min_bans
+        self.per_page = per_page
+        self.current_page = 0
+        # cursors[i] fetches page i; None after the last page
+        self.cursors: List[Optional[tuple]] = [None, first_page['next_cursor']]
+        self.pages: Dict[int, List[Dict]] = {0: first_page['entries']}
+        self.message: Optional[discord.Message] = None
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.current_page == 0
+        self.next_page.disabled = self.cursors[self.current_page + 1] is None
+
+    def create_page_embed(self) -> discord.Embed:
+        embed = discord.Embed(
+            title="🔁 Repeat Offenders",
+            description=f"Players with at least {self.min_bans} bans, most active strikes first.",
+            color=discord.Color.dark_red(),
+        )
+        start = self.current_page * self.per_page
+        lines = []
+        for rank, player in enumerate(self.pages.get(self.current_page, []), start=start + 1):
+            last_ban = f" · last {player['last_ban_at']:%Y-%m-%d}" if player['last_ban_at'] else ""
+            lines.append(
+                f"**{rank}. {player['player_name']}** (`{player['buid']}`)\n"
+                f"{player['active_strikes']} active strike(s) · {player['total_bans']} ban(s){last_ban}"
+            )
+        embed.description += "\n\n" + ("\n".join(lines) if lines else "No players on this page.")
+        embed.set_footer(text=f"Page {self.current_page + 1} · Use /banhistory for a player's full record")
+        return embed
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        if index not in self.pages:
+            page = await ban_tracker.get_repeat_offenders_page(self.min_bans, self.cursors[index], self.per_page)
+            if not page['entries']:
+                await interaction.response.defer()
+                return
+            self.pages[index] = page['entries']
+            if index + 1 >= len(self.cursors):
+                self.cursors.append(page['next_cursor'])
+        self.current_page = index
+        self._update_buttons()
+        await interaction.response.edit_message(embed=self.create_page_embed(), view=self)
+
+    async def on_timeout(self):
+        if self.message:
+            for item in self.children:
+                if isinstance(item, discord.ui.Button):
+                    item.disabled = True
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass # Message might have been deleted
+
+    @discord.ui.button(label="⬅️ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.current_page - 1)
+
+    @discord.ui.button(label="Next ➡️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.current_page + 1)
+
+
 class HistoryCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.refresh_stats.change_interval(seconds=float(os.getenv("BAN_STATS_REFRESH_SECONDS", 300)))
+
+    async def cog_load(self):
+        self.refresh_stats.start()
+
+    async def cog_unload(self):
+        self.refresh_stats.cancel()
+
+    @tasks.loop(seconds=300)
+    async def refresh_stats(self):
+        """Keep ban_tracker.stats_snapshot current so /banstats never queries the database"""
+        await ban_tracker.refresh_statistics()
+
+    @refresh_stats.error
+    async def refresh_stats_error(self, error: Exception):
+        print(f"❌ Ban statistics refresh loop stopped: {error}")
+        traceback.print_exc()
 
     @app_commands.command(name="banhistory", description="View ban history for a player")
     @app_commands.describe(buid="The Bohemia UID of the player to check.")
@@ -104,9 +248,9 @@ class HistoryCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            history = await ban_tracker.get_player_history(buid)
+            first_page = await ban_tracker.get_player_history_page(buid)
 
-            if not history:
+            if not first_page['entries']:
                 embed = discord.Embed(
                     title="No History Found",
                     description=f"No ban history found for BUID: `{buid}`",
@@ -115,10 +259,10 @@ class HistoryCog(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
 
-            player_name = history[0].get('player_name', 'Unknown Player')
+            player_name = first_page['entries'][0].player_name or 'Unknown Player'
             
             # Create and send the initial paginated view
-            view = HistoryPaginationView(history, buid, player_name)
+            view = HistoryPaginationView(first_page, buid, player_name)
             
             # Disable buttons if not needed (e.g., only one page)
             view.previous_page.disabled = True
@@ -127,9 +271,8 @@ class HistoryCog(commands.Cog):
             initial_embed = await view.create_page_embed()
             
             # Add final summary fields to the initial embed, they won't change between pages
-            strike_count = await ban_tracker.get_player_strikes(buid)
-            initial_embed.add_field(name="Active Strikes", value=str(strike_count), inline=True)
-            initial_embed.add_field(name="Total Records", value=str(len(history)), inline=True)
+            initial_embed.add_field(name="Active Strikes", value=str(first_page['active_strikes']), inline=True)
+            initial_embed.add_field(name="Total Records", value=str(first_page['total']), inline=True)
             
             message = await interaction.followup.send(embed=initial_embed, view=view, ephemeral=True)
             view.message = message
@@ -140,6 +283,14 @@ class HistoryCog(commands.Cog):
             await interaction.followup.send(f"An error occurred while fetching the ban history: `{e}`", ephemeral=True)
 
 
+    @banhistory_command.autocomplete("buid")
+    async def banhistory_buid_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        players = await self.bot.player_db.autocomplete_players(current)
+        return [
+            app_commands.Choice(name=f"{p['Name']} (Lvl {p['Level']}) - {p['BohemiaUID']}"[:100], value=p['BohemiaUID'][:100])
+            for p in players
+        ]
+
     @app_commands.command(name="recentbans", description="View recent ban submissions")
     @app_commands.describe(limit="Number of recent bans to show (max 25).")
     async def recentbans_command(self, interaction: discord.Interaction, limit: int = 10):
@@ -167,11 +318,11 @@ class HistoryCog(commands.Cog):
             # Restored more detailed formatting for recent bans
             description_text = ""
             for ban in recent:
-                unban_marker = "🔓 " if ban.get("is_unban", False) else ""
-                player_name = ban.get('player_name', 'N/A')
-                ban_num = ban.get('ban_number', 'N/A')
-                offense = ban.get('offense', 'N/A')
-                timestamp = ban.get('timestamp', 'N/A')[:10]
+                unban_marker = "🔓 " if ban.is_unban else ""
+                player_name = ban.player_name or 'N/A'
+                ban_num = ban.ban_number or 'N/A'
+                offense = ban.offense or 'N/A'
+                timestamp = ban.date or 'N/A'
                 
                 entry = f"**{unban_marker}{ban_num}** | {timestamp} | **{player_name}**\nOffense: *{offense[:70]}...*\n"
                 
@@ -206,41 +357,41 @@ class HistoryCog(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
 
-            embed_color = discord.Color.orange() if ban.get("is_unban") else discord.Color.dark_red()
+            embed_color = discord.Color.orange() if ban.is_unban else discord.Color.dark_red()
             embed = discord.Embed(
-                title=f"Details for Ban/Unban: {ban.get('ban_number', 'N/A')}",
+                title=f"Details for Ban/Unban: {ban.ban_number or 'N/A'}",
                 color=embed_color,
-                timestamp=datetime.fromisoformat(ban["timestamp"]) if ban.get("timestamp") else datetime.utcnow()
+                timestamp=ban.timestamp or datetime.utcnow()
             )
 
-            embed.add_field(name="Player", value=ban.get("player_name", "N/A"), inline=True)
-            embed.add_field(name="BUID", value=f"`{ban.get('buid', 'N/A')}`", inline=True)
+            embed.add_field(name="Player", value=ban.player_name or "N/A", inline=True)
+            embed.add_field(name="BUID", value=f"`{ban.buid or 'N/A'}`", inline=True)
             
-            submitted_by_text = f"ID: {ban.get('submitted_by', 'N/A')}"
-            if ban.get("submitted_by", "").isdigit():
+            submitted_by_text = f"ID: {ban.submitted_by or 'N/A'}"
+            if ban.submitted_by.isdigit():
                 try:
-                    submitter = await self.bot.fetch_user(int(ban["submitted_by"]))
+                    submitter = await self.bot.fetch_user(int(ban.submitted_by))
                     submitted_by_text = submitter.mention
                 except (discord.NotFound, ValueError):
                     pass
             embed.add_field(name="Submitted By", value=submitted_by_text, inline=True)
 
-            embed.add_field(name="Offense/Reason", value=ban.get("offense", "N/A"), inline=False)
-            embed.add_field(name="Strike Level", value=ban.get("strike", "N/A"), inline=True)
-            embed.add_field(name="Sanction/Action", value=ban.get("sanction", "N/A"), inline=True)
+            embed.add_field(name="Offense/Reason", value=ban.offense or "N/A", inline=False)
+            embed.add_field(name="Strike Level", value=ban.strike or "N/A", inline=True)
+            embed.add_field(name="Sanction/Action", value=ban.sanction or "N/A", inline=True)
             
-            transcript = ban.get("transcript")
+            transcript = ban.transcript
             if transcript and transcript.lower() not in ["n/a", "none", "will add later / no transcript", "witness statement (no html)"]:
                  embed.add_field(name="Transcript", value=transcript, inline=False)
             else:
                  embed.add_field(name="Transcript", value="Not Provided", inline=True)
 
-            if ban.get("is_unban"):
+            if ban.is_unban:
                 embed.set_author(name="UNBAN Record")
             else:
                 embed.set_author(name="BAN Record")
 
-            if ban.get("strike_removed"):
+            if ban.strike_removed:
                  embed.add_field(name="⚠️ Status", value="Strike Associated With This Ban Was Removed", inline=True)
 
             await interaction.followup.send(embed=embed, ephemeral=True)
@@ -250,6 +401,169 @@ class HistoryCog(commands.Cog):
             traceback.print_exc()
             await interaction.followup.send(f"An error occurred while searching for the ban: `{e}`", ephemeral=True)
 
+    @app_commands.command(name="banstats", description="Show overall ban statistics")
+    async def banstats_command(self, interaction: discord.Interaction):
+        snapshot = ban_tracker.stats_snapshot
+        if snapshot is None:
+            await interaction.response.send_message(
+                "Ban statistics are still being computed. Please try again in a moment.", ephemeral=True
+            )
+            return
+
+        totals = snapshot['totals']
+        refreshed_at = snapshot['refreshed_at'].replace(tzinfo=timezone.utc)
+        embed = discord.Embed(
+            title="📊 Ban Statistics",
+            description=f"Updated {discord.utils.format_dt(refreshed_at, 'R')}",
+            color=discord.Color.blue(),
+        )
+        embed.add_field(name="Total Bans", value=str(totals.get('total_bans', 0)), inline=True)
+        embed.add_field(name="Total Unbans", value=str(totals.get('total_unbans', 0)), inline=True)
+        embed.add_field(name="Active Strikes", value=str(totals.get('active_strikes', 0)), inline=True)
+        embed.add_field(name="Players Banned", value=str(totals.get('unique_players_banned', 0)), inline=True)
+        embed.add_field(name="Bans (Last 30 Days)", value=str(totals.get('bans_this_month', 0)), inline=True)
+
+        if snapshot['by_offense']:
+            offense_lines = [f"{count} × {offense[:60]}" for offense, count in snapshot['by_offense']]
+            embed.add_field(name="Top Offenses", value="\n".join(offense_lines)[:1024], inline=False)
+        if snapshot['by_moderator']:
+            moderator_lines = []
+            for submitted_by, bans, unbans in snapshot['by_moderator']:
+                who = f"<@{submitted_by}>" if submitted_by.isdigit() else submitted_by
+                moderator_lines.append(f"{who}: {bans} ban(s), {unbans} unban(s)")
+            embed.add_field(name="By Moderator", value="\n".join(moderator_lines)[:1024], inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="bantrends", description="Show daily ban trends")
+    @app_commands.describe(
+        days="How many days to cover (7-90, default 30).",
+        offense="Only count this offense.",
+        moderator="Only count bans submitted by this moderator.",
+    )
+    async def bantrends_command(self, interaction: discord.Interaction, days: int = 30,
+                                offense: Optional[str] = None, moderator: Optional[discord.Member] = None):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            days = min(max(days, 7), 90)
+            trends = await ban_tracker.get_ban_trends(
+                days, offense=offense, moderator=str(moderator.id) if moderator else None
+            )
+            daily = trends['daily']
+            if not daily:
+                await interaction.followup.send("Ban trends are not available right now.", ephemeral=True)
+                return
+
+            bans = [b for _, b, _ in daily]
+            unbans = [u for _, _, u in daily]
+            start, end = daily[0][0], daily[-1][0]
+            scope = [f"offense **{offense}**" if offense else None, f"moderator {moderator.mention}" if moderator else None]
+            scope_text = " for " + " and ".join(part for part in scope if part) if offense or moderator else ""
+
+            embed = discord.Embed(
+                title=f"📈 Ban Trends (Last {days} Days)",
+                description=(
+                    f"{start:%Y-%m-%d} → {end:%Y-%m-%d}{scope_text}\n"
+                    f"```\nBans   {render_sparkline(bans)}  peak {max(bans)}/day\n"
+                    f"Unbans {render_sparkline(unbans)}  peak {max(unbans)}/day\n```"
+                ),
+                color=discord.Color.purple(),
+            )
+            embed.add_field(name="Bans", value=str(sum(bans)), inline=True)
+            embed.add_field(name="Unbans", value=str(sum(unbans)), inline=True)
+            embed.add_field(name="Strikes Removed", value=str(trends['strikes_removed']), inline=True)
+            if trends['top_offenses'] and not offense:
+                lines = [f"{count} × {name[:60]}" for name, count in trends['top_offenses']]
+                embed.add_field(name="Top Offenses", value="\n".join(lines)[:1024], inline=False)
+            if trends['top_moderators'] and not moderator:
+                lines = [f"<@{mod}>: {count}" if mod.isdigit() else f"{mod}: {count}" for mod, count in trends['top_moderators']]
+                embed.add_field(name="Top Moderators", value="\n".join(lines)[:1024], inline=False)
+
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            print(f"--- ERROR in /bantrends command ---")
+            traceback.print_exc()
+            await interaction.followup.send(f"An error occurred while fetching ban trends: `{e}`", ephemeral=True)
+
+    @bantrends_command.autocomplete("offense")
+    async def bantrends_offense_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        current = current.lower()
+        return [
+            app_commands.Choice(name=name[:100], value=name[:100])
+            for name in punishments if name != "Custom Punishment" and current in name.lower()
+        ][:25]
+
+    @app_commands.command(name="bansearch", description="Search bans by player name, offense, BUID or ban number")
+    @app_commands.describe(query="Words from the player name or offense, a BUID, or a ban number.")
+    async def bansearch_command(self, interaction: discord.Interaction, query: str):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            results = await ban_tracker.search_bans(query, limit=15)
+            if not results:
+                embed = discord.Embed(
+                    title="No Matches",
+                    description=f"No bans found for `{query}`.",
+                    color=discord.Color.yellow(),
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+
+            embed = discord.Embed(
+                title=f"Ban Search: {query[:200]}",
+                description=f"Showing {len(results)} best match(es). Use `/searchban` for full details.",
+                color=discord.Color.purple(),
+            )
+            lines = []
+            for ban in results:
+                unban_marker = "🔓 " if ban.is_unban else ""
+                strike_marker = " ~~strike~~" if ban.strike_removed else ""
+                lines.append(
+                    f"**{unban_marker}{ban.ban_number}** | {ban.date} | **{ban.player_name}** (`{ban.buid}`)\n"
+                    f"{ban.offense[:80]} · {ban.strike}{strike_marker}"
+                )
+            embed.description += "\n\n" + "\n".join(lines)[:3800]
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+        except Exception as e:
+            print(f"--- ERROR in /bansearch command ---")
+            traceback.print_exc()
+            await interaction.followup.send(f"An error occurred while searching bans: `{e}`", ephemeral=True)
+
+    @bansearch_command.autocomplete("query")
+    async def bansearch_query_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        if len(current.strip()) < 2:
+            return []
+        results = await ban_tracker.search_bans(current, limit=25)
+        return [
+            app_commands.Choice(name=f"{ban.ban_number} · {ban.player_name} · {ban.offense}"[:100], value=ban.ban_number)
+            for ban in results
+        ]
+
+    @app_commands.command(name="repeatoffenders", description="List players with several bans, most active strikes first")
+    @app_commands.describe(min_bans="Only list players with at least this many bans (default 2).")
+    async def repeatoffenders_command(self, interaction: discord.Interaction, min_bans: int = 2):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            min_bans = max(min_bans, 1)
+            first_page = await ban_tracker.get_repeat_offenders_page(min_bans)
+            if not first_page['entries']:
+                embed = discord.Embed(
+                    title="No Repeat Offenders",
+                    description=f"No players have {min_bans} or more bans.",
+                    color=discord.Color.yellow(),
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                return
+
+            view = RepeatOffendersView(first_page, min_bans)
+            view.message = await interaction.followup.send(embed=view.create_page_embed(), view=view, ephemeral=True)
+
+        except Exception as e:
+            print(f"--- ERROR in /repeatoffenders command ---")
+            traceback.print_exc()
+            await interaction.followup.send(f"An error occurred while fetching repeat offenders: `{e}`", ephemeral=True)
+
 # This function must exist at the bottom of every cog file.
 async def setup(bot: commands.Bot):
     await bot.add_cog(HistoryCog(bot))
\ No newline at end of file
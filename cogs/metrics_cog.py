@@ -0,0 +1,194 @@
+# cogs/metrics_cog.py
+import discord
+from discord.ext import commands
+from discord import app_commands
+import os
+import time
+from datetime import timedelta
+
+from ban_history import ban_tracker
+from ui.shared_ui import TrackedView
+from utils.loop_watchdog import loop_watchdog
+from utils.metrics import command_finished, command_started, instrument_http, iter_top, metrics
+from utils.permissions_utils import DENIED_EXTRA, MODERATOR, require
+
+
+class MetricsCog(commands.Cog):
+    """Hooks the metrics layer into the bot and exposes it via /botmetrics and Prometheus"""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._web_runner = None
+        self._original_interaction_check = None
+
+    async def cog_load(self):
+        instrument_http(self.bot.http)
+
+        # Every slash command passes the tree's interaction_check first: stamp the start time there
+        tree = self.bot.tree
+        self._original_interaction_check = tree.interaction_check
+
+        async def interaction_check(interaction: discord.Interaction) -> bool:
+            command_started(interaction)
+            return await self._original_interaction_check(interaction)
+
+        tree.interaction_check = interaction_check
+
+        metrics.gauge("form_sessions", lambda: len(self.bot.user_form_state),
+                      help_text="Ban forms currently in progress")
+        metrics.gauge("live_views", TrackedView.live_count, help_text="Views the cogs created that have not stopped or timed out")
+        metrics.gauge("ban_cache_entries", lambda: ban_tracker.cache_stats()['size'],
+                      help_text="Entries in the per-player ban history cache")
+
+        loop_watchdog.start()
+        await self._start_prometheus()
+
+    async def cog_unload(self):
+        if self._original_interaction_check:
+            self.bot.tree.interaction_check = self._original_interaction_check
+        loop_watchdog.stop()
+        if self._web_runner:
+            await self._web_runner.cleanup()
+            self._web_runner = None
+
+    async def _start_prometheus(self):
+        port = os.getenv("METRICS_PORT", "").strip()
+        if not port or port == "0":
+            return
+        host = os.getenv("METRICS_HOST", "127.0.0.1")
+        try:
+            from aiohttp import web
+        except ImportError:
+            print("⚠️ METRICS_PORT is set but aiohttp is not installed; Prometheus endpoint disabled.")
+            return
+
+        async def handle_metrics(request):
+            return web.Response(text=metrics.render_prometheus(), content_type="text/plain",
+                                headers={"X-Content-Type-Options": "nosniff"})
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle_metrics)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, host, int(port)).start()
+        except OSError as e:
+            await runner.cleanup()
+            print(f"❌ Could not start metrics endpoint on {host}:{port}: {e}")
+            return
+        self._web_runner = runner
+        print(f"✅ Prometheus metrics served on http://{host}:{port}/metrics")
+
+    @commands.Cog.listener()
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        # require() answers a denied user itself, so the command still "completes"
+        command_finished(interaction, "denied" if interaction.extras.get(DENIED_EXTRA) else "ok")
+
+    def build_embed(self) -> discord.Embed:
+        uptime = timedelta(seconds=int(time.time() - metrics.started_at))
+        embed = discord.Embed(title="📈 Bot Metrics", description=f"Since startup ({uptime} ago). Latencies are bucket upper bounds.",
+                              color=discord.Color.blurple())
+
+        commands_by_name = metrics.merged("command_ms", by="command")
+        failures, denials = {}, {}
+        for labels, histogram in metrics.histogram_series("command_ms").items():
+            label_map = dict(labels)
+            outcome = label_map.get("outcome")
+            if outcome != "ok":
+                tally = denials if outcome == "denied" else failures
+                tally[label_map.get("command")] = tally.get(label_map.get("command"), 0) + histogram.count
+        lines = [
+            f"`/{name}` {h.count}× · p50 ≤{h.quantile(0.5):g}ms · p95 ≤{h.quantile(0.95):g}ms"
+            + (f" · ❌ {failures[name]}" if failures.get(name) else "")
+            + (f" · 🚫 {denials[name]}" if denials.get(name) else "")
+            for name, h in iter_top(commands_by_name, 8)
+        ]
+        embed.add_field(name="Commands", value="\n".join(lines) or "No commands run yet.", inline=False)
+
+        query_by_db = metrics.merged("db_query_ms", by="db")
+        wait_by_db = metrics.merged("db_pool_wait_ms", by="db")
+        in_use = {dict(k).get("db"): v for k, v in metrics.gauge_values("db_connections_in_use").items()}
+        sizes = {dict(k).get("db"): v for k, v in metrics.gauge_values("db_pool_size").items()}
+        lines = []
+        for db, h in sorted(query_by_db.items()):
+            wait = wait_by_db.get(db)
+            errors = metrics.counter_value("db_query_errors_total", db=db)
+            lines.append(
+                f"**{db}**: {h.count} queries · p95 ≤{h.quantile(0.95):g}ms · max {h.max:.0f}ms"
+                f" · pool wait p95 ≤{wait.quantile(0.95) if wait else 0:g}ms"
+                f" · in use {in_use.get(db, 0)}/{sizes.get(db, '?')}" + (f" · ❌ {errors:g}" if errors else "")
+            )
+        slowest = sorted(metrics.histogram_series("db_query_ms").items(), key=lambda item: item[1].quantile(0.95), reverse=True)[:3]
+        for labels, h in slowest:
+            label_map = dict(labels)
+            lines.append(f"↳ `{label_map.get('query')}` ({label_map.get('db')}) p95 ≤{h.quantile(0.95):g}ms, {h.count}×")
+        embed.add_field(name="Database", value="\n".join(lines) or "No queries yet.", inline=False)
+
+        rest = metrics.merged("discord_rest_ms", by="method")
+        requests = sum(h.count for h in rest.values())
+        rest_p95 = max((h.quantile(0.95) for h in rest.values()), default=0)
+        limited = metrics.counter_value("discord_rate_limited_total")
+        embed.add_field(name="Discord API", value=f"{requests} requests · p95 ≤{rest_p95:g}ms · 429s: {limited:g}", inline=True)
+
+        lag = metrics.histogram_series("event_loop_lag_ms").get(())
+        lag_text = f"p95 ≤{lag.quantile(0.95):g}ms · max {lag.max:.0f}ms" if lag else "n/a"
+        stalls = metrics.counter_value("event_loop_stalls_total")
+        if stalls:
+            lag_text += f"\n⚠️ {stalls:g} stalls over {loop_watchdog.threshold * 1000:g}ms (see `/loopstalls`)"
+        embed.add_field(name="Event Loop Lag", value=lag_text, inline=True)
+
+        cache = ban_tracker.cache_stats()
+        hit_rate = f"{cache['hit_rate']:.0%}" if cache['hit_rate'] is not None else "n/a"
+        embed.add_field(
+            name="Live State",
+            value=f"Form sessions: {len(self.bot.user_form_state)} · Views: {TrackedView.live_count()}"
+                  f" · Ban cache: {cache['size']} ({hit_rate} hits)",
+            inline=False
+        )
+        return embed
+
+    @app_commands.command(name="botmetrics", description="Moderators: latency, database and API figures since startup.")
+    @app_commands.guild_only()
+    @require(MODERATOR)
+    async def botmetrics_command(self, interaction: discord.Interaction):
+        await interaction.response.send_message(embed=self.build_embed(), ephemeral=True)
+
+    def build_stalls_embed(self) -> discord.Embed:
+        threshold_ms = loop_watchdog.threshold * 1000
+        offenders = loop_watchdog.worst_offenders(8)
+        embed = discord.Embed(
+            title="🐢 Event Loop Stalls",
+            description=(f"Places where the event loop was blocked for more than {threshold_ms:g}ms, worst first. "
+                         "Nothing else - commands, buttons, gateway events - runs while the loop is stuck.")
+                        if offenders else f"No stall over {threshold_ms:g}ms recorded since startup. 🎉",
+            color=discord.Color.orange() if offenders else discord.Color.green()
+        )
+        for site in offenders:
+            worst = site.worst
+            value = (f"max {site.max_ms:.0f}ms · {site.count}× · total {site.total_ms / 1000:.1f}s"
+                     f" · last worst <t:{int(worst.started_at.timestamp())}:R>")
+            if worst.callback and worst.callback != site.site:
+                value += f"\nCallback: `{worst.callback[:100]}`"
+            embed.add_field(name=f"`{site.site[:240]}`", value=value, inline=False)
+        if offenders:
+            # Full stack of the single worst stall; the innermost frames matter most, so trim from the top
+            stack = "\n".join(offenders[0].worst.stack) or offenders[0].worst.callback
+            if len(stack) > 1000:
+                stack = "…" + stack[-999:]
+            embed.add_field(name="Worst stack (innermost last)", value=f"```\n{stack}\n```", inline=False)
+        return embed
+
+    @app_commands.command(name="loopstalls", description="Moderators: code paths that blocked the bot's event loop, worst first.")
+    @app_commands.describe(clear="Forget the recorded stalls after showing them")
+    @app_commands.guild_only()
+    @require(MODERATOR)
+    async def loopstalls_command(self, interaction: discord.Interaction, clear: bool = False):
+        embed = self.build_stalls_embed()
+        if clear:
+            loop_watchdog.clear()
+            embed.set_footer(text="Recorded stalls cleared.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(MetricsCog(bot))
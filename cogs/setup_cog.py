@@ -3,8 +3,9 @@ from discord.ext import commands
 from discord import app_commands
 from typing import Optional
 
-# Import our new config manager
-from utils import config_manager
+from utils.permissions_utils import permissions
+
+# Settings are written per guild; bot.config is the in-memory ConfigStore (utils/config_manager.py)
 
 class SetupCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -18,29 +19,35 @@ class SetupCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def setup_roles(self, interaction: discord.Interaction, add_role: Optional[discord.Role] = None, remove_role: Optional[discord.Role] = None):
         """Adds or removes a moderator role."""
+        moderator_roles = self.bot.config.get("moderator_roles", [], guild_id=interaction.guild_id)
         if not add_role and not remove_role:
             # If no options given, show current config
-            current_roles = [f"<@&{role_id}>" for role_id in self.bot.config.get("moderator_roles", [])]
+            current_roles = [f"<@&{role_id}>" for role_id in moderator_roles]
             role_list = "\n".join(current_roles) if current_roles else "No moderator roles set."
             await interaction.response.send_message(f"**Current Moderator Roles:**\n{role_list}", ephemeral=True)
             return
 
+        # The first change gives this server its own copy of the list, detached from the shared one
+        detach_note = "" if self.bot.config.has_guild_value("moderator_roles", interaction.guild_id) else (
+            "\nℹ️ This server now has its own moderator role list, starting from the shared one. "
+            "Later changes to the shared list in config.json no longer apply here."
+        )
+
         # Add a role
         if add_role:
-            if add_role.id not in self.bot.config["moderator_roles"]:
-                self.bot.config["moderator_roles"].append(add_role.id)
-                config_manager.save_config(self.bot.config)
-                await interaction.response.send_message(f"✅ Role {add_role.mention} has been added as a Moderator.", ephemeral=True)
+            if add_role.id not in moderator_roles:
+                self.bot.config.set("moderator_roles", moderator_roles + [add_role.id], guild_id=interaction.guild_id)
+                await interaction.response.send_message(f"✅ Role {add_role.mention} has been added as a Moderator.{detach_note}", ephemeral=True)
             else:
                 await interaction.response.send_message(f"⚠️ Role {add_role.mention} is already a Moderator.", ephemeral=True)
             return
 
         # Remove a role
         if remove_role:
-            if remove_role.id in self.bot.config["moderator_roles"]:
-                self.bot.config["moderator_roles"].remove(remove_role.id)
-                config_manager.save_config(self.bot.config)
-                await interaction.response.send_message(f"🗑️ Role {remove_role.mention} has been removed as a Moderator.", ephemeral=True)
+            if remove_role.id in moderator_roles:
+                self.bot.config.set("moderator_roles", [r for r in moderator_roles if r != remove_role.id],
+                                    guild_id=interaction.guild_id)
+                await interaction.response.send_message(f"🗑️ Role {remove_role.mention} has been removed as a Moderator.{detach_note}", ephemeral=True)
             else:
                 await interaction.response.send_message(f"⚠️ Role {remove_role.mention} was not a Moderator.", ephemeral=True)
             return
@@ -50,8 +57,8 @@ class SetupCog(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def setup_channel(self, interaction: discord.Interaction, channel: discord.TextChannel):
         """Sets the channel for pending ban requests."""
-        self.bot.config["channels"]["pending_bans"] = channel.id
-        config_manager.save_config(self.bot.config)
+        channels = self.bot.config.get("channels", {}, guild_id=interaction.guild_id)
+        self.bot.config.set("channels", {**channels, "pending_bans": channel.id}, guild_id=interaction.guild_id)
         await interaction.response.send_message(f"✅ Pending ban requests will now be sent to {channel.mention}.", ephemeral=True)
 
     @setup_group.command(name="check", description="Check the current bot configuration and permissions.")
@@ -61,11 +68,11 @@ class SetupCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         # Moderator Roles
-        current_roles = [f"<@&{role_id}>" for role_id in self.bot.config.get("moderator_roles", [])]
+        current_roles = [f"<@&{role_id}>" for role_id in self.bot.config.get("moderator_roles", [], guild_id=interaction.guild_id)]
         role_list = "\n".join(current_roles) if current_roles else "None set. Use `/setup roles`."
 
         # Pending Bans Channel
-        pending_channel_id = self.bot.config.get("channels", {}).get("pending_bans")
+        pending_channel_id = self.bot.config.get("channels", {}, guild_id=interaction.guild_id).get("pending_bans")
         pending_channel_text = f"<#{pending_channel_id}>" if pending_channel_id else "None set. Defaults to current channel."
         
         # Check permissions in the pending channel
@@ -88,6 +95,20 @@ class SetupCog(commands.Cog):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
+    # Moderator roles may be configured by name: re-resolve them when the guild's roles change
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        permissions.invalidate_roles(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            permissions.invalidate_roles(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        permissions.invalidate_roles(role.guild.id)
+
     @setup_check.error
     @setup_roles.error
     @setup_channel.error
@@ -5,18 +5,24 @@ from discord.ext import commands
 import asyncio
 import traceback
 from dotenv import load_dotenv
-from typing import Dict, Any
 
 # Import from new structure
 from utils.db_utils import PlayerDatabaseConnection
-from utils.permissions_utils import is_moderator
-from utils.config_manager import load_config # Import the new config loader
+from utils.permissions_utils import permissions
+from utils.config_manager import config_store
 from ban_history import ban_tracker
+from utils.channel_index import channel_player_index
+from utils.form_state import FormStateStore
+from utils.metrics import command_finished
 
 load_dotenv()
 
 # --- Global Bot Application State ---
-bot_user_form_state: Dict[int, Dict[str, Any]] = {}
+# Ban form state per user; TTL matches the 300s view timeouts so abandoned forms are swept
+bot_user_form_state = FormStateStore(
+    ttl=float(os.getenv("FORM_STATE_TTL", 300)),
+    maxsize=int(os.getenv("FORM_STATE_MAX_SESSIONS", 1000)),
+)
 
 # --- Bot Setup ---
 intents = discord.Intents.all()
@@ -24,10 +30,20 @@ bot = commands.Bot(command_prefix="--!", intents=intents, help_command=None)
 
 # --- Attach shared resources and configurations to the bot instance ---
 bot.user_form_state = bot_user_form_state
-bot.config = load_config() # Load config from config.json
-bot.is_moderator_check_func = lambda interaction: is_moderator(interaction, bot.config.get("moderator_roles", []))
+config_store.load()
+bot.config = config_store # In-memory config.json; change settings with bot.config.set(...)
+permissions.bind(config_store) # Compiled moderator role sets, rebuilt when the config changes
+bot.is_moderator_check_func = permissions.is_moderator
 bot.player_db = PlayerDatabaseConnection()
 
+# Limit the channel fallback search to channels that actually receive player dumps
+player_search_config = bot.config.get("player_search", {})
+channel_player_index.configure(
+    channel_keywords=player_search_config.get("channel_keywords", []),
+    category_keywords=player_search_config.get("category_keywords", []),
+    concurrency=player_search_config.get("concurrency"),
+)
+
 # List of cogs to load
 cogs_to_load = [
     "cogs.admin_cog",
@@ -35,6 +51,7 @@ cogs_to_load = [
     "cogs.history_cog",
     "cogs.setup_cog",
     "cogs.help_cog",
+    "cogs.metrics_cog",
 ]
 
 async def load_all_extensions():
@@ -54,6 +71,9 @@ async def on_ready():
     print(f"🚀 Bot {bot.user} (ID: {bot.user.id}) is ready and online!")
     print(f"Connected to {len(bot.guilds)} guild(s).")
     
+    bot.user_form_state.start_sweeper()
+    config_store.start()
+
     # Initialize database connections
     await bot.player_db.initialize()
     await ban_tracker.initialize()
@@ -78,6 +98,7 @@ async def on_ready():
 async def on_app_command_error(
     interaction: discord.Interaction, error: discord.app_commands.AppCommandError
 ):
+    command_finished(interaction, type(getattr(error, "original", error)).__name__)
     if isinstance(error, discord.app_commands.CommandOnCooldown):
         msg = f"This command is on cooldown. Try again in {error.retry_after:.2f}s."
         color = discord.Color.yellow()
@@ -119,6 +140,8 @@ async def main_async_runner():
             print(f"❌ An error occurred while running the bot: {e}")
         finally:
             print("Bot shutdown sequence initiated...")
+            bot.user_form_state.stop_sweeper()
+            await config_store.close()
             if hasattr(bot.player_db, 'pool') and bot.player_db.pool:
                 await bot.player_db.close()
             if hasattr(ban_tracker, 'pool') and ban_tracker.pool:
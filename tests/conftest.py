@@ -0,0 +1,54 @@
+# tests/conftest.py
+"""
+Shared fixtures. Every database test runs BanTracker on the SQLite backend in
+a scratch file, so the suite needs no server.
+
+The pool belongs to the event loop that opened it, so a test hands its whole
+scenario to `run_tracker`, which opens a tracker, awaits the scenario and
+closes it inside one asyncio.run().
+"""
+import asyncio
+
+import pytest
+
+from ban_history import BanTracker
+
+
+@pytest.fixture
+def sqlite_env(tmp_path, monkeypatch):
+    path = tmp_path / "bans.sqlite3"
+    monkeypatch.setenv("BAN_DB_BACKEND", "sqlite")
+    monkeypatch.setenv("BAN_DB_SQLITE_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def run_tracker(sqlite_env):
+    """run_tracker(scenario) -> scenario(tracker)'s result, on a fresh SQLite BanTracker"""
+    def run(scenario):
+        async def main():
+            tracker = BanTracker()
+            await tracker.initialize()
+            try:
+                return await scenario(tracker)
+            finally:
+                await tracker.close()
+        return asyncio.run(main())
+    return run
+
+
+def ban_entry(player_name="Alice", buid="uid-1", offense="Teamkilling", strike="Strike 1", **overrides):
+    """add_bans() entry with sensible defaults"""
+    entry = {
+        "player_name": player_name, "buid": buid, "offense": offense, "strike": strike,
+        "sanction": "24h ban", "transcript": "transcript-1", "submitted_by": "mod-1",
+    }
+    entry.update(overrides)
+    return entry
+
+
+async def fetch(tracker, query, args=None):
+    async with tracker.pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute(query, args)
+            return await cursor.fetchall()
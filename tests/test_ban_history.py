@@ -0,0 +1,240 @@
+# tests/test_ban_history.py
+import pytest
+
+from ban_history import backfill_player_summary, backfill_rollups
+
+from tests.conftest import ban_entry, fetch
+
+ROLLUPS_SQL = "SELECT day, action, offense, moderator, records, strikes_removed FROM ban_rollups ORDER BY 1, 2, 3, 4"
+SUMMARY_SQL = "SELECT buid, player_name, total_bans, active_strikes, last_ban_at FROM player_summary ORDER BY buid"
+TOKENS_SQL = "SELECT token, ban_id, field FROM ban_search_tokens ORDER BY 1, 2, 3"
+
+
+async def assert_aggregates_match_rebuild(tracker):
+    """The incrementally maintained rollups and summaries equal a rebuild from ban_history"""
+    rollups, summary = await fetch(tracker, ROLLUPS_SQL), await fetch(tracker, SUMMARY_SQL)
+    async with tracker.pool.acquire() as connection:
+        # Rebuild inside a transaction that is rolled back, leaving the tables as they were
+        await connection.begin()
+        try:
+            async with connection.cursor() as cursor:
+                await backfill_rollups(cursor)
+                await cursor.execute("DELETE FROM player_summary")
+                await backfill_player_summary(cursor)
+                await cursor.execute(ROLLUPS_SQL)
+                rebuilt_rollups = await cursor.fetchall()
+                await cursor.execute(SUMMARY_SQL)
+                rebuilt_summary = await cursor.fetchall()
+        finally:
+            await connection.rollback()
+    assert rollups == rebuilt_rollups
+    assert summary == rebuilt_summary
+
+
+# --- Number allocation (counter table) ---
+
+def test_ban_and_unban_numbers_have_separate_series(run_tracker):
+    async def scenario(tracker):
+        first = await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        unban = await tracker.add_ban("Alice", "uid-1", "Unban", "UNBAN", "", "t", "mod-1", is_unban=True)
+        second = await tracker.add_ban("Bob", "uid-2", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        return first, unban, second
+
+    assert run_tracker(scenario) == ("0001", "UNBAN-0001", "0002")
+
+
+def test_add_bans_claims_one_range_in_entry_order(run_tracker):
+    async def scenario(tracker):
+        await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        return await tracker.add_bans([
+            ban_entry("Bob", "uid-2"),
+            ban_entry("Bob", "uid-2", offense="Unban", strike="UNBAN", is_unban=True),
+            ban_entry("Carol", "uid-3"),
+        ])
+
+    assert run_tracker(scenario) == ["0002", "UNBAN-0001", "0003"]
+
+
+def test_claim_number_range_returns_the_first_of_consecutive_values(run_tracker):
+    async def scenario(tracker):
+        async with tracker.pool.acquire() as connection:
+            await connection.begin()
+            async with connection.cursor() as cursor:
+                first = await tracker._claim_number_range(cursor, count=5)
+                following = await tracker._claim_number_range(cursor)
+                unban = await tracker._claim_number_range(cursor, is_unban=True, count=2)
+            await connection.commit()
+        return first, following, unban
+
+    assert run_tracker(scenario) == (1, 6, 1)
+
+
+def test_failed_insert_does_not_consume_numbers(run_tracker):
+    async def scenario(tracker):
+        with pytest.raises(Exception):
+            # NOT NULL player_name: the INSERT fails after the number was claimed
+            await tracker.add_bans([ban_entry(player_name=None)])
+        return await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+
+    assert run_tracker(scenario) == "0001"
+
+
+def test_counters_catch_up_with_rows_written_without_them(run_tracker):
+    async def scenario(tracker):
+        async with tracker.pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute("""
+                    INSERT INTO ban_history (ban_number, ban_seq, player_name, buid, offense, strike, sanction,
+                                             submitted_by, is_unban)
+                    VALUES ('0041', 41, 'Legacy', 'uid-9', 'x', 'Strike 1', 'x', 'import', FALSE)
+                """)
+                await tracker._seed_counters(cursor)
+        return await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+
+    assert run_tracker(scenario) == "0042"
+
+
+# --- Per-player cache ---
+
+def test_history_is_cached_and_invalidated_by_writes(run_tracker):
+    async def scenario(tracker):
+        number = await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        assert len(await tracker.get_player_history("uid-1")) == 1
+        hits = tracker.cache_stats()["hits"]
+        assert len(await tracker.get_player_history("uid-1")) == 1
+        assert tracker.cache_stats()["hits"] == hits + 1
+
+        second = await tracker.add_ban("Alice", "uid-1", "Cheating", "Strike 2", "7d", "t", "mod-1")
+        assert {r.ban_number for r in await tracker.get_player_history("uid-1")} == {number, second}
+        assert await tracker.get_player_strikes("uid-1") == 2
+
+        assert await tracker.remove_strike(number)
+        assert await tracker.get_player_strikes("uid-1") == 1
+        assert (await tracker.get_player_summary("uid-1"))["active_strikes"] == 1
+
+        assert await tracker.delete_ban(second)
+        assert [r.ban_number for r in await tracker.get_player_history("uid-1")] == [number]
+        assert await tracker.get_player_strikes("uid-1") == 0
+
+    run_tracker(scenario)
+
+
+def test_first_history_page_is_cached_and_invalidated(run_tracker):
+    async def scenario(tracker):
+        await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        page = await tracker.get_player_history_page("uid-1")
+        assert (page["total"], page["active_strikes"]) == (1, 1)
+        hits = tracker.cache_stats()["hits"]
+        await tracker.get_player_history_page("uid-1")
+        assert tracker.cache_stats()["hits"] == hits + 1
+
+        await tracker.add_ban("Alice", "uid-1", "Cheating", "Strike 2", "7d", "t", "mod-1")
+        page = await tracker.get_player_history_page("uid-1")
+        assert (page["total"], page["active_strikes"]) == (2, 2)
+
+    run_tracker(scenario)
+
+
+def test_history_pages_walk_every_record_once(run_tracker):
+    async def scenario(tracker):
+        numbers = await tracker.add_bans([ban_entry(offense=f"Offense {i}") for i in range(7)])
+        seen, cursor = [], None
+        while True:
+            page = await tracker.get_player_history_page("uid-1", cursor, limit=3)
+            seen += [entry.ban_number for entry in page["entries"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return numbers, seen
+
+    numbers, seen = run_tracker(scenario)
+    assert sorted(seen) == sorted(numbers)
+    assert len(seen) == len(set(seen))
+
+
+# --- remove_strike / delete_ban ---
+
+def test_remove_strike_only_succeeds_once(run_tracker):
+    async def scenario(tracker):
+        number = await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        return await tracker.remove_strike(number), await tracker.remove_strike(number), await tracker.remove_strike("9999")
+
+    assert run_tracker(scenario) == (True, False, False)
+
+
+def test_delete_unknown_ban_returns_false(run_tracker):
+    async def scenario(tracker):
+        return await tracker.delete_ban("0404")
+
+    assert run_tracker(scenario) is False
+
+
+# --- Rollups, player summaries and search tokens ---
+
+def test_aggregates_follow_add_remove_and_delete(run_tracker):
+    async def scenario(tracker):
+        numbers = await tracker.add_bans([
+            ban_entry("Alice", "uid-1", submitted_by="mod-1"),
+            ban_entry("Alice", "uid-1", offense="Cheating", strike="Strike 2", submitted_by="mod-2"),
+            ban_entry("Bob", "uid-2", strike="Custom", submitted_by="mod-1"),
+        ])
+        await tracker.add_ban("Alice", "uid-1", "Unban", "UNBAN", "", "t", "mod-1", is_unban=True)
+        await assert_aggregates_match_rebuild(tracker)
+
+        assert await tracker.remove_strike(numbers[0])
+        await assert_aggregates_match_rebuild(tracker)
+
+        assert await tracker.delete_ban(numbers[1])
+        assert await tracker.delete_ban(numbers[2])
+        await assert_aggregates_match_rebuild(tracker)
+
+        summary = {row[0]: row[1:4] for row in await fetch(tracker, SUMMARY_SQL)}
+        rollups = await fetch(tracker, ROLLUPS_SQL)
+        return summary, rollups
+
+    summary, rollups = run_tracker(scenario)
+    # Bob's only ban is gone, so is his summary row; Alice keeps one ban whose strike was removed
+    assert summary == {"uid-1": ("Alice", 1, 0)}
+    # No empty rollup rows are left behind by the deletes
+    assert all(row[4] > 0 for row in rollups)
+    assert sorted((row[1], row[2], row[4], row[5]) for row in rollups) == [
+        ("ban", "Teamkilling", 1, 1), ("unban", "Unban", 1, 0)
+    ]
+
+
+def test_trends_count_bans_unbans_and_removed_strikes(run_tracker):
+    async def scenario(tracker):
+        numbers = await tracker.add_bans([ban_entry(), ban_entry("Bob", "uid-2")])
+        await tracker.add_ban("Alice", "uid-1", "Unban", "UNBAN", "", "t", "mod-1", is_unban=True)
+        await tracker.remove_strike(numbers[0])
+        return await tracker.get_ban_trends(days=7)
+
+    trends = run_tracker(scenario)
+    assert trends["daily"][-1][1:] == (2, 1)
+    assert trends["strikes_removed"] == 1
+    assert trends["top_offenses"] == [("Teamkilling", 2)]
+
+
+def test_search_tokens_follow_add_and_delete(run_tracker):
+    async def scenario(tracker):
+        number = await tracker.add_ban("Zed Fireheart", "uid-7", "Combat logging", "Strike 1", "24h", "t", "mod-1")
+        found = [r.ban_number for r in await tracker.search_bans("fire")]
+        by_offense = [r.ban_number for r in await tracker.search_bans("combat log")]
+        by_number = [r.ban_number for r in await tracker.search_bans(number.lstrip("0"))]
+        await tracker.delete_ban(number)
+        tokens_left = await fetch(tracker, TOKENS_SQL)
+        after_delete = await tracker.search_bans("fire")
+        return number, found, by_offense, by_number, tokens_left, after_delete
+
+    number, found, by_offense, by_number, tokens_left, after_delete = run_tracker(scenario)
+    assert found == by_offense == by_number == [number]
+    assert tokens_left == []
+    assert after_delete == []
+
+
+def test_repeat_offenders_come_from_player_summary(run_tracker):
+    async def scenario(tracker):
+        await tracker.add_bans([ban_entry(), ban_entry(offense="Cheating"), ban_entry("Bob", "uid-2")])
+        return await tracker.get_players_with_multiple_bans()
+
+    offenders = run_tracker(scenario)
+    assert [(o["buid"], o["total_bans"], o["active_strikes"]) for o in offenders] == [("uid-1", 2, 2)]
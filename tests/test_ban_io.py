@@ -0,0 +1,129 @@
+# tests/test_ban_io.py
+import json
+
+from ban_io import export_bans, import_bans, prepare_record
+from utils.ban_search import normalize_ban_number
+
+from tests.conftest import fetch
+from tests.test_ban_history import assert_aggregates_match_rebuild
+
+
+def record(ban_number, player_name="Alice", buid="uid-1", **overrides):
+    """One line of an export file"""
+    entry = {
+        "ban_number": ban_number, "player_name": player_name, "buid": buid, "offense": "Teamkilling",
+        "strike": "Strike 1", "sanction": "24h ban", "transcript": "t", "submitted_by": "mod-1",
+        "timestamp": "2024-03-01T12:00:00",
+    }
+    entry.update(overrides)
+    return entry
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return str(path)
+
+
+# --- Ban number normalisation ---
+
+def test_normalize_ban_number():
+    assert normalize_ban_number("42") == "0042"
+    assert normalize_ban_number(" 000042 ") == "0042"
+    assert normalize_ban_number("12345") == "12345"
+    assert normalize_ban_number("unban-1") == "UNBAN-0001"
+    assert normalize_ban_number("UNBAN7") == "UNBAN-0007"
+    assert normalize_ban_number("Alice") is None
+    assert normalize_ban_number("") is None
+
+
+def test_prepare_record_normalizes_numbers():
+    values = prepare_record(record("7"), keep_ids=False)
+    assert values[:2] == ("0007", 7)
+    assert values[10] is False
+
+    # The UNBAN- prefix marks an unban even without is_unban in the file
+    values = prepare_record(record("unban-3"), keep_ids=False)
+    assert values[:2] == ("UNBAN-0003", 3)
+    assert values[10] is True
+
+
+def test_prepare_record_keeps_ids_only_when_asked():
+    source = record("0001", id="17", related_ban_id="4")
+    assert prepare_record(source, keep_ids=False)[11] is None
+    with_ids = prepare_record(source, keep_ids=True)
+    assert (with_ids[0], with_ids[12]) == (17, 4)
+
+
+# --- Import ---
+
+def test_import_rebuilds_aggregates_and_reseeds_counters(run_tracker, tmp_path):
+    path = write_jsonl(tmp_path / "bans.jsonl", [
+        record("41"),
+        record("42", "Bob", "uid-2", offense="Cheating"),
+        record("UNBAN-0005", offense="Unban", strike="UNBAN"),
+        record("41", "Carol", "uid-3"),  # repeats the first record's number
+    ])
+
+    async def scenario(tracker):
+        inserted = await import_bans(tracker, path, "jsonl", chunk_size=2, resume=False)
+        await assert_aggregates_match_rebuild(tracker)
+        numbers = [row[0] for row in await fetch(tracker, "SELECT ban_number FROM ban_history ORDER BY id")]
+        found = [r.ban_number for r in await tracker.search_bans("cheat")]
+        summary = await tracker.get_player_summary("uid-1")
+        next_ban = await tracker.add_ban("Dave", "uid-4", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        next_unban = await tracker.add_ban("Dave", "uid-4", "Unban", "UNBAN", "", "t", "mod-1", is_unban=True)
+        return inserted, numbers, found, summary, next_ban, next_unban
+
+    inserted, numbers, found, summary, next_ban, next_unban = run_tracker(scenario)
+    assert inserted == 3
+    assert numbers == ["0041", "0042", "UNBAN-0005"]
+    assert found == ["0042"]
+    assert (len(summary["history"]), summary["active_strikes"]) == (2, 1)
+    # New numbers continue after the imported ones
+    assert (next_ban, next_unban) == ("0043", "UNBAN-0006")
+
+
+def test_reimport_skips_existing_numbers(run_tracker, tmp_path):
+    path = write_jsonl(tmp_path / "bans.jsonl", [record("1"), record("2", "Bob", "uid-2")])
+
+    async def scenario(tracker):
+        first = await import_bans(tracker, path, "jsonl", chunk_size=10, resume=False)
+        again = await import_bans(tracker, path, "jsonl", chunk_size=10, resume=False)
+        count = (await fetch(tracker, "SELECT COUNT(*) FROM ban_history"))[0][0]
+        return first, again, count
+
+    assert run_tracker(scenario) == (2, 0, 2)
+
+
+def test_import_drops_cached_player_history(run_tracker, tmp_path):
+    path = write_jsonl(tmp_path / "bans.jsonl", [record("9")])
+
+    async def scenario(tracker):
+        await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+        before = len(await tracker.get_player_history("uid-1"))
+        await import_bans(tracker, path, "jsonl", chunk_size=10, resume=False)
+        return before, len(await tracker.get_player_history("uid-1"))
+
+    assert run_tracker(scenario) == (1, 2)
+
+
+def test_export_then_import_round_trips(run_tracker, tmp_path, monkeypatch):
+    export_path = str(tmp_path / "export.csv")
+
+    async def source(tracker):
+        await tracker.add_bans([
+            {"player_name": "Alice", "buid": "uid-1", "offense": "Teamkilling", "strike": "Strike 1",
+             "sanction": "24h", "transcript": "t", "submitted_by": "mod-1"},
+            {"player_name": "Bob", "buid": "uid-2", "offense": "Cheating", "strike": "Strike 1",
+             "sanction": "7d", "transcript": "t", "submitted_by": "mod-2"},
+        ])
+        return await export_bans(tracker, export_path, "csv", chunk_size=1, resume=False)
+
+    async def target(tracker):
+        inserted = await import_bans(tracker, export_path, "csv", chunk_size=10, resume=False)
+        rows = await fetch(tracker, "SELECT ban_number, player_name, offense, submitted_by FROM ban_history ORDER BY id")
+        return inserted, rows
+
+    assert run_tracker(source) == 2
+    monkeypatch.setenv("BAN_DB_SQLITE_PATH", str(tmp_path / "restored.sqlite3"))
+    assert run_tracker(target) == (2, [("0001", "Alice", "Teamkilling", "mod-1"), ("0002", "Bob", "Cheating", "mod-2")])
@@ -0,0 +1,119 @@
+# tests/test_config_store.py
+import asyncio
+import json
+import time
+
+from utils.config_manager import DEFAULT_CONFIG, ConfigStore
+
+
+def make_store(tmp_path, data=None, save_delay=0.01):
+    path = tmp_path / "config.json"
+    if data is not None:
+        path.write_text(json.dumps(data), encoding="utf-8")
+    store = ConfigStore(str(path), save_delay=save_delay, reload_interval=0)
+    store.load()
+    return store, path
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_missing_file_is_created_with_defaults(tmp_path):
+    store, path = make_store(tmp_path)
+    assert read(path) == DEFAULT_CONFIG
+    assert store.get("moderator_roles") == []
+
+
+def test_corrupt_file_is_moved_aside(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{not json", encoding="utf-8")
+    store = ConfigStore(str(path), reload_interval=0)
+    store.load()
+    backups = list(tmp_path.glob("config.json.corrupt-*"))
+    assert len(backups) == 1
+    assert backups[0].read_text(encoding="utf-8") == "{not json"
+    assert read(path) == DEFAULT_CONFIG
+
+
+def test_changes_within_the_delay_are_saved_once(tmp_path):
+    store, path = make_store(tmp_path, {"moderator_roles": []}, save_delay=0.05)
+
+    async def main():
+        for role in range(5):
+            store.set("moderator_roles", list(range(role + 1)))
+        await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+    assert store.saves == 1
+    assert read(path)["moderator_roles"] == [0, 1, 2, 3, 4]
+
+
+def test_change_during_a_write_is_saved(tmp_path, monkeypatch):
+    store, path = make_store(tmp_path, {"moderator_roles": []})
+    write_file = store._write_file
+
+    def slow_write(text):
+        time.sleep(0.1)
+        write_file(text)
+
+    monkeypatch.setattr(store, "_write_file", slow_write)
+
+    async def main():
+        store.set("moderator_roles", [1])
+        await asyncio.sleep(0.05)  # the first save is now writing
+        store.set("moderator_roles", [1, 2])
+        await asyncio.sleep(0.4)
+
+    asyncio.run(main())
+    assert store.saves == 2
+    assert read(path)["moderator_roles"] == [1, 2]
+
+
+def test_close_writes_pending_changes(tmp_path):
+    store, path = make_store(tmp_path, {"moderator_roles": []}, save_delay=60)
+
+    async def main():
+        store.set("moderator_roles", [7])
+        await store.close()
+
+    asyncio.run(main())
+    assert read(path)["moderator_roles"] == [7]
+
+
+def test_guild_values_override_shared_ones(tmp_path):
+    store, _ = make_store(tmp_path, {"moderator_roles": [1], "channels": {"pending_bans": 10, "log": 11}})
+    store.set("channels", {"pending_bans": 20}, guild_id=5)
+
+    assert store.get("moderator_roles", guild_id=5) == [1]
+    assert not store.has_guild_value("moderator_roles", 5)
+    assert store.get("channels", guild_id=5) == {"pending_bans": 20, "log": 11}
+    assert store.has_guild_value("channels", 5)
+    assert store.get("channels", guild_id=6) == {"pending_bans": 10, "log": 11}
+    assert store.guild_ids() == [5]
+
+
+def test_outside_edit_is_reloaded_and_announced(tmp_path):
+    store, path = make_store(tmp_path, {"moderator_roles": [1]})
+    changes = []
+    store.add_listener(changes.append)
+
+    async def main():
+        unchanged = await store.reload_if_changed()
+        path.write_text(json.dumps({"moderator_roles": [1, 2, 3]}), encoding="utf-8")
+        return unchanged, await store.reload_if_changed()
+
+    assert asyncio.run(main()) == (False, True)
+    assert store.get("moderator_roles") == [1, 2, 3]
+    assert (store.reloads, changes) == (1, [None])
+
+
+def test_unparseable_edit_keeps_current_settings(tmp_path):
+    store, path = make_store(tmp_path, {"moderator_roles": [1]})
+
+    async def main():
+        path.write_text('{"moderator_roles": [', encoding="utf-8")
+        return await store.reload_if_changed()
+
+    assert asyncio.run(main()) is False
+    assert store.get("moderator_roles") == [1]
@@ -0,0 +1,121 @@
+# tests/test_explain_hot_queries.py
+"""
+EXPLAIN the hot ban_history queries against a scratch MySQL/MariaDB and check
+each one uses the index it was written for.
+
+Points BanTracker at the database named by EXPLAIN_DB_NAME, runs the
+migrations, makes sure ban_history holds EXPLAIN_DB_ROWS synthetic rows (the
+optimizer happily scans tiny tables, so plans only mean something with data in
+them), then EXPLAINs every per-player and counter query. Skipped when
+EXPLAIN_DB_NAME is not set.
+
+    EXPLAIN_DB_NAME=ban_explain EXPLAIN_DB_PASSWORD=... python -m pytest tests/test_explain_hot_queries.py
+"""
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+DATABASE = os.getenv("EXPLAIN_DB_NAME")
+if not DATABASE:
+    pytest.skip("EXPLAIN_DB_NAME is not set; no database to EXPLAIN against", allow_module_level=True)
+pytest.importorskip("aiomysql")
+
+from ban_history import BanTracker, LIST_COLUMNS_SQL  # noqa: E402
+
+SAMPLE_BUID = "uid-00042"
+
+# (label, query, params, expected key)
+HOT_QUERIES = [
+    ("player history", f"SELECT {LIST_COLUMNS_SQL} FROM ban_history WHERE buid = %s ORDER BY timestamp DESC",
+     (SAMPLE_BUID,), "idx_buid_timestamp"),
+    ("history first page", f"""
+        SELECT {LIST_COLUMNS_SQL} FROM ban_history WHERE buid = %s
+        ORDER BY timestamp DESC, id DESC LIMIT 5""", (SAMPLE_BUID,), "idx_buid_timestamp"),
+    ("history next page", f"""
+        SELECT {LIST_COLUMNS_SQL} FROM ban_history
+        WHERE buid = %s AND (timestamp < %s OR (timestamp = %s AND id < %s))
+        ORDER BY timestamp DESC, id DESC LIMIT 5""",
+     (SAMPLE_BUID, datetime(2030, 1, 1), datetime(2030, 1, 1), 1 << 30), "idx_buid_timestamp"),
+    ("active strikes", """
+        SELECT COUNT(*) FROM ban_history WHERE buid = %s AND is_unban = FALSE
+        AND strike_removed = FALSE AND strike != 'Custom' AND strike != 'UNBAN'""", (SAMPLE_BUID,), "idx_buid_strikes"),
+    ("ban by number", "SELECT id FROM ban_history WHERE ban_number = %s", ("0042",), "ban_number"),
+    ("recent bans", f"SELECT {LIST_COLUMNS_SQL} FROM ban_history ORDER BY timestamp DESC LIMIT 10", (), "idx_timestamp"),
+    ("highest ban seq", "SELECT MAX(ban_seq) FROM ban_history WHERE is_unban = FALSE", (), "idx_unban_seq"),
+    ("highest unban seq", "SELECT MAX(ban_seq) FROM ban_history WHERE is_unban = TRUE", (), "idx_unban_seq"),
+]
+
+
+async def seed(tracker: BanTracker, rows: int):
+    rng = random.Random(42)
+    base = datetime(2023, 1, 1)
+    async with tracker.pool.acquire() as connection:
+        async with connection.cursor() as cursor:
+            await cursor.execute("SELECT COUNT(*) FROM ban_history")
+            existing = (await cursor.fetchone())[0]
+            if existing >= rows:
+                return
+            batch = []
+            for seq in range(existing + 1, rows + 1):
+                is_unban = seq % 20 == 0
+                batch.append((
+                    f"UNBAN-{seq:04d}" if is_unban else f"{seq:04d}", seq,
+                    f"Player{seq % 5000}", f"uid-{seq % 5000:05d}", "Teamkilling",
+                    "UNBAN" if is_unban else rng.choice(["Strike 1", "Strike 2", "Custom"]),
+                    "24h ban", "", "1", base + timedelta(minutes=seq), is_unban, rng.random() < 0.1,
+                ))
+                if len(batch) == 1000 or seq == rows:
+                    await cursor.executemany("""
+                        INSERT INTO ban_history (ban_number, ban_seq, player_name, buid, offense, strike,
+                            sanction, transcript, submitted_by, timestamp, is_unban, strike_removed)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """, batch)
+                    batch = []
+            await cursor.execute("ANALYZE TABLE ban_history")
+            await cursor.fetchall()
+
+
+async def explain_all() -> dict:
+    """label -> the EXPLAIN rows for ban_history (table is NULL when MAX() is optimized away)"""
+    tracker = BanTracker()
+    tracker.backend_name = "mysql"
+    tracker.host = os.getenv("EXPLAIN_DB_HOST", "127.0.0.1")
+    tracker.port = int(os.getenv("EXPLAIN_DB_PORT", 3306))
+    tracker.user = os.getenv("EXPLAIN_DB_USER", "root")
+    tracker.password = os.getenv("EXPLAIN_DB_PASSWORD", "")
+    tracker.database = DATABASE
+    await tracker.initialize()
+    plans = {}
+    try:
+        rows = int(os.getenv("EXPLAIN_DB_ROWS", 50000))
+        if rows:
+            await seed(tracker, rows)
+        async with tracker.pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                for label, query, params, _ in HOT_QUERIES:
+                    await cursor.execute("EXPLAIN " + query, params)
+                    columns = [d[0] for d in cursor.description]
+                    plans[label] = [plan for plan in (dict(zip(columns, row)) for row in await cursor.fetchall())
+                                    if plan.get("table") in ("ban_history", None)]
+    finally:
+        await tracker.close()
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans():
+    return asyncio.run(explain_all())
+
+
+@pytest.mark.parametrize("label,expected_key", [(label, key) for label, _, _, key in HOT_QUERIES])
+def test_hot_query_uses_index(plans, label, expected_key):
+    assert plans[label], f"EXPLAIN {label} returned no plan for ban_history"
+    for plan in plans[label]:
+        # MAX() answered from the index alone shows no table access at all
+        if "Select tables optimized away" in (plan.get("Extra") or ""):
+            continue
+        assert plan.get("type") != "ALL", f"{label} scans ban_history: {plan}"
+        assert plan.get("key") == expected_key, f"{label} uses {plan.get('key')}, expected {expected_key}: {plan}"
@@ -0,0 +1,158 @@
+# tests/test_pending_requests.py
+from types import SimpleNamespace
+
+import cogs.ban_cog
+from cogs.ban_cog import BanCog
+
+
+def ban_data(name="Alice", buid="uid-1", unban=False):
+    """The ban_data a submitted ban/unban form stores"""
+    return {
+        "player_data": {"Name": name, "BohemiaUID": buid},
+        "offense": "Teamkilling", "strike": "Strike 1", "sanction": "24h ban",
+        "transcript": "transcript-1", "submitted_by_id": 5,
+        "unban_data": {"ban_number": "0001"} if unban else None,
+    }
+
+
+async def submit(tracker, name="Alice", buid="uid-1", unban=False, message_id=None):
+    request_id = await tracker.create_pending_request(ban_data(name, buid, unban), name, buid, "5")
+    if message_id:
+        await tracker.attach_pending_message(request_id, 100, message_id)
+    return request_id
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id):
+        self.channel, self.id = channel, message_id
+
+    async def edit(self, **kwargs):
+        self.channel.edits[self.id] = kwargs
+
+
+class FakeChannel:
+    def __init__(self):
+        self.edits = {}
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+
+def fake_interaction(channel):
+    return SimpleNamespace(
+        user=SimpleNamespace(id=42, mention="<@42>"),
+        guild=SimpleNamespace(get_channel=lambda channel_id: channel if channel_id == 100 else None),
+    )
+
+
+# --- Claim / resolve ---
+
+def test_claim_skips_requests_already_claimed(run_tracker):
+    async def scenario(tracker):
+        first, second = await submit(tracker), await submit(tracker, "Bob", "uid-2")
+        mine = await tracker.claim_pending_requests([first], "mod-1")
+        theirs = await tracker.claim_pending_requests([first, second], "mod-2")
+        return [r["id"] for r in mine], [r["id"] for r in theirs], theirs[0]["ban_data"], (first, second)
+
+    mine, theirs, data, (first, second) = run_tracker(scenario)
+    assert mine == [first]
+    assert theirs == [second]
+    # ban_data comes back decoded
+    assert data["player_data"]["Name"] == "Bob"
+
+
+def test_resolve_only_moves_requests_in_the_expected_status(run_tracker):
+    async def scenario(tracker):
+        request_id = await submit(tracker)
+        # Still 'pending': a resolve from 'processing' does nothing
+        untouched = await tracker.resolve_pending_requests([(request_id, "0001")], "approved", "mod-1")
+        await tracker.claim_pending_requests([request_id], "mod-1")
+        moved = await tracker.resolve_pending_requests([(request_id, "0001")], "approved", "mod-1")
+        return untouched, moved, await tracker.get_pending_request(request_id)
+
+    untouched, moved, request = run_tracker(scenario)
+    assert (untouched, moved) == (0, 1)
+    assert (request["status"], request["result_ban_number"]) == ("approved", "0001")
+
+
+def test_interrupted_approvals_are_requeued(run_tracker):
+    async def scenario(tracker):
+        stuck, done = await submit(tracker), await submit(tracker, "Bob", "uid-2")
+        await tracker.claim_pending_requests([stuck, done], "mod-1")
+        await tracker.resolve_pending_requests([(done, "0001")], "approved", "mod-1")
+        requeued = await tracker.requeue_unfinished_requests()
+        pending = [r["id"] for r in await tracker.list_pending_requests()]
+        return requeued, pending, stuck
+
+    requeued, pending, stuck = run_tracker(scenario)
+    assert requeued == 1
+    assert pending == [stuck]
+
+
+def test_list_pending_requests_flags_unbans(run_tracker):
+    async def scenario(tracker):
+        await submit(tracker)
+        await submit(tracker, unban=True)
+        return [bool(r["is_unban"]) for r in await tracker.list_pending_requests()]
+
+    assert run_tracker(scenario) == [False, True]
+
+
+# --- Bulk approve ---
+
+def test_bulk_approve_records_bans_and_updates_messages(run_tracker, monkeypatch):
+    channel = FakeChannel()
+
+    async def scenario(tracker):
+        monkeypatch.setattr(cogs.ban_cog, "ban_tracker", tracker)
+        cog = BanCog(bot=None)
+        alice = await submit(tracker, message_id=1001)
+        bob = await submit(tracker, "Bob", "uid-2", message_id=1002)
+        unban = await submit(tracker, unban=True, message_id=1003)
+        taken = await submit(tracker, "Carol", "uid-3", message_id=1004)
+        views = {request_id: cog.ModerationActionView(request_id, cog) for request_id in (alice, bob, unban)}
+        cog._request_views.update(views)
+        # Another moderator got to Carol's request first
+        await tracker.claim_pending_requests([taken], "mod-2")
+
+        summary = await cog._bulk_approve(fake_interaction(channel), [alice, bob, unban, taken])
+        requests = {request_id: await tracker.get_pending_request(request_id) for request_id in (alice, bob, unban, taken)}
+        history = await tracker.get_player_history("uid-2")
+        return summary, requests, history, views, cog._request_views, (alice, bob, unban, taken)
+
+    summary, requests, history, views, live_views, (alice, bob, unban, taken) = run_tracker(scenario)
+    assert summary.splitlines() == [
+        "✅ Approved 2 ban(s): 0001, 0002",
+        "ℹ️ 1 request(s) were already handled by someone else.",
+        "ℹ️ 1 unban request(s) were left for individual approval.",
+    ]
+    assert (requests[alice]["status"], requests[alice]["result_ban_number"]) == ("approved", "0001")
+    assert (requests[bob]["status"], requests[bob]["result_ban_number"]) == ("approved", "0002")
+    # The unban goes back to the queue, the other moderator keeps their claim
+    assert requests[unban]["status"] == "pending"
+    assert (requests[taken]["status"], requests[taken]["resolved_by"]) == ("processing", "mod-2")
+    assert [r.player_name for r in history] == ["Bob"]
+
+    assert sorted(channel.edits) == [1001, 1002]
+    assert channel.edits[1002]["view"] is None
+    assert channel.edits[1002]["embed"].title == "Ban Approved: Bob"
+    # Approved requests' buttons are stopped, the unban's stay live
+    assert views[alice].is_finished() and views[bob].is_finished()
+    assert not views[unban].is_finished()
+    assert list(live_views) == [unban]
+
+
+def test_bulk_approve_reports_claim_errors(run_tracker, monkeypatch):
+    async def scenario(tracker):
+        request_id = await submit(tracker)
+        monkeypatch.setattr(cogs.ban_cog, "ban_tracker", tracker)
+        pool, tracker.pool = tracker.pool, None
+        try:
+            summary = await BanCog(bot=None)._bulk_approve(fake_interaction(FakeChannel()), [request_id])
+        finally:
+            tracker.pool = pool
+        return summary, await tracker.get_pending_request(request_id)
+
+    summary, request = run_tracker(scenario)
+    assert summary.startswith("❌ Could not claim the selected requests")
+    assert request["status"] == "pending"
@@ -0,0 +1,133 @@
+# tests/test_permissions.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from utils.config_manager import ConfigStore
+from utils.permissions_utils import (ADMINISTRATOR, DENIED_EXTRA, DENIED_MESSAGE, MODERATOR, PermissionRegistry,
+                                     permissions, require)
+
+
+class FakeResponse:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, content, ephemeral=False):
+        self.sent.append((content, ephemeral))
+
+
+def role(role_id, name=""):
+    return SimpleNamespace(id=role_id, name=name)
+
+
+def make_guild(*roles, guild_id=1):
+    return SimpleNamespace(id=guild_id, roles=list(roles))
+
+
+def make_interaction(guild, *roles, administrator=False):
+    user = SimpleNamespace(roles=list(roles), guild_permissions=SimpleNamespace(administrator=administrator))
+    return SimpleNamespace(guild=guild, user=user, response=FakeResponse(), extras={})
+
+
+def make_registry(tmp_path, moderator_roles):
+    path = tmp_path / "config.json"
+    store = ConfigStore(str(path), reload_interval=0)
+    store.load()
+    store.set("moderator_roles", moderator_roles)
+    registry = PermissionRegistry()
+    registry.bind(store)
+    return registry, store
+
+
+def test_role_ids_and_names_grant_moderator(tmp_path):
+    registry, _ = make_registry(tmp_path, [10, "Staff"])
+    staff, member = role(20, "Staff"), role(30, "Member")
+    guild = make_guild(staff, member)
+
+    assert registry.moderator_role_ids(guild) == {10, 20}
+    assert registry.is_moderator(make_interaction(guild, role(10)))
+    assert registry.is_moderator(make_interaction(guild, staff))
+    assert not registry.is_moderator(make_interaction(guild, member))
+    # No guild (DMs) or a plain User without roles
+    assert not registry.is_moderator(SimpleNamespace(guild=None, user=SimpleNamespace()))
+    assert not registry.is_moderator(SimpleNamespace(guild=guild, user=SimpleNamespace()))
+
+
+def test_config_changes_recompile_the_role_set(tmp_path):
+    registry, store = make_registry(tmp_path, [10])
+    guild = make_guild()
+    assert registry.moderator_role_ids(guild) == {10}
+
+    store.set("moderator_roles", [11])
+    assert registry.moderator_role_ids(guild) == {11}
+
+    store.set("moderator_roles", [12], guild_id=guild.id)
+    assert registry.moderator_role_ids(guild) == {12}
+    assert registry.moderator_role_ids(make_guild(guild_id=2)) == {11}
+
+
+def test_renamed_role_is_resolved_again(tmp_path):
+    registry, _ = make_registry(tmp_path, ["Staff"])
+    old, new = role(20, "Staff"), role(21, "Helpers")
+    guild = make_guild(old, new)
+    assert registry.moderator_role_ids(guild) == {20}
+
+    old.name, new.name = "Retired", "Staff"
+    # Still the cached set until the guild's roles are reported as changed
+    assert registry.moderator_role_ids(guild) == {20}
+    registry.invalidate_roles(guild.id)
+    assert registry.moderator_role_ids(guild) == {21}
+
+
+@pytest.fixture
+def moderators(tmp_path, monkeypatch):
+    """Point the shared `permissions` registry (used by MODERATOR) at a config granting role 10"""
+    registry, store = make_registry(tmp_path, [10])
+    for attribute in ("_config", "_compiled", "_role_ids"):
+        monkeypatch.setattr(permissions, attribute, getattr(registry, attribute))
+    return store
+
+
+class Button:
+    def __init__(self):
+        self.calls = 0
+
+    @require(MODERATOR)
+    async def moderator_only(self, interaction):
+        self.calls += 1
+        return "ran"
+
+    @require(ADMINISTRATOR, denied="admins only")
+    async def admin_only(self, interaction):
+        self.calls += 1
+        return "ran"
+
+
+def test_require_runs_allowed_callbacks(moderators):
+    button, interaction = Button(), make_interaction(make_guild(), role(10))
+
+    assert asyncio.run(button.moderator_only(interaction)) == "ran"
+    assert button.calls == 1
+    assert interaction.response.sent == []
+    assert DENIED_EXTRA not in interaction.extras
+
+
+def test_require_denies_and_marks_the_interaction(moderators):
+    button, interaction = Button(), make_interaction(make_guild(), role(30))
+
+    assert asyncio.run(button.moderator_only(interaction)) is None
+    assert button.calls == 0
+    assert interaction.response.sent == [(DENIED_MESSAGE, True)]
+    assert interaction.extras[DENIED_EXTRA] is True
+
+
+def test_administrator_policy_uses_guild_permissions():
+    button = Button()
+    admin = make_interaction(make_guild(), administrator=True)
+    member = make_interaction(make_guild())
+
+    assert asyncio.run(button.admin_only(admin)) == "ran"
+    assert asyncio.run(button.admin_only(member)) is None
+    assert member.response.sent == [("admins only", True)]
+    assert (MODERATOR | ADMINISTRATOR).name == "moderator or administrator"
@@ -0,0 +1,128 @@
+# tests/test_storage.py
+import asyncio
+
+import pytest
+
+from ban_history import SQLITE_MIGRATIONS
+from utils.migrations import Migration, MigrationRunner
+from utils.storage import translate_mysql
+
+from tests.conftest import fetch
+
+
+def test_translate_placeholders_only_with_args():
+    assert translate_mysql("SELECT * FROM t WHERE a = %s AND b LIKE 'x%%'", True) == \
+        "SELECT * FROM t WHERE a = ? AND b LIKE 'x%'"
+    # pymysql leaves the query untouched when no args are passed
+    assert translate_mysql("SELECT '%%'", False) == "SELECT '%%'"
+
+
+def test_translate_insert_ignore():
+    assert translate_mysql("INSERT IGNORE INTO t (a) VALUES (%s)", True) == "INSERT OR IGNORE INTO t (a) VALUES (?)"
+    assert translate_mysql("insert  ignore into t (a) values (%s)", True).startswith("INSERT OR IGNORE")
+
+
+def test_translate_on_duplicate_key_update():
+    query = translate_mysql(
+        "INSERT INTO c (name, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = GREATEST(value, VALUES(value))",
+        True
+    )
+    assert query == "INSERT INTO c (name, value) VALUES (?, ?) ON CONFLICT DO UPDATE SET value = GREATEST(value, excluded.value)"
+
+
+def test_translate_for_update():
+    assert translate_mysql("SELECT id FROM t WHERE a = %s FOR UPDATE", True) == "SELECT id FROM t WHERE a = ?"
+    assert translate_mysql("SELECT id FROM t\n  ORDER BY id for update", False) == "SELECT id FROM t\n  ORDER BY id"
+
+
+def test_migrations_apply_once(run_tracker):
+    async def scenario(tracker):
+        runner = MigrationRunner(SQLITE_MIGRATIONS, lock_name="ban_history_migrations", table_options="")
+        again = await runner.run(tracker.pool)
+        versions = [row[0] for row in await fetch(tracker, "SELECT version FROM schema_migrations ORDER BY version")]
+        return again, versions
+
+    again, versions = run_tracker(scenario)
+    assert again == []
+    assert versions == [m.version for m in SQLITE_MIGRATIONS]
+
+
+def test_reopening_the_database_keeps_schema_and_counters(run_tracker):
+    async def first(tracker):
+        return await tracker.add_ban("Alice", "uid-1", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+
+    async def second(tracker):
+        return await tracker.add_ban("Bob", "uid-2", "Teamkilling", "Strike 1", "24h", "t", "mod-1")
+
+    assert run_tracker(first) == "0001"
+    assert run_tracker(second) == "0002"
+
+
+class _FakeCursor:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.executed = []
+        self._result = []
+
+    async def execute(self, query, args=None):
+        self.executed.append(query.strip())
+        if query.startswith("ALTER") and self.fail_with:
+            raise self.fail_with
+        self._result = [(1,)] if "GET_LOCK" in query else []
+
+    async def fetchone(self):
+        return self._result[0] if self._result else None
+
+    async def fetchall(self):
+        return self._result
+
+
+class _FakePool:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def acquire(self):
+        pool = self
+
+        class _Connection:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def cursor(self):
+                return _Context()
+
+        class _Context:
+            async def __aenter__(self):
+                return pool._cursor
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Connection()
+
+
+def test_migration_tolerates_already_applied_steps():
+    # 1061: duplicate key name - the index exists from an interrupted earlier run
+    cursor = _FakeCursor(fail_with=Exception(1061, "Duplicate key name 'idx'"))
+    runner = MigrationRunner([Migration(1, "index", ["ALTER TABLE t ADD INDEX idx (a)"])], lock_name="test")
+    assert asyncio.run(runner.run(_FakePool(cursor))) == [1]
+    assert any(q.startswith("INSERT INTO schema_migrations") for q in cursor.executed)
+    assert cursor.executed[-1].startswith("SELECT RELEASE_LOCK")
+
+
+def test_migration_stops_on_real_errors():
+    cursor = _FakeCursor(fail_with=Exception(1146, "Table doesn't exist"))
+    runner = MigrationRunner([Migration(1, "index", ["ALTER TABLE t ADD INDEX idx (a)"])], lock_name="test")
+    with pytest.raises(Exception):
+        asyncio.run(runner.run(_FakePool(cursor)))
+    assert not any(q.startswith("INSERT INTO schema_migrations") for q in cursor.executed)
+    # The lock is released even though the migration failed
+    assert cursor.executed[-1].startswith("SELECT RELEASE_LOCK")
+
+
+def test_migration_versions_must_increase():
+    with pytest.raises(ValueError):
+        MigrationRunner([Migration(2, "b"), Migration(1, "a")], lock_name="test")
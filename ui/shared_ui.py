@@ -1,36 +1,27 @@
 # ui/shared_ui.py
 import discord
+import weakref
 from typing import List, Dict, Callable, Awaitable, Optional, Any 
 
+from utils.channel_index import channel_player_index
+
 async def search_channels_for_players_fallback(guild: discord.Guild, search_term: str) -> List[Dict]:
     """Fallback method to search channels for player data if DB fails or has no results."""
-    players = []
-    search_term_lower = search_term.lower()
-    for channel in guild.text_channels:
-        if not channel.permissions_for(guild.me).read_message_history:
-            continue
-        try:
-            async for message in channel.history(limit=100):
-                if "Name = " in message.content and "BohemiaUID = " in message.content:
-                    lines = message.content.replace(",", "\n").splitlines()
-                    for line_content in lines:
-                        parts = line_content.strip().split(" | ")
-                        player_data = {}
-                        for part in parts:
-                            if " = " in part:
-                                k, v = part.split(" = ", 1)
-                                player_data[k.strip()] = v.strip()
-                        
-                        if (all(k in player_data for k in ("Name", "Level", "Last Played", "BohemiaUID")) and
-                                search_term_lower in player_data["Name"].lower()):
-                            if not any(p["BohemiaUID"] == player_data["BohemiaUID"] for p in players):
-                                players.append(player_data)
-                            if len(players) >= 15: break
-            if len(players) >= 15: break
-        except (discord.Forbidden, discord.HTTPException) as e:
-            print(f"Warning: Could not search channel {channel.name} due to {e}")
-            continue
-    return players
+    await channel_player_index.refresh_guild(guild, search_term, limit=15)
+    return channel_player_index.search(guild, search_term, limit=15)
+
+
+class TrackedView(discord.ui.View):
+    """View counted by the live_views metric from creation until it stops or times out"""
+    _live: "weakref.WeakSet[TrackedView]" = weakref.WeakSet()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        TrackedView._live.add(self)
+
+    @classmethod
+    def live_count(cls) -> int:
+        return sum(1 for view in list(cls._live) if not view.is_finished())
 
 
 class PlayerSearchModal(discord.ui.Modal, title="Search for Player"):
@@ -61,7 +52,7 @@ class PlayerSearchModal(discord.ui.Modal, title="Search for Player"):
         await self.on_search_complete(interaction, players, search_val)
 
 
-class PlayerSearchView(discord.ui.View):
+class PlayerSearchView(TrackedView):
     def __init__(self,
                  players: List[Dict],
                  search_term: str,
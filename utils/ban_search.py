@@ -0,0 +1,71 @@
+# utils/ban_search.py
+import re
+from typing import List, Optional, Set, Tuple
+
+# Underscores split tokens too, so indexed tokens never contain a LIKE wildcard
+_TOKEN_SPLIT = re.compile(r"[\W_]+", re.UNICODE)
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 64
+# Query tokens beyond this are ignored; each one adds a self-join
+MAX_QUERY_TOKENS = 4
+
+FIELD_NAME = "n"
+FIELD_OFFENSE = "o"
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased word tokens of `text`, in order, without duplicates"""
+    seen: Set[str] = set()
+    tokens = []
+    for token in _TOKEN_SPLIT.split((text or "").lower()):
+        if len(token) >= MIN_TOKEN_LENGTH and token not in seen:
+            seen.add(token)
+            tokens.append(token[:MAX_TOKEN_LENGTH])
+    return tokens
+
+
+def index_rows(ban_id: int, player_name: str, offense: str) -> List[Tuple[str, int, str]]:
+    """(token, ban_id, field) rows for ban_search_tokens"""
+    rows = {(token, ban_id, FIELD_NAME) for token in tokenize(player_name)}
+    rows.update((token, ban_id, FIELD_OFFENSE) for token in tokenize(offense))
+    return sorted(rows)
+
+
+def normalize_ban_number(term: str) -> Optional[str]:
+    """'42' -> '0042', 'unban-1' -> 'UNBAN-0001'; None if `term` isn't a ban number"""
+    match = re.fullmatch(r"\s*(unban-?)?0*(\d{1,9})\s*", term, re.IGNORECASE)
+    if not match:
+        return None
+    number = int(match.group(2))
+    return f"UNBAN-{number:04d}" if match.group(1) else f"{number:04d}"
+
+
+def build_token_query(tokens: List[str], limit: int) -> Tuple[str, list]:
+    """Ranked ban IDs whose name/offense tokens start with every query token.
+
+    Each query token is a prefix range scan on the (token, ...) primary key; the
+    joins line them up on ban_id through idx_ban_token. Ranking: hits in the
+    player name first, then how many query tokens matched a whole word, then
+    newest first.
+    """
+    tokens = tokens[:MAX_QUERY_TOKENS]
+    joins, exact_terms, name_terms = [], [], []
+    params: list = []
+    for i, token in enumerate(tokens):
+        if i:
+            joins.append(f"JOIN ban_search_tokens t{i} ON t{i}.ban_id = t0.ban_id AND t{i}.token LIKE %s")
+            params.append(token + "%")
+        exact_terms.append(f"MAX(t{i}.token = %s)")
+        name_terms.append(f"MAX(t{i}.field = '{FIELD_NAME}')")
+    exact_params = list(tokens)
+    query = f"""
+        SELECT t0.ban_id, {' + '.join(name_terms)} AS name_hits, {' + '.join(exact_terms)} AS exact_hits
+        FROM ban_search_tokens t0
+        {' '.join(joins)}
+        WHERE t0.token LIKE %s
+        GROUP BY t0.ban_id
+        ORDER BY name_hits DESC, exact_hits DESC, t0.ban_id DESC
+        LIMIT %s
+    """
+    # Placeholders appear in SELECT (exact), then JOINs, then WHERE, then LIMIT
+    return query, exact_params + params + [tokens[0] + "%", limit]
@@ -0,0 +1,254 @@
+# utils/channel_index.py
+import asyncio
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Set
+
+import discord
+
+PLAYER_FIELDS = ("Name", "Level", "Last Played", "BohemiaUID")
+
+
+def parse_player_records(content: str) -> List[Dict]:
+    """Parse `Name = ... | Level = ... | Last Played = ... | BohemiaUID = ...` dumps."""
+    if "Name = " not in content or "BohemiaUID = " not in content:
+        return []
+    records = []
+    for line_content in content.replace(",", "\n").splitlines():
+        player_data = {}
+        for part in line_content.strip().split(" | "):
+            if " = " in part:
+                k, v = part.split(" = ", 1)
+                player_data[k.strip()] = v.strip()
+        if all(k in player_data for k in PLAYER_FIELDS):
+            records.append({k: player_data[k] for k in PLAYER_FIELDS})
+    return records
+
+
+class ChannelPlayerIndex:
+    """Player records parsed out of channel messages, kept per channel.
+
+    A channel is first read from its last `history_limit` messages. After that
+    its `last_message_id` watermark marks how far it has been read, and catching
+    up pages forward with `after=` until nothing is left, however many messages
+    arrived in between. The on_message / on_raw_message_edit listeners in
+    AdminCog feed new posts straight in, so for a channel the bot has been
+    watching no history request is needed at all. Live messages only advance
+    the watermark while the bot has stayed connected since the channel was last
+    read; after a disconnect (`connection_lost`) events may have been missed, so
+    the next search reads from the watermark again. The index is snapshotted to
+    disk so a restart only re-reads channels that moved.
+    """
+
+    def __init__(self, path: str = os.path.join("data", "channel_player_index.json"),
+                 history_limit: int = 100, max_messages_per_channel: int = 500):
+        self.path = path
+        self.history_limit = history_limit
+        self.max_messages_per_channel = max_messages_per_channel
+        # Channels read in parallel; history is a per-channel route, so this stays
+        # well inside the rate limits while cutting wall-clock time
+        self.concurrency = 4
+        self.channel_keywords: List[str] = []
+        self.category_keywords: List[str] = []
+        # channel_id -> {"last_message_id": int, "messages": {message_id: [record, ...]}}
+        self._channels: Dict[int, Dict] = {}
+        # Channels whose watermark has no gap behind it since the last disconnect
+        self._contiguous: Set[int] = set()
+        self._loaded = False
+        self._dirty = False
+        self._lock = asyncio.Lock()
+
+    def configure(self, channel_keywords: Iterable[str] = (), category_keywords: Iterable[str] = (),
+                  concurrency: Optional[int] = None):
+        """Restrict scanning to channels whose name, or category name, contains one of the keywords.
+
+        With both lists empty every readable text channel is scanned.
+        """
+        self.channel_keywords = [k.lower() for k in channel_keywords]
+        self.category_keywords = [k.lower() for k in category_keywords]
+        if concurrency:
+            self.concurrency = concurrency
+
+    def _is_allowed(self, channel: discord.TextChannel) -> bool:
+        if not self.channel_keywords and not self.category_keywords:
+            return True
+        name = channel.name.lower()
+        if any(k in name for k in self.channel_keywords):
+            return True
+        category = channel.category.name.lower() if channel.category else ""
+        return bool(category) and any(k in category for k in self.category_keywords)
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"⚠️ Ignoring unreadable channel player index {self.path}: {e}")
+            return
+        for channel_id, state in raw.items():
+            self._channels[int(channel_id)] = {
+                "last_message_id": state.get("last_message_id", 0),
+                "messages": {int(mid): records for mid, records in state.get("messages", {}).items()},
+            }
+
+    def _write(self, snapshot: Dict):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    async def _ensure_loaded(self):
+        if not self._loaded:
+            await asyncio.to_thread(self._load)
+            self._loaded = True
+
+    async def save(self):
+        """Persist the index if anything changed since the last save."""
+        if not self._dirty:
+            return
+        snapshot = {
+            str(cid): {"last_message_id": state["last_message_id"],
+                       "messages": {str(mid): recs for mid, recs in state["messages"].items()}}
+            for cid, state in self._channels.items()
+        }
+        self._dirty = False
+        try:
+            await asyncio.to_thread(self._write, snapshot)
+        except OSError as e:
+            self._dirty = True
+            print(f"⚠️ Could not save channel player index: {e}")
+
+    def connection_lost(self):
+        """Gateway events may have been missed: re-read every channel from its watermark on the next search."""
+        self._contiguous.clear()
+
+    def ingest_message(self, message: discord.Message):
+        """Index (or re-index, for edits) one message. Safe to call for any message."""
+        state = self._channels.get(message.channel.id)
+        if state is None:
+            # Channel not read yet; its first search will pick this message up from history
+            return
+        records = parse_player_records(message.content or "")
+        if records:
+            state["messages"][message.id] = records
+            self._trim(state)
+            self._dirty = True
+        elif state["messages"].pop(message.id, None) is not None:
+            self._dirty = True
+        if message.id > state["last_message_id"] and message.channel.id in self._contiguous:
+            state["last_message_id"] = message.id
+
+    def _trim(self, state: Dict):
+        """Keep only the newest player dumps of a channel so memory stays bounded."""
+        excess = len(state["messages"]) - self.max_messages_per_channel
+        if excess > 0:
+            for message_id in sorted(state["messages"])[:excess]:
+                del state["messages"][message_id]
+
+    async def _read_channel(self, channel: discord.TextChannel):
+        # Messages deleted since can leave last_message_id pointing past anything history returns;
+        # taken before reading so a message posted meanwhile is never skipped
+        target = channel.last_message_id or 0
+        state = self._channels.get(channel.id)
+        if state is None:
+            # First read: only the newest history_limit messages matter
+            state = {"last_message_id": 0, "messages": {}}
+            async for message in channel.history(limit=self.history_limit):
+                records = parse_player_records(message.content)
+                if records:
+                    state["messages"][message.id] = records
+                state["last_message_id"] = max(state["last_message_id"], message.id)
+            self._channels[channel.id] = state
+        else:
+            # Oldest first from the watermark, a page at a time, until a short page says we caught up
+            while True:
+                read = 0
+                after = discord.Object(id=state["last_message_id"])
+                async for message in channel.history(limit=self.history_limit, after=after, oldest_first=True):
+                    read += 1
+                    records = parse_player_records(message.content)
+                    if records:
+                        state["messages"][message.id] = records
+                    state["last_message_id"] = max(state["last_message_id"], message.id)
+                self._trim(state)
+                if read < self.history_limit:
+                    break
+        self._trim(state)
+        state["last_message_id"] = max(state["last_message_id"], target)
+        self._contiguous.add(channel.id)
+        self._dirty = True
+
+    def _is_stale(self, channel: discord.TextChannel) -> bool:
+        state = self._channels.get(channel.id)
+        if state is None:
+            return True
+        return bool(channel.last_message_id and channel.last_message_id > state["last_message_id"])
+
+    async def refresh_guild(self, guild: discord.Guild, search_term: Optional[str] = None, limit: int = 15):
+        """Read the channels that are new to the index or have unseen messages.
+
+        Up to `concurrency` channels are read at once. When `search_term` is given
+        the refresh stops as soon as `limit` unique matches are indexed and the
+        outstanding reads are cancelled; those channels simply stay stale until
+        the next search.
+        """
+        await self._ensure_loaded()
+        async with self._lock:
+            channels = [
+                c for c in guild.text_channels
+                if self._is_allowed(c) and c.permissions_for(guild.me).read_message_history and self._is_stale(c)
+            ]
+            if search_term is not None and len(self.search(guild, search_term, limit)) >= limit:
+                channels = []
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def read(channel: discord.TextChannel):
+                async with semaphore:
+                    try:
+                        await self._read_channel(channel)
+                    except (discord.Forbidden, discord.HTTPException) as e:
+                        print(f"Warning: Could not search channel {channel.name} due to {e}")
+
+            tasks = [asyncio.create_task(read(c)) for c in channels]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    await finished
+                    if search_term is not None and len(self.search(guild, search_term, limit)) >= limit:
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        await self.save()
+
+    def search(self, guild: discord.Guild, search_term: str, limit: int = 15) -> List[Dict]:
+        """In-memory name search over the indexed channels of `guild`, newest posts first."""
+        term = search_term.lower()
+        hits = []
+        for channel in guild.text_channels:
+            state = self._channels.get(channel.id)
+            if not state or not self._is_allowed(channel):
+                continue
+            for message_id, records in state["messages"].items():
+                for record in records:
+                    if term in record["Name"].lower():
+                        hits.append((message_id, record))
+
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        players, seen = [], set()
+        for _, record in hits:
+            if record["BohemiaUID"] in seen:
+                continue
+            seen.add(record["BohemiaUID"])
+            players.append(dict(record))
+            if len(players) >= limit:
+                break
+        return players
+
+
+# Create global instance
+channel_player_index = ChannelPlayerIndex()
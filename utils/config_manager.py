@@ -1,28 +1,244 @@
+# utils/config_manager.py
+"""
+Bot configuration (config.json), kept in memory.
+
+Commands read and change settings through `config_store` without touching the
+disk: a change updates the in-memory copy and schedules a save, and saves that
+land within `save_delay` of each other are folded into one write. Writes
+run on a worker thread and are atomic (temp file + fsync + rename), so a
+crash mid-write leaves the previous file intact.
+
+Settings live at the top level (shared by every server) and, optionally, in a
+per-guild namespace that overrides them:
+
+    {
+        "moderator_roles": [...],
+        "channels": {"pending_bans": ...},
+        "guilds": {"<guild id>": {"moderator_roles": [...], "channels": {...}}}
+    }
+
+The file is polled for outside edits (mtime/size) and reloaded on change, and
+listeners registered with `add_listener` are told about every change, local or
+reloaded. A file that cannot be parsed is never silently replaced: at startup
+it is moved aside to `config.json.corrupt-<timestamp>`, on reload the
+in-memory copy is kept until the file is fixed.
+"""
+import asyncio
+import copy
 import json
 import os
+import time
+from typing import Any, Callable, Dict, List, Optional
 
 CONFIG_FILE = 'config.json'
+GUILDS_KEY = "guilds"
+
+DEFAULT_CONFIG = {
+    "moderator_roles": [],
+    "channels": {
+        "pending_bans": None
+    }
+}
+
+
+class ConfigStore:
+    """In-memory config.json with debounced atomic saves, per-guild overrides and hot reload"""
+
+    def __init__(self, path: str = CONFIG_FILE, save_delay: float = 1.0, reload_interval: float = 5.0):
+        self.path = path
+        self.save_delay = save_delay
+        self.reload_interval = reload_interval
+        self._data: Dict[str, Any] = {}
+        self._listeners: List[Callable[[Optional[int]], None]] = []
+        self._dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._file_signature = None  # (mtime_ns, size) of the file as we last read or wrote it
+        self.saves = 0
+        self.reloads = 0
+
+    # --- Loading ---
+
+    def load(self):
+        """Read the file once at startup (synchronous; runs before the event loop is busy)."""
+        if not os.path.exists(self.path):
+            self._data = copy.deepcopy(DEFAULT_CONFIG)
+            self._write_file(self._serialize())
+            print(f"ℹ️ Created default {self.path}")
+            return
+        try:
+            self._data, self._file_signature = self._read_file()
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            backup = f"{self.path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+            os.replace(self.path, backup)
+            print(f"❌ {self.path} could not be parsed ({e}); moved it to {backup} and started from defaults. "
+                  f"Restore your settings from the backup.")
+            self._data = copy.deepcopy(DEFAULT_CONFIG)
+            self._write_file(self._serialize())
+
+    def _read_file(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            signature = self._stat_signature(os.fstat(f.fileno()))
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("top level is not a JSON object")
+        return data, signature
+
+    @staticmethod
+    def _stat_signature(stat):
+        return stat.st_mtime_ns, stat.st_size
+
+    # --- Reading ---
+
+    def get(self, key: str, default: Any = None, guild_id: Optional[int] = None) -> Any:
+        """A setting for `guild_id`, falling back to the shared top-level value.
+
+        Dict values (e.g. "channels") are merged key by key. Values are the live
+        in-memory objects: treat them as read-only and change them with `set`.
+        """
+        value = self._data.get(key, default)
+        if guild_id is None:
+            return value
+        guild = self._data.get(GUILDS_KEY, {}).get(str(guild_id))
+        if not guild or key not in guild:
+            return value
+        if isinstance(value, dict) and isinstance(guild[key], dict):
+            return {**value, **guild[key]}
+        return guild[key]
+
+    def has_guild_value(self, key: str, guild_id: int) -> bool:
+        """True if `guild_id` sets `key` itself instead of inheriting the shared value."""
+        return key in self._data.get(GUILDS_KEY, {}).get(str(guild_id), {})
+
+    def guild_ids(self) -> List[int]:
+        return [int(gid) for gid in self._data.get(GUILDS_KEY, {})]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._data)
+
+    # --- Writing ---
+
+    def set(self, key: str, value: Any, guild_id: Optional[int] = None):
+        """Change a setting (in a guild's namespace when `guild_id` is given) and schedule a save."""
+        if guild_id is None:
+            self._data[key] = value
+        else:
+            self._data.setdefault(GUILDS_KEY, {}).setdefault(str(guild_id), {})[key] = value
+        self._changed(guild_id)
+        self._schedule_save()
+
+    def add_listener(self, callback: Callable[[Optional[int]], None]):
+        """Call `callback(guild_id)` after every change; guild_id is None for shared settings and reloads."""
+        self._listeners.append(callback)
+
+    def _changed(self, guild_id: Optional[int]):
+        for callback in self._listeners:
+            try:
+                callback(guild_id)
+            except Exception as e:
+                print(f"❌ Config listener {getattr(callback, '__qualname__', callback)} failed: {e}")
+
+    def _serialize(self) -> str:
+        return json.dumps(self._data, indent=4)
+
+    def _write_file(self, text: str):
+        """Atomic replace: readers and crashes see either the old file or the new one, never half of each."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = os.path.join(directory, f".{os.path.basename(self.path)}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file_signature = self._stat_signature(os.stat(self.path))
+
+    def _schedule_save(self):
+        self._dirty = True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop yet (startup code): nothing else is running, write straight away
+            self._dirty = False
+            self._write_file(self._serialize())
+            return
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self):
+        # A set() that lands while flush() is writing finds this task still running and
+        # schedules nothing, so keep going until a flush leaves nothing behind
+        while True:
+            await asyncio.sleep(self.save_delay)
+            await self.flush()
+            if not self._dirty:
+                return
+
+    async def flush(self):
+        """Write pending changes now."""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            # Serialise on the loop so the worker thread never sees a dict mid-change
+            text = self._serialize()
+            try:
+                await asyncio.to_thread(self._write_file, text)
+                self.saves += 1
+            except OSError as e:
+                self._dirty = True
+                print(f"❌ Failed to save {self.path}: {e}")
+
+    # --- Hot reload ---
+
+    def start(self):
+        """Start polling the file for outside edits (no-op if running or disabled)."""
+        if self.reload_interval > 0 and (self._watch_task is None or self._watch_task.done()):
+            self._watch_task = asyncio.create_task(self._watch_loop())
+
+    async def _watch_loop(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await self.reload_if_changed()
+            except Exception as e:
+                print(f"❌ Config reload check failed: {e}")
+
+    async def reload_if_changed(self) -> bool:
+        """Reload the file if someone else changed it since we last read or wrote it."""
+        try:
+            signature = self._stat_signature(await asyncio.to_thread(os.stat, self.path))
+        except FileNotFoundError:
+            return False
+        if signature == self._file_signature:
+            return False
+        try:
+            data, signature = await asyncio.to_thread(self._read_file)
+        except (json.JSONDecodeError, UnicodeDecodeError, ValueError) as e:
+            # Probably an edit in progress; keep what we have and look again next time
+            self._file_signature = signature
+            print(f"⚠️ {self.path} changed but could not be parsed ({e}); keeping the current settings.")
+            return False
+        if self._dirty:
+            print(f"⚠️ {self.path} was edited while changes were waiting to be saved; the bot's changes win.")
+            self._file_signature = signature
+            return False
+        self._data, self._file_signature = data, signature
+        self.reloads += 1
+        print(f"🔄 Reloaded {self.path}")
+        self._changed(None)
+        return True
+
+    async def close(self):
+        """Stop watching and write anything still pending."""
+        if self._watch_task:
+            self._watch_task.cancel()
+            self._watch_task = None
+        if self._save_task and not self._save_task.done():
+            self._save_task.cancel()
+        await self.flush()
+
 
-def load_config():
-    """Loads the configuration from config.json. Creates a default file if it doesn't exist."""
-    if not os.path.exists(CONFIG_FILE):
-        default_config = {
-            "moderator_roles": [],
-            "channels": {
-                "pending_bans": None
-            }
-        }
-        save_config(default_config)
-        return default_config
-    
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, FileNotFoundError):
-        # In case of a corrupted file, create a new default one
-        return load_config() # Recursive call to create the default
-
-def save_config(data):
-    """Saves the configuration data to config.json."""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
\ No newline at end of file
+config_store = ConfigStore(reload_interval=float(os.getenv("CONFIG_RELOAD_SECONDS", 5)))
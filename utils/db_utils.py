@@ -1,9 +1,14 @@
 # utils/db_utils.py
 import os
+import asyncio
 import aiomysql
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+from utils.cache import TTLCache
+from utils.player_mirror import PlayerMirror
+from utils.metrics import instrument_pool
+
 class PlayerDatabaseConnection:
     def __init__(self):
         self.host = os.getenv("PLAYER_DB_HOST", "localhost")
@@ -12,25 +17,102 @@ class PlayerDatabaseConnection:
         self.password = os.getenv("PLAYER_DB_PASSWORD", "")
         self.database = os.getenv("PLAYER_DB_NAME", "game_database")
         self.pool = None
+        # 'fulltext' once an ngram FULLTEXT index on PlayerProfiles.Name is found, else 'like'
+        self.name_search_mode = "like"
+        self.ngram_token_size = 2
+        # Optional local copy of PlayerProfiles for instant lookups/autocomplete
+        self.mirror: Optional[PlayerMirror] = None
+        self.mirror_interval = float(os.getenv("PLAYER_MIRROR_INTERVAL", 60))
+        self._mirror_task: Optional[asyncio.Task] = None
+        # Autocomplete without the mirror: recent answers, plus the one database lookup in flight
+        self._autocomplete_cache = TTLCache(maxsize=256, ttl=30)
+        self._autocomplete_lookup: Optional[Tuple[str, asyncio.Task]] = None
         print(f"DEBUG: Player DB config: Host={self.host}, Port={self.port}, DB={self.database}")
 
     async def initialize(self):
         """Initialize the player database connection pool."""
         try:
-            self.pool = await aiomysql.create_pool(
+            self.pool = instrument_pool(await aiomysql.create_pool(
                 host=self.host, port=self.port, user=self.user,
                 password=self.password, db=self.database,
                 charset="utf8mb4", autocommit=True,
                 minsize=1, maxsize=5,
                 connect_timeout=10 # Added connection timeout
-            )
+            ), "player")
             print("✅ Player database connection pool established.")
         except Exception as e:
             print(f"❌ Player database connection failed: {e}")
             self.pool = None
+            return
+        await self._detect_name_index()
+
+        if os.getenv("PLAYER_MIRROR_ENABLED", "false").lower() == "true" and not self._mirror_task:
+            self.mirror = PlayerMirror(batch_size=int(os.getenv("PLAYER_MIRROR_BATCH", 5000)),
+                                       reload_interval=float(os.getenv("PLAYER_MIRROR_RELOAD_INTERVAL", 21600)))
+            self._mirror_task = asyncio.create_task(self._mirror_sync_loop())
+
+    async def _mirror_sync_loop(self):
+        """Keep the player mirror current; the first pass is the full load."""
+        while True:
+            try:
+                started = datetime.utcnow()
+                changed = await self.mirror.sync(self.pool)
+                if changed:
+                    elapsed = (datetime.utcnow() - started).total_seconds()
+                    print(f"✅ Player mirror synced {changed} row(s) in {elapsed:.1f}s ({len(self.mirror)} players cached).")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Player mirror sync failed: {e}")
+            await asyncio.sleep(self.mirror_interval)
+
+    async def _detect_name_index(self):
+        """Switch find_players to the FULLTEXT path if PlayerProfiles.Name has an ngram index.
+
+        The game database is treated as read-only, so the index is only created when
+        PLAYER_DB_CREATE_NAME_INDEX is enabled (and the DB user is allowed to ALTER).
+        MariaDB has no ngram parser; there the LIKE scan remains the search path.
+        """
+        try:
+            async with self.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    try:
+                        await cursor.execute("SELECT @@ngram_token_size")
+                        self.ngram_token_size = int((await cursor.fetchone())[0])
+                    except aiomysql.MySQLError:
+                        print("ℹ️ Player database has no ngram parser; using LIKE search for player names.")
+                        return
+
+                    has_index_query = """
+                        SELECT 1 FROM information_schema.STATISTICS
+                        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'PlayerProfiles'
+                        AND COLUMN_NAME = 'Name' AND INDEX_TYPE = 'FULLTEXT'
+                        LIMIT 1
+                    """
+                    await cursor.execute(has_index_query)
+                    has_index = bool(await cursor.fetchone())
+
+                    if not has_index and os.getenv("PLAYER_DB_CREATE_NAME_INDEX", "false").lower() == "true":
+                        print("Creating ngram FULLTEXT index on PlayerProfiles.Name (one-time)...")
+                        # The default stopword list would drop every ngram containing e.g. "a"
+                        await cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+                        await cursor.execute(
+                            "ALTER TABLE PlayerProfiles ADD FULLTEXT INDEX ft_name_ngram (Name) WITH PARSER ngram"
+                        )
+                        has_index = True
+        except aiomysql.MySQLError as e:
+            print(f"⚠️ Could not check/create player name index, using LIKE search: {e}")
+            return
+
+        if has_index:
+            self.name_search_mode = "fulltext"
+            print("✅ Player name search using FULLTEXT ngram index.")
 
     async def close(self):
         """Close the player database connection pool."""
+        if self._mirror_task:
+            self._mirror_task.cancel()
+            self._mirror_task = None
         if self.pool:
             self.pool.close()
             await self.pool.wait_closed()
@@ -39,44 +121,106 @@ class PlayerDatabaseConnection:
 
     async def find_players(self, search_term: str) -> List[Dict]:
         """Find players by name (partial match) - READ ONLY."""
+        if self.mirror and self.mirror.ready and len(search_term) >= PlayerMirror.MIN_TERM_LENGTH:
+            return [self._format_player(row) for row in self.mirror.search(search_term)]
         if not self.pool:
             print("⚠️ Player database not initialized or connection failed. Cannot search players.")
             return []
-        query = """
+        like_query = """
             SELECT Name, Level, LastPlayed, BohemiaUID
             FROM PlayerProfiles
             WHERE LOWER(Name) LIKE LOWER(%s)
             ORDER BY LastPlayed DESC
             LIMIT 15
         """
+        # MATCH narrows the candidates through the ngram index; the LIKE keeps the
+        # exact substring semantics of the scan above.
+        fulltext_query = """
+            SELECT Name, Level, LastPlayed, BohemiaUID
+            FROM PlayerProfiles
+            WHERE MATCH(Name) AGAINST (%s IN BOOLEAN MODE)
+            AND LOWER(Name) LIKE LOWER(%s)
+            ORDER BY LastPlayed DESC
+            LIMIT 15
+        """
+        like_pattern = f"%{search_term}%"
+        phrase = search_term.replace('"', '').strip()
+        use_fulltext = self.name_search_mode == "fulltext" and len(phrase) >= self.ngram_token_size
         try:
             async with self.pool.acquire() as connection:
                 async with connection.cursor(aiomysql.DictCursor) as cursor:
-                    await cursor.execute(query, (f"%{search_term}%",))
+                    if use_fulltext:
+                        try:
+                            await cursor.execute(fulltext_query, (f'"{phrase}"', like_pattern))
+                        except aiomysql.MySQLError as e:
+                            print(f"⚠️ FULLTEXT player search failed, falling back to LIKE: {e}")
+                            await cursor.execute(like_query, (like_pattern,))
+                    else:
+                        await cursor.execute(like_query, (like_pattern,))
                     rows = await cursor.fetchall()
             
-            players = []
-            for row in rows:
-                hours_since = 'Unknown'
-                if row.get("LastPlayed"): # Check if LastPlayed exists and is not None
-                    try:
-                        time_diff = datetime.utcnow() - row["LastPlayed"]
-                        hours_since = f"{int(time_diff.total_seconds() / 3600)}H"
-                    except TypeError: # Handle cases where LastPlayed might not be a datetime object
-                        hours_since = "Invalid Date"
-                else:
-                    hours_since = "Never"
-                    
-                players.append({
-                    "Name": row.get("Name", "N/A"),
-                    "Level": row.get("Level", 0),
-                    "Last Played": hours_since,
-                    "BohemiaUID": str(row.get("BohemiaUID", "N/A")),
-                })
-            return players
+            return [self._format_player(row) for row in rows]
         except aiomysql.MySQLError as e: # Catch specific MySQL errors
             print(f"❌ Player database SQL error in find_players: {e}")
             return []
         except Exception as e:
             print(f"❌ Unexpected error in find_players: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    async def autocomplete_players(self, search_term: str, limit: int = 25) -> List[Dict]:
+        """Player lookup for slash-command autocomplete.
+
+        Served from the mirror when it is loaded; the mirror needs at least three
+        characters, so shorter terms get no suggestions. Otherwise at most one
+        database search runs at a time: keystrokes arriving meanwhile reuse its result
+        instead of queueing more scans. A slow search is never cancelled (that
+        can hand a half-read connection back to the pool); the reply just gives
+        up after 2 seconds and the finished result is cached for the next keystroke.
+        """
+        term = search_term.lower()
+        if len(term) < 2:
+            return []
+        if self.mirror and self.mirror.ready:
+            return [self._format_player(row) for row in self.mirror.search(term, limit=limit)]
+
+        cached = self._autocomplete_cache.get(term)
+        if cached is not None:
+            return cached[:limit]
+        if self._autocomplete_lookup is None or self._autocomplete_lookup[1].done():
+            self._autocomplete_lookup = (term, asyncio.create_task(self._autocomplete_query(term)))
+        lookup_term, lookup = self._autocomplete_lookup
+        try:
+            players = await asyncio.wait_for(asyncio.shield(lookup), timeout=2.0)
+        except asyncio.TimeoutError:
+            return []
+        if lookup_term == term:
+            return players[:limit]
+        if lookup_term in term:
+            # A search for a shorter term: every name containing `term` also contains it
+            return [p for p in players if term in p["Name"].lower()][:limit]
+        return []
+
+    async def _autocomplete_query(self, term: str) -> List[Dict]:
+        players = await self.find_players(term)
+        self._autocomplete_cache.set(term, players)
+        return players
+
+    @staticmethod
+    def _format_player(row: Dict) -> Dict:
+        """Shape a PlayerProfiles row the way the search views expect it."""
+        hours_since = 'Unknown'
+        if row.get("LastPlayed"): # Check if LastPlayed exists and is not None
+            try:
+                time_diff = datetime.utcnow() - row["LastPlayed"]
+                hours_since = f"{int(time_diff.total_seconds() / 3600)}H"
+            except TypeError: # Handle cases where LastPlayed might not be a datetime object
+                hours_since = "Invalid Date"
+        else:
+            hours_since = "Never"
+
+        return {
+            "Name": row.get("Name", "N/A"),
+            "Level": row.get("Level", 0),
+            "Last Played": hours_since,
+            "BohemiaUID": str(row.get("BohemiaUID", "N/A")),
+        }
\ No newline at end of file
@@ -0,0 +1,92 @@
+# utils/form_state.py
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional
+
+
+class FormSession:
+    __slots__ = ("data", "expires_at")
+
+    def __init__(self, data: Dict[str, Any], expires_at: float):
+        self.data = data
+        self.expires_at = expires_at
+
+
+class FormStateStore(MutableMapping):
+    """Per-user ban form state with a TTL and an LRU size cap.
+
+    Behaves like the plain `{user_id: state_dict}` it replaces, so the cogs keep
+    using `store[user_id]["player"] = ...`. Every access pushes the session's
+    expiry out by `ttl`, matching the 300s view timeouts: a wizard that is still
+    being clicked through never expires, an abandoned one is dropped by the
+    sweeper (or on its next lookup) instead of living forever.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._sessions: "OrderedDict[int, FormSession]" = OrderedDict()
+        self._sweeper: Optional[asyncio.Task] = None
+        self.expired = 0
+        self.evicted = 0
+
+    def __getitem__(self, user_id: int) -> Dict[str, Any]:
+        session = self._sessions[user_id]
+        now = time.monotonic()
+        if session.expires_at <= now:
+            del self._sessions[user_id]
+            self.expired += 1
+            raise KeyError(user_id)
+        session.expires_at = now + self.ttl
+        self._sessions.move_to_end(user_id)
+        return session.data
+
+    def __setitem__(self, user_id: int, data: Dict[str, Any]):
+        self._sessions[user_id] = FormSession(data, time.monotonic() + self.ttl)
+        self._sessions.move_to_end(user_id)
+        while len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    def __delitem__(self, user_id: int):
+        del self._sessions[user_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def sweep(self) -> int:
+        """Drop every expired session. Returns how many were removed."""
+        now = time.monotonic()
+        stale = [uid for uid, session in self._sessions.items() if session.expires_at <= now]
+        for uid in stale:
+            del self._sessions[uid]
+        self.expired += len(stale)
+        return len(stale)
+
+    async def _sweep_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def start_sweeper(self, interval: float = 60.0):
+        """Start the periodic sweep on the running loop (no-op if already running)."""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_loop(interval))
+
+    def stop_sweeper(self):
+        if self._sweeper:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'live_sessions': len(self._sessions),
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'maxsize': self.maxsize,
+        }
@@ -0,0 +1,221 @@
+# utils/loop_watchdog.py
+"""
+Event-loop watchdog.
+
+Everything the bot does runs on one asyncio loop, so a single blocking call
+(a synchronous file write, a large embed build, a CPU-heavy loop) stalls every
+moderator's interaction at once - and Discord drops interactions that are not
+answered within 3 seconds.
+
+Two halves cooperate:
+
+* a heartbeat task on the loop wakes every `interval` seconds, stamps the time
+  and records how late it woke (the event_loop_lag_ms histogram);
+* a daemon thread checks that stamp. Once the loop has missed its beat by more
+  than `threshold`, the loop thread is by definition stuck inside one callback,
+  so the watchdog grabs that thread's stack with sys._current_frames() - the
+  equivalent of asyncio debug mode's "Executing <Task ...> took 0.3 seconds",
+  but naming the exact line and usable in production.
+
+When the loop comes back the heartbeat stamps the real stall duration on the
+captured sample. Samples are aggregated per blocking site (the innermost frame
+in the bot's own code) so /loopstalls can list the worst offenders.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.metrics import LAG_BUCKETS_MS, Metrics, metrics
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+_STACK_DEPTH = 12
+
+
+class LoopStall:
+    __slots__ = ("started_at", "duration_ms", "site", "callback", "stack")
+
+    def __init__(self, started_at: datetime, site: str, callback: Optional[str], stack: List[str]):
+        self.started_at = started_at
+        self.duration_ms: Optional[float] = None  # filled in once the loop runs again
+        self.site = site
+        self.callback = callback
+        self.stack = stack
+
+
+class StallSite:
+    """Aggregated stalls for one blocking line of code"""
+    __slots__ = ("site", "count", "total_ms", "max_ms", "worst")
+
+    def __init__(self, site: str):
+        self.site = site
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.worst: Optional[LoopStall] = None
+
+    def add(self, stall: LoopStall):
+        self.count += 1
+        self.total_ms += stall.duration_ms
+        if stall.duration_ms >= self.max_ms:
+            self.max_ms = stall.duration_ms
+            self.worst = stall
+
+
+def _is_project_frame(filename: str) -> bool:
+    return filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename
+
+
+def _short_path(filename: str) -> str:
+    return os.path.relpath(filename, _PROJECT_ROOT) if _is_project_frame(filename) else os.path.basename(filename)
+
+
+def _describe_stack(frame) -> Tuple[str, List[str], Optional[str]]:
+    """Blocking site, formatted stack and running asyncio callback of the loop thread's frame"""
+    summary = traceback.extract_stack(frame)
+    # Everything up to asyncio's Handle._run is the loop itself; the callback starts right after it
+    start, handle_frame = 0, None
+    walker = frame
+    while walker is not None:
+        if walker.f_code.co_filename.startswith(_ASYNCIO_DIR) and walker.f_code.co_name == "_run":
+            handle_frame = walker
+            break
+        walker = walker.f_back
+    for i, entry in enumerate(summary):
+        if entry.filename.startswith(_ASYNCIO_DIR) and entry.name == "_run":
+            start = i + 1
+    callback = None
+    if handle_frame is not None:
+        # Same "<Handle ...>" description asyncio debug mode logs for slow callbacks
+        callback = repr(handle_frame.f_locals.get("self"))[:200]
+    frames = summary[start:]
+    if not frames:
+        # Blocked inside a C-level callback (e.g. call_soon(time.sleep, ...)): the handle is all there is
+        return callback or "unknown", [], callback
+    site_frame = next((f for f in reversed(frames) if _is_project_frame(f.filename)), frames[-1])
+    site = f"{_short_path(site_frame.filename)}:{site_frame.lineno} in {site_frame.name}"
+    stack = [f"{_short_path(f.filename)}:{f.lineno} {f.name}" + (f": {f.line}" if f.line else "")
+             for f in frames[-_STACK_DEPTH:]]
+    return site, stack, callback
+
+
+class LoopWatchdog:
+    """Detects event-loop stalls from a side thread and records where the loop was stuck"""
+
+    def __init__(self, threshold: float = 0.25, interval: float = 0.1, max_sites: int = 50,
+                 recent_size: int = 20, registry: Optional[Metrics] = None):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_sites = max_sites
+        self.registry = registry or metrics
+        self.sites: Dict[str, StallSite] = {}
+        self.recent: Deque[LoopStall] = deque(maxlen=recent_size)
+        self._lock = threading.Lock()
+        self._pending: Optional[LoopStall] = None
+        self._beat = 0
+        self._last_beat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread (no-op if already running)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self._thread = None
+
+    async def _heartbeat_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.registry.observe("event_loop_lag_ms", lag * 1000, LAG_BUCKETS_MS)
+            with self._lock:
+                self._beat += 1
+                self._last_beat = time.monotonic()
+                stall, self._pending = self._pending, None
+            if stall is not None:
+                stall.duration_ms = max(lag * 1000, self.threshold * 1000)
+                self._record(stall)
+
+    def _watch(self):
+        check_every = max(0.01, self.threshold / 4)
+        captured_beat = -1
+        while not self._stop.wait(check_every):
+            with self._lock:
+                beat, overdue = self._beat, time.monotonic() - self._last_beat - self.interval
+            if overdue < self.threshold or beat == captured_beat:
+                continue
+            captured_beat = beat
+            stall = self._capture()
+            if stall is not None:
+                with self._lock:
+                    # The loop may have recovered while the stack was being read; only keep
+                    # the sample if it still belongs to the stall being measured
+                    if self._beat == beat:
+                        self._pending = stall
+
+    def _capture(self) -> Optional[LoopStall]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        site, stack, callback = _describe_stack(frame)
+        try:
+            current = asyncio.current_task(self._loop)
+            if current is not None:
+                coro = current.get_coro()
+                callback = f"Task {current.get_name()} ({getattr(coro, '__qualname__', coro)})"
+        except RuntimeError:
+            pass
+        return LoopStall(datetime.now(timezone.utc), site, callback, stack)
+
+    def _record(self, stall: LoopStall):
+        """Runs on the loop thread once the stall is over"""
+        self.recent.append(stall)
+        self.registry.inc("event_loop_stalls_total")
+        entry = self.sites.get(stall.site)
+        if entry is None:
+            if len(self.sites) >= self.max_sites:
+                # Forget the mildest site to make room
+                del self.sites[min(self.sites.values(), key=lambda s: s.max_ms).site]
+            entry = self.sites[stall.site] = StallSite(stall.site)
+        entry.add(stall)
+        print(f"⚠️ Event loop blocked for {stall.duration_ms:.0f}ms at {stall.site}"
+              + (f" ({stall.callback})" if stall.callback and stall.callback != stall.site else ""))
+
+    def worst_offenders(self, limit: int = 10) -> List[StallSite]:
+        return sorted(self.sites.values(), key=lambda s: s.max_ms, reverse=True)[:limit]
+
+    def clear(self):
+        self.sites.clear()
+        self.recent.clear()
+
+
+loop_watchdog = LoopWatchdog(threshold=float(os.getenv("LOOP_STALL_THRESHOLD_MS", 250)) / 1000)
+metrics.describe("event_loop_stalls_total", "Times the event loop was blocked for longer than the stall threshold")
@@ -0,0 +1,348 @@
+# utils/metrics.py
+import bisect
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """Fixed-bucket histogram: O(log buckets) to record, quantiles are bucket upper bounds."""
+    __slots__ = ("bounds", "counts", "total", "count", "max")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (max for the +Inf bucket)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+
+class Metrics:
+    """In-process counters, histograms and gauges for the bot's hot paths.
+
+    Everything is recorded from the event loop, so there is no locking. Gauges
+    are callbacks read at collection time (pool sizes, live sessions, ...).
+    Rendered by /botmetrics and, optionally, as Prometheus text on a local port.
+    """
+
+    def __init__(self, prefix: str = "koth"):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._bounds: Dict[str, Tuple[float, ...]] = {}
+        self._gauges: Dict[str, Callable[[], Dict[Labels, float]]] = {}
+        self._help: Dict[str, str] = {}
+
+    # --- recording ---
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        series = self._counters.setdefault(name, {})
+        key = _labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = _labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram(self._bounds.setdefault(name, buckets))
+        histogram.observe(value)
+
+    def gauge(self, name: str, read: Callable[[], object], label: Optional[str] = None, help_text: str = ""):
+        """Register a gauge read at collection time.
+
+        `read` returns a number, or with `label` a {label value: number} dict.
+        """
+        def collect() -> Dict[Labels, float]:
+            value = read()
+            if label is None:
+                return {(): value}
+            return {((label, str(key)),): v for key, v in value.items() if v is not None}
+        self._gauges[name] = collect
+        if help_text:
+            self._help[name] = help_text
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    # --- reading ---
+
+    def counter_value(self, name: str, **labels) -> float:
+        """Sum of a counter over every series matching `labels`"""
+        wanted = set(_labels(labels))
+        return sum(v for k, v in self._counters.get(name, {}).items() if wanted <= set(k))
+
+    def counter_series(self, name: str) -> Dict[Labels, float]:
+        return dict(self._counters.get(name, {}))
+
+    def histogram_series(self, name: str) -> Dict[Labels, Histogram]:
+        return dict(self._histograms.get(name, {}))
+
+    def gauge_values(self, name: str) -> Dict[Labels, float]:
+        collect = self._gauges.get(name)
+        if not collect:
+            return {}
+        try:
+            return collect()
+        except Exception as e:
+            print(f"⚠️ Metrics gauge {name} failed: {e}")
+            return {}
+
+    def merged(self, name: str, by: str) -> Dict[str, Histogram]:
+        """Histograms of `name` merged per value of label `by`"""
+        merged: Dict[str, Histogram] = {}
+        for key, histogram in self._histograms.get(name, {}).items():
+            group = dict(key).get(by, "")
+            target = merged.get(group)
+            if target is None:
+                target = merged[group] = Histogram(histogram.bounds)
+            for i, count in enumerate(histogram.counts):
+                target.counts[i] += count
+            target.total += histogram.total
+            target.count += histogram.count
+            target.max = max(target.max, histogram.max)
+        return merged
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        lines: List[str] = []
+
+        def fmt(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+            return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+        def header(name: str, kind: str):
+            full = f"{self.prefix}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} {kind}")
+            return full
+
+        for name, series in sorted(self._counters.items()):
+            full = header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{full}{fmt(labels)} {value:g}")
+        for name in sorted(self._gauges):
+            full = header(name, "gauge")
+            for labels, value in self.gauge_values(name).items():
+                lines.append(f"{full}{fmt(labels)} {float(value):g}")
+        for name, series in sorted(self._histograms.items()):
+            full = header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{full}_bucket{fmt(labels, (('le', le),))} {cumulative}")
+                lines.append(f"{full}_sum{fmt(labels)} {histogram.total:g}")
+                lines.append(f"{full}_count{fmt(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# --- database instrumentation ---
+
+_STATEMENT = re.compile(
+    r"^\s*(UPDATE)\s+`?(\w+)|^\s*(\w+)\b.*?\b(?:FROM|INTO|TABLE)\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@lru_cache(maxsize=512)
+def query_label(query: str) -> str:
+    """Low-cardinality label for a statement: verb plus first table, e.g. 'SELECT ban_history'"""
+    match = _STATEMENT.match(query)
+    if match:
+        verb, table = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        return f"{verb.upper()} {table}"
+    return query.split(None, 1)[0].upper() if query.strip() else "?"
+
+
+class InstrumentedCursor:
+    """Times execute/executemany and records row counts; everything else passes through"""
+
+    def __init__(self, cursor, db: str, registry: Metrics):
+        self._cursor, self._db, self._metrics = cursor, db, registry
+
+    async def _timed(self, method, query: str, args):
+        label = query_label(query)
+        started = time.perf_counter()
+        try:
+            result = await method(query, args)
+        except Exception:
+            self._metrics.inc("db_query_errors_total", db=self._db, query=label)
+            raise
+        finally:
+            self._metrics.observe("db_query_ms", (time.perf_counter() - started) * 1000, db=self._db, query=label)
+        rowcount = getattr(self._cursor, "rowcount", -1)
+        if rowcount is not None and rowcount >= 0:
+            self._metrics.observe("db_query_rows", rowcount, ROW_BUCKETS, db=self._db, query=label)
+        return result
+
+    async def execute(self, query: str, args=None):
+        return await self._timed(self._cursor.execute, query, args)
+
+    async def executemany(self, query: str, args):
+        return await self._timed(self._cursor.executemany, query, args)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    def __init__(self, connection, db: str, registry: Metrics):
+        self._connection, self._db, self._metrics = connection, db, registry
+
+    @asynccontextmanager
+    async def cursor(self, *args, **kwargs):
+        async with self._connection.cursor(*args, **kwargs) as cursor:
+            yield InstrumentedCursor(cursor, self._db, self._metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class InstrumentedPool:
+    """Wraps an aiomysql (or SQLite) pool: pool wait time, in-use connections, per-query timings"""
+
+    def __init__(self, pool, db: str, registry: Optional[Metrics] = None):
+        self._pool = pool
+        self._db = db
+        self._metrics = registry or metrics
+        self.in_use = 0
+
+    @asynccontextmanager
+    async def acquire(self):
+        started = time.perf_counter()
+        async with self._pool.acquire() as connection:
+            self._metrics.observe("db_pool_wait_ms", (time.perf_counter() - started) * 1000, db=self._db)
+            self.in_use += 1
+            try:
+                yield InstrumentedConnection(connection, self._db, self._metrics)
+            finally:
+                self.in_use -= 1
+
+    def __getattr__(self, name):
+        # close(), wait_closed(), size, freesize, maxsize, ...
+        return getattr(self._pool, name)
+
+
+def instrument_pool(pool, db: str):
+    """Wrap `pool` and register its connection gauges under db=<db>"""
+    wrapped = InstrumentedPool(pool, db)
+    pools[db] = wrapped
+    return wrapped
+
+
+# Instrumented pools by db label, read by the pool gauges
+pools: Dict[str, InstrumentedPool] = {}
+
+
+# --- Discord instrumentation ---
+
+class RateLimitLogHandler(logging.Handler):
+    """Counts the 429s discord.http logs; the library retries them internally, so they never raise"""
+
+    def __init__(self, registry: Metrics):
+        super().__init__(level=logging.WARNING)
+        self._metrics = registry
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if "429" in message or "rate limit" in message.lower():
+            scope = "global" if "global" in message.lower() else "route"
+            self._metrics.inc("discord_rate_limited_total", scope=scope)
+
+
+def instrument_http(http_client, registry: Optional[Metrics] = None):
+    """Count every REST request discord.py makes, by method and route template"""
+    registry = registry or metrics
+    if getattr(http_client, "_metrics_wrapped", False):
+        return
+    original = http_client.request
+
+    async def request(route, **kwargs):
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await original(route, **kwargs)
+        except Exception as e:
+            status = str(getattr(e, "status", type(e).__name__))
+            raise
+        finally:
+            registry.inc("discord_rest_requests_total", method=route.method, route=route.path, status=status)
+            registry.observe("discord_rest_ms", (time.perf_counter() - started) * 1000, method=route.method)
+
+    http_client.request = request
+    http_client._metrics_wrapped = True
+    logging.getLogger("discord.http").addHandler(RateLimitLogHandler(registry))
+
+
+def command_started(interaction) -> None:
+    interaction.extras["metrics_started"] = time.perf_counter()
+
+
+def command_finished(interaction, outcome: str, registry: Optional[Metrics] = None) -> None:
+    """Record one slash command's latency under its outcome ('ok', 'denied' or the error class)"""
+    registry = registry or metrics
+    started = interaction.extras.get("metrics_started")
+    if started is None:
+        return
+    name = interaction.command.qualified_name if interaction.command else "unknown"
+    registry.observe("command_ms", (time.perf_counter() - started) * 1000, command=name, outcome=outcome)
+
+
+def iter_top(series: Dict[str, Histogram], limit: int) -> Iterator[Tuple[str, Histogram]]:
+    """Busiest entries first"""
+    return iter(sorted(series.items(), key=lambda item: item[1].count, reverse=True)[:limit])
+
+
+metrics = Metrics()
+metrics.gauge("db_connections_in_use", lambda: {db: p.in_use for db, p in pools.items()}, label="db",
+              help_text="Pooled connections currently checked out")
+metrics.gauge("db_pool_size", lambda: {db: getattr(p._pool, "size", None) for db, p in pools.items()}, label="db",
+              help_text="Connections currently open in the pool")
+metrics.describe("command_ms", "Slash command latency by command and outcome")
+metrics.describe("db_query_ms", "Database statement latency by db and statement")
+metrics.describe("db_query_rows", "Rows returned or affected per statement")
+metrics.describe("db_pool_wait_ms", "Time spent waiting for a pooled connection")
+metrics.describe("db_query_errors_total", "Statements that raised")
+metrics.describe("discord_rest_requests_total", "Discord REST requests by method, route and status")
+metrics.describe("discord_rest_ms", "Discord REST request latency, including rate-limit waits")
+metrics.describe("discord_rate_limited_total", "429 responses logged by discord.http")
+metrics.describe("event_loop_lag_ms", "How late the event loop wakes a sleeping task")
@@ -0,0 +1,90 @@
+# utils/migrations.py
+from typing import Callable, List, Optional, Sequence, Set
+
+# MySQL/MariaDB errors that mean "this step already happened": duplicate
+# column, duplicate key name, can't DROP (index/column doesn't exist).
+# A migration interrupted halfway can therefore simply be run again.
+IDEMPOTENT_ERRORS = {1060, 1061, 1091}
+
+MYSQL_TABLE_OPTIONS = "ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci"
+
+
+class Migration:
+    """One schema version: a list of SQL statements, or a coroutine taking a cursor."""
+    __slots__ = ("version", "name", "statements", "apply")
+
+    def __init__(self, version: int, name: str, statements: Sequence[str] = (),
+                 apply: Optional[Callable] = None):
+        self.version = version
+        self.name = name
+        self.statements = list(statements)
+        self.apply = apply
+
+
+class MigrationRunner:
+    """Applies numbered migrations once each, recording them in `schema_migrations`.
+
+    A named lock (GET_LOCK) serialises runners, so two bot processes started
+    against the same database don't race on the same ALTER TABLE.
+    `table_options` is appended to the bookkeeping table's CREATE TABLE
+    (pass "" on SQLite).
+    """
+
+    def __init__(self, migrations: List[Migration], lock_name: str, table: str = "schema_migrations",
+                 table_options: str = MYSQL_TABLE_OPTIONS):
+        versions = [m.version for m in migrations]
+        if versions != sorted(set(versions)):
+            raise ValueError("Migration versions must be unique and increasing")
+        self.migrations = migrations
+        self.lock_name = lock_name
+        self.table = table
+        self.table_options = table_options
+
+    async def _applied_versions(self, cursor) -> Set[int]:
+        await cursor.execute(f"SELECT version FROM {self.table}")
+        return {row[0] for row in await cursor.fetchall()}
+
+    async def _execute(self, cursor, statement: str):
+        try:
+            await cursor.execute(statement)
+        except Exception as e:
+            code = e.args[0] if e.args else None
+            if code not in IDEMPOTENT_ERRORS:
+                raise
+            print(f"   ↪ already applied ({e.args[1] if len(e.args) > 1 else e})")
+
+    async def run(self, pool) -> List[int]:
+        """Apply every pending migration in order. Returns the versions applied."""
+        applied_now = []
+        async with pool.acquire() as connection:
+            async with connection.cursor() as cursor:
+                await cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    version INT PRIMARY KEY,
+                    name VARCHAR(100) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                ) {self.table_options}
+                """)
+                await cursor.execute("SELECT GET_LOCK(%s, 60)", (self.lock_name,))
+                if (await cursor.fetchone())[0] != 1:
+                    raise Exception(f"Timed out waiting for migration lock '{self.lock_name}'")
+                try:
+                    # Re-read under the lock; another process may have just finished
+                    applied = await self._applied_versions(cursor)
+                    for migration in self.migrations:
+                        if migration.version in applied:
+                            continue
+                        print(f"🔧 Applying migration {migration.version}: {migration.name}")
+                        for statement in migration.statements:
+                            await self._execute(cursor, statement)
+                        if migration.apply:
+                            await migration.apply(cursor)
+                        await cursor.execute(
+                            f"INSERT INTO {self.table} (version, name) VALUES (%s, %s)",
+                            (migration.version, migration.name)
+                        )
+                        applied_now.append(migration.version)
+                finally:
+                    await cursor.execute("SELECT RELEASE_LOCK(%s)", (self.lock_name,))
+                    await cursor.fetchone()
+        return applied_now
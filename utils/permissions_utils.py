@@ -1,23 +1,140 @@
 # utils/permissions_utils.py
+"""
+Moderator checks.
+
+The "moderator_roles" setting may list role IDs (int) and role names (str).
+Instead of rescanning the member's roles for every configured entry on each
+click, `permissions` compiles the setting once per guild into a frozenset of
+role IDs - names resolved against the guild's roles - so a check is one pass
+over the member's roles with set lookups.
+
+The compiled sets are dropped when the config changes (ConfigStore listener)
+and, for a single guild, when its roles are created, renamed or deleted
+(SetupCog forwards those events), since a rename can change what a configured
+name matches.
+
+Commands and buttons declare who may use them with `require(policy)`:
+
+    @app_commands.command(...)
+    @require(MODERATOR)
+    async def pendingbans_command(self, interaction): ...
+"""
+import functools
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
 import discord
-from typing import List, Union
 
-def is_moderator(interaction: discord.Interaction, moderator_roles_config: List[Union[str, int]]) -> bool:
-    """
-    Checks if the interacting user has one of the moderator roles.
-    moderator_roles_config can be a list of role names (str) or role IDs (int).
+DENIED_MESSAGE = "❌ You don't have permission."
+# Set in interaction.extras when require() turns an interaction away, so metrics can tell denials from errors
+DENIED_EXTRA = "permission_denied"
+
+
+class PermissionRegistry:
+    """Per-guild moderator role-ID sets, compiled from config and cached until invalidated"""
+
+    def __init__(self):
+        self._config = None
+        # guild id -> (configured role IDs, configured role names)
+        self._compiled: Dict[Optional[int], Tuple[FrozenSet[int], FrozenSet[str]]] = {}
+        # guild id -> every role ID that grants moderator, names included
+        self._role_ids: Dict[int, FrozenSet[int]] = {}
+
+    def bind(self, config_store):
+        """Read moderator roles from `config_store` and recompile whenever it changes."""
+        self._config = config_store
+        config_store.add_listener(self.invalidate)
+        self.invalidate()
+
+    def invalidate(self, guild_id: Optional[int] = None):
+        """Forget compiled sets for one guild, or for every guild when guild_id is None."""
+        if guild_id is None:
+            self._compiled.clear()
+            self._role_ids.clear()
+        else:
+            self._compiled.pop(guild_id, None)
+            self._role_ids.pop(guild_id, None)
+
+    def invalidate_roles(self, guild_id: int):
+        """A guild's roles changed: re-resolve configured names on the next check."""
+        self._role_ids.pop(guild_id, None)
+
+    def _compile(self, guild_id: Optional[int]) -> Tuple[FrozenSet[int], FrozenSet[str]]:
+        compiled = self._compiled.get(guild_id)
+        if compiled is None:
+            configured = self._config.get("moderator_roles", [], guild_id=guild_id) if self._config else []
+            compiled = (
+                frozenset(entry for entry in configured if isinstance(entry, int)),
+                frozenset(entry for entry in configured if isinstance(entry, str)),
+            )
+            self._compiled[guild_id] = compiled
+        return compiled
+
+    def moderator_role_ids(self, guild) -> FrozenSet[int]:
+        role_ids = self._role_ids.get(guild.id)
+        if role_ids is None:
+            ids, names = self._compile(guild.id)
+            if names:
+                # Names are matched case-sensitively, as they always were
+                ids = ids | frozenset(role.id for role in guild.roles if role.name in names)
+            role_ids = self._role_ids[guild.id] = ids
+        return role_ids
+
+    def is_moderator(self, interaction: discord.Interaction) -> bool:
+        """True if the interacting member holds one of the guild's moderator roles."""
+        guild = interaction.guild
+        if not guild:
+            return False
+        allowed = self.moderator_role_ids(guild)
+        if not allowed:
+            return False
+        # A plain User (e.g. in DMs) has no roles
+        return any(role.id in allowed for role in getattr(interaction.user, "roles", ()))
+
+
+permissions = PermissionRegistry()
+
+
+class Policy:
+    """A named rule deciding whether an interaction may run a command or press a button"""
+    __slots__ = ("name", "check")
+
+    def __init__(self, name: str, check: Callable[[discord.Interaction], bool]):
+        self.name = name
+        self.check = check
+
+    def __call__(self, interaction: discord.Interaction) -> bool:
+        return self.check(interaction)
+
+    def __or__(self, other: 'Policy') -> 'Policy':
+        return Policy(f"{self.name} or {other.name}", lambda interaction: self(interaction) or other(interaction))
+
+    def __repr__(self):
+        return f"<Policy {self.name}>"
+
+
+MODERATOR = Policy("moderator", lambda interaction: permissions.is_moderator(interaction))
+ADMINISTRATOR = Policy(
+    "administrator",
+    lambda interaction: bool(getattr(getattr(interaction.user, "guild_permissions", None), "administrator", False))
+)
+
+
+def require(policy: Policy, denied: str = DENIED_MESSAGE):
+    """Only run the decorated callback if `policy` allows the interaction; otherwise reply `denied` ephemerally.
+
+    Works on cog command callbacks and on View/Button callbacks - any method whose
+    first argument after self is the interaction. The signature is preserved, so
+    app_commands still sees the command's parameters.
     """
-    if not interaction.guild or not hasattr(interaction, 'user') or not hasattr(interaction.user, 'roles'):
-        # This case handles scenarios where interaction might not be fully formed,
-        # or user is not part of a guild (e.g., DM interaction if that were possible here).
-        return False
-
-    user_roles = interaction.user.roles
-    for config_role_identifier in moderator_roles_config:
-        if isinstance(config_role_identifier, str): # Check by name (case-sensitive)
-            if any(user_role.name == config_role_identifier for user_role in user_roles):
-                return True
-        elif isinstance(config_role_identifier, int): # Check by ID
-            if any(user_role.id == config_role_identifier for user_role in user_roles):
-                return True
-    return False
\ No newline at end of file
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            if not policy(interaction):
+                extras = getattr(interaction, "extras", None)
+                if extras is not None:
+                    extras[DENIED_EXTRA] = True
+                await interaction.response.send_message(denied, ephemeral=True)
+                return
+            return await func(self, interaction, *args, **kwargs)
+        return wrapper
+    return decorator
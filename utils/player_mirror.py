@@ -0,0 +1,180 @@
+# utils/player_mirror.py
+import heapq
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import aiomysql
+
+
+class _MirroredPlayer:
+    __slots__ = ("buid", "name", "name_lower", "level", "last_played")
+
+    def __init__(self, buid: str, name: str, level, last_played: Optional[datetime]):
+        self.buid = buid
+        self.name = name
+        self.name_lower = name.lower()
+        self.level = level
+        self.last_played = last_played
+
+    def as_row(self) -> Dict:
+        """Same shape as a PlayerProfiles row so callers can format it identically."""
+        return {"Name": self.name, "Level": self.level, "LastPlayed": self.last_played, "BohemiaUID": self.buid}
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class PlayerMirror:
+    """In-process copy of PlayerProfiles (Name, Level, LastPlayed, BohemiaUID).
+
+    Rows are pulled incrementally using a (LastPlayed, BohemiaUID) watermark, so
+    each sync only reads players who have played since the previous one. Reads
+    go in `batch_size` batches, each on its own pooled connection. Names
+    are indexed by lowercase trigram, which lets substring searches skip
+    straight to a small candidate set; terms shorter than a trigram are not
+    searched at all.
+
+    The watermark only sees rows whose LastPlayed moved forward, so players
+    added without ever playing and deleted players are missed by the
+    incremental sync. Every `reload_interval` seconds the whole table is
+    therefore read again into a fresh index that replaces the current one.
+    """
+
+    MIN_TERM_LENGTH = 3
+    _MIN_SORT_KEY = datetime.min
+
+    def __init__(self, batch_size: int = 5000, reload_interval: float = 6 * 3600):
+        self.batch_size = batch_size
+        self.reload_interval = reload_interval
+        self._players: Dict[str, _MirroredPlayer] = {}
+        self._trigram_index: Dict[str, Set[str]] = {}
+        self._watermark: Optional[Tuple[datetime, str]] = None
+        self._loaded_never_played = False
+        self._never_played_after = ""  # BohemiaUID keyset for the never-played rows
+        self.ready = False
+        self.last_sync: Optional[datetime] = None
+        self._loaded_at = 0.0  # monotonic time of the last full load
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def _upsert(self, row: Dict):
+        buid = str(row.get("BohemiaUID"))
+        name = row.get("Name") or ""
+        existing = self._players.get(buid)
+        if existing and existing.name_lower != name.lower():
+            for gram in _trigrams(existing.name_lower):
+                bucket = self._trigram_index.get(gram)
+                if bucket:
+                    bucket.discard(buid)
+                    if not bucket:
+                        del self._trigram_index[gram]
+            existing = None
+
+        if existing:
+            existing.name, existing.level, existing.last_played = name, row.get("Level", 0), row.get("LastPlayed")
+            return
+
+        player = _MirroredPlayer(buid, name, row.get("Level", 0), row.get("LastPlayed"))
+        self._players[buid] = player
+        for gram in _trigrams(player.name_lower):
+            self._trigram_index.setdefault(gram, set()).add(buid)
+
+    @staticmethod
+    async def _fetch_batch(pool, query: str, args: tuple) -> List[Dict]:
+        # One connection per batch: a full load of a large table must not pin a pooled connection throughout
+        async with pool.acquire() as connection:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, args)
+                return await cursor.fetchall()
+
+    async def sync(self, pool) -> int:
+        """Pull every player changed since the last sync. Returns the number of rows read."""
+        if self.ready and self.reload_interval and time.monotonic() - self._loaded_at >= self.reload_interval:
+            return await self.reload(pool)
+        never_played_query = """
+            SELECT Name, Level, LastPlayed, BohemiaUID FROM PlayerProfiles
+            WHERE LastPlayed IS NULL AND BohemiaUID > %s
+            ORDER BY BohemiaUID
+            LIMIT %s
+        """
+        first_batch_query = """
+            SELECT Name, Level, LastPlayed, BohemiaUID FROM PlayerProfiles
+            WHERE LastPlayed IS NOT NULL
+            ORDER BY LastPlayed, BohemiaUID
+            LIMIT %s
+        """
+        next_batch_query = """
+            SELECT Name, Level, LastPlayed, BohemiaUID FROM PlayerProfiles
+            WHERE LastPlayed > %s OR (LastPlayed = %s AND BohemiaUID > %s)
+            ORDER BY LastPlayed, BohemiaUID
+            LIMIT %s
+        """
+        total = 0
+        while not self._loaded_never_played:
+            rows = await self._fetch_batch(pool, never_played_query, (self._never_played_after, self.batch_size))
+            for row in rows:
+                self._upsert(row)
+            total += len(rows)
+            if rows:
+                self._never_played_after = rows[-1]["BohemiaUID"]
+            if len(rows) < self.batch_size:
+                self._loaded_never_played = True
+
+        while True:
+            if self._watermark is None:
+                rows = await self._fetch_batch(pool, first_batch_query, (self.batch_size,))
+            else:
+                last_played, buid = self._watermark
+                rows = await self._fetch_batch(pool, next_batch_query, (last_played, last_played, buid, self.batch_size))
+            for row in rows:
+                self._upsert(row)
+            total += len(rows)
+            if rows:
+                self._watermark = (rows[-1]["LastPlayed"], rows[-1]["BohemiaUID"])
+            if len(rows) < self.batch_size:
+                break
+
+        if not self.ready:
+            self._loaded_at = time.monotonic()
+        self.ready = True
+        self.last_sync = datetime.utcnow()
+        return total
+
+    async def reload(self, pool) -> int:
+        """Read the whole table into a fresh index and swap it in once complete.
+
+        Searches keep using the current index while the reload runs.
+        """
+        fresh = PlayerMirror(self.batch_size, self.reload_interval)
+        total = await fresh.sync(pool)
+        self._players, self._trigram_index = fresh._players, fresh._trigram_index
+        self._watermark, self._never_played_after = fresh._watermark, fresh._never_played_after
+        self._loaded_at, self.last_sync = fresh._loaded_at, fresh.last_sync
+        return total
+
+    def search(self, search_term: str, limit: int = 15) -> List[Dict]:
+        """Case-insensitive substring search, most recently played first.
+
+        Terms shorter than MIN_TERM_LENGTH return nothing: without a trigram to
+        look up they would scan every player on the event loop.
+        """
+        term = search_term.lower()
+        if len(term) < self.MIN_TERM_LENGTH:
+            return []
+
+        buckets = []
+        for gram in _trigrams(term):
+            bucket = self._trigram_index.get(gram)
+            if not bucket:
+                return []
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        candidate_ids = set(buckets[0]).intersection(*buckets[1:])
+        candidates = (self._players[buid] for buid in candidate_ids)
+
+        matches = (p for p in candidates if term in p.name_lower)
+        best = heapq.nlargest(limit, matches, key=lambda p: p.last_played or self._MIN_SORT_KEY)
+        return [p.as_row() for p in best]
@@ -0,0 +1,273 @@
+# utils/storage.py
+"""
+Storage backends for BanTracker.
+
+Both backends hand BanTracker the same thing: a pool whose `acquire()` yields a
+connection with `begin/commit/rollback` and async cursors (`execute`,
+`executemany`, `fetchone/fetchall/fetchmany`, `rowcount`, `lastrowid`). That
+is aiomysql's surface, so the MySQL backend is simply an aiomysql pool; the
+SQLite backend reproduces it over the standard library's sqlite3, run on one
+dedicated thread so the event loop never blocks on disk.
+
+BanTracker's SQL is written once, in MySQL syntax. SQLiteCursor rewrites the
+few constructs SQLite spells differently (placeholders, INSERT IGNORE,
+ON DUPLICATE KEY UPDATE, FOR UPDATE) and the connection registers the MySQL
+functions the queries rely on (GREATEST, LAST_INSERT_ID, GET_LOCK, ...).
+Table definitions are the exception: DDL is kept per backend.
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Optional, Sequence
+
+
+class MySQLBackend:
+    """aiomysql connection pool against a MySQL/MariaDB server"""
+    name = "mysql"
+
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 minsize: int = 1, maxsize: int = 10):
+        self.host, self.port, self.user, self.password, self.database = host, port, user, password, database
+        self.minsize, self.maxsize = minsize, maxsize
+
+    @property
+    def description(self) -> str:
+        return f"{self.host}/{self.database}"
+
+    async def create_pool(self):
+        # Imported here so an SQLite-only install doesn't need aiomysql
+        import aiomysql
+        return await aiomysql.create_pool(
+            host=self.host, port=self.port, user=self.user, password=self.password, db=self.database,
+            charset='utf8mb4', autocommit=True, minsize=self.minsize, maxsize=self.maxsize
+        )
+
+    @property
+    def dict_cursor(self):
+        import aiomysql
+        return aiomysql.DictCursor
+
+    @property
+    def stream_cursor(self):
+        import aiomysql
+        return aiomysql.SSCursor
+
+
+class SQLiteBackend:
+    """Embedded SQLite database file (WAL mode), for single-server installs and offline runs"""
+    name = "sqlite"
+    dict_cursor = "dict"
+    # sqlite3 cursors already step through results lazily
+    stream_cursor = None
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def description(self) -> str:
+        return self.path
+
+    async def create_pool(self) -> 'SQLitePool':
+        pool = SQLitePool(self.path)
+        await pool.open()
+        return pool
+
+
+# --- SQLite emulation of the aiomysql pool surface ---
+
+_PLACEHOLDER = re.compile(r"%(s|%)")
+_FOR_UPDATE = re.compile(r"\s+FOR\s+UPDATE\b", re.IGNORECASE)
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_ON_DUPLICATE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", re.IGNORECASE)
+_VALUES_REF = re.compile(r"\bVALUES\((\w+)\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def translate_mysql(query: str, has_args: bool) -> str:
+    """Rewrite the MySQL-only syntax BanTracker uses into SQLite syntax"""
+    if has_args:
+        # pymysql semantics: %s is a parameter and %% a literal %, but only when args are given
+        query = _PLACEHOLDER.sub(lambda m: "?" if m.group(1) == "s" else "%", query)
+    query = _FOR_UPDATE.sub("", query)
+    query = _INSERT_IGNORE.sub("INSERT OR IGNORE", query)
+    match = _ON_DUPLICATE.search(query)
+    if match:
+        assignments = _VALUES_REF.sub(r"excluded.\1", query[match.end():])
+        query = query[:match.start()] + "ON CONFLICT DO UPDATE SET" + assignments
+    return query
+
+
+def _adapt_datetime(value: datetime) -> str:
+    return value.isoformat(" ")
+
+
+def _convert_timestamp(value: bytes) -> datetime:
+    return datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value: bytes) -> date:
+    return date.fromisoformat(value.decode()[:10])
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+sqlite3.register_converter("DATE", _convert_date)
+
+
+def _greatest(*values):
+    # MySQL: NULL if any argument is NULL
+    if any(v is None for v in values):
+        return None
+    return max(values)
+
+
+def _regexp(pattern: str, value: Optional[str]) -> bool:
+    return value is not None and re.search(pattern, value) is not None
+
+
+class SQLiteCursor:
+    def __init__(self, connection: 'SQLiteConnection', as_dict: bool):
+        self._connection = connection
+        self._as_dict = as_dict
+        self._cursor: Optional[sqlite3.Cursor] = None
+        self.rowcount = -1
+        self.lastrowid: Optional[int] = None
+        self.description = None
+
+    def _row(self, row):
+        if row is None or not self._as_dict:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def _run(self, method: str, query: str, args):
+        state = self._connection.state
+        state.last_insert_id = None
+        self._cursor = self._connection.raw.cursor()
+        getattr(self._cursor, method)(translate_mysql(query, args is not None), args if args is not None else ())
+        self.rowcount = self._cursor.rowcount
+        # LAST_INSERT_ID(expr) in the statement overrides the rowid, as in MySQL
+        self.lastrowid = state.last_insert_id if state.last_insert_id is not None else self._cursor.lastrowid
+        self.description = self._cursor.description
+
+    async def execute(self, query: str, args: Optional[Sequence[Any]] = None):
+        await self._connection.run(self._run, "execute", query, tuple(args) if args is not None else None)
+
+    async def executemany(self, query: str, args: Sequence[Sequence[Any]]):
+        await self._connection.run(self._run, "executemany", query, [tuple(a) for a in args])
+
+    async def fetchone(self):
+        return self._row(await self._connection.run(self._cursor.fetchone))
+
+    async def fetchmany(self, size: int = 1):
+        return [self._row(r) for r in await self._connection.run(self._cursor.fetchmany, size)]
+
+    async def fetchall(self):
+        return [self._row(r) for r in await self._connection.run(self._cursor.fetchall)]
+
+    async def close(self):
+        if self._cursor is not None:
+            await self._connection.run(self._cursor.close)
+
+
+class SQLiteConnection:
+    def __init__(self, pool: 'SQLitePool'):
+        self._pool = pool
+
+    @property
+    def raw(self) -> sqlite3.Connection:
+        return self._pool.raw
+
+    @property
+    def state(self) -> threading.local:
+        return self._pool.state
+
+    def run(self, func, *args):
+        return self._pool.run(func, *args)
+
+    async def begin(self):
+        # IMMEDIATE takes the write lock up front, which is what FOR UPDATE gives on MySQL
+        await self.run(self.raw.execute, "BEGIN IMMEDIATE")
+
+    async def commit(self):
+        await self.run(self.raw.execute, "COMMIT")
+
+    async def rollback(self):
+        await self.run(self.raw.execute, "ROLLBACK")
+
+    @asynccontextmanager
+    async def cursor(self, kind=None):
+        cursor = SQLiteCursor(self, as_dict=kind == SQLiteBackend.dict_cursor)
+        try:
+            yield cursor
+        finally:
+            await cursor.close()
+
+
+class SQLitePool:
+    """One sqlite3 connection on one worker thread, lent out one caller at a time.
+
+    Serialising callers keeps transactions from interleaving on the shared
+    connection; with queries in the sub-millisecond range that costs nothing
+    next to a round trip to a remote server.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.raw: Optional[sqlite3.Connection] = None
+        self.state = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ban-sqlite")
+        self._lock = asyncio.Lock()
+
+    def run(self, func, *args):
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _connect(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        raw = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES,
+                              isolation_level=None, check_same_thread=False)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")
+        raw.execute("PRAGMA busy_timeout = 5000")
+
+        def last_insert_id(value):
+            self.state.last_insert_id = value
+            return value
+
+        raw.create_function("LAST_INSERT_ID", 1, last_insert_id)
+        raw.create_function("GREATEST", -1, _greatest, deterministic=True)
+        raw.create_function("REGEXP", 2, _regexp, deterministic=True)
+        # A single process owns the file, so named locks always succeed
+        raw.create_function("GET_LOCK", 2, lambda name, timeout: 1)
+        raw.create_function("RELEASE_LOCK", 1, lambda name: 1)
+        self.raw = raw
+
+    async def open(self):
+        await self.run(self._connect)
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self._lock:
+            connection = SQLiteConnection(self)
+            try:
+                yield connection
+            finally:
+                if self.raw is not None and self.raw.in_transaction:
+                    # A caller left a transaction open (e.g. it was cancelled mid-way)
+                    await self.run(self.raw.execute, "ROLLBACK")
+
+    def close(self):
+        if self.raw is not None:
+            self._executor.submit(self.raw.close)
+            self.raw = None
+
+    async def wait_closed(self):
+        await self.run(lambda: None)
+        self._executor.shutdown(wait=False)
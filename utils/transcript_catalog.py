@@ -0,0 +1,129 @@
+# utils/transcript_catalog.py
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+
+import discord
+
+
+class TranscriptEntry:
+    __slots__ = ("message_id", "number", "label", "jump_url")
+
+    def __init__(self, message_id: int, number: Optional[int], label: str, jump_url: str):
+        self.message_id = message_id
+        self.number = number
+        self.label = label
+        self.jump_url = jump_url
+
+    @property
+    def link(self) -> str:
+        return f"[{self.label}](<{self.jump_url}>)"
+
+
+def build_transcript_entry(message: discord.Message, channel_name: str) -> Optional[TranscriptEntry]:
+    """Turn a message with an .html attachment into a catalog entry (None otherwise)."""
+    for attachment in message.attachments:
+        if attachment.filename.endswith(".html"):
+            match = re.search(r"(\d+)", attachment.filename)
+            label = f"File: {attachment.filename[:80]}"
+            number = None
+            if match:
+                number = int(match.group(1))
+                label_prefix = "Ticket" if "ticket" in channel_name.lower() else "Report"
+                label = f"{label_prefix}-{number:04d}"
+            return TranscriptEntry(message.id, number, label, message.jump_url)
+    return None
+
+
+class TranscriptCatalog:
+    """Per-guild index of report/ticket transcripts, keyed by ticket/report number.
+
+    Each (guild, kind) pair is seeded once from the transcript channel's history;
+    after that the on_message listener in BanCog adds new uploads as they arrive,
+    so the transcript step never has to read channel history. A pair only counts
+    as seeded once the history read has finished; callers arriving during the
+    read wait for that same read instead of seeing a partial list.
+    """
+
+    def __init__(self, seed_limit: int = 200):
+        self.seed_limit = seed_limit
+        # (guild_id, kind) -> channel_id of the transcript channel, once seeded
+        self._channels: Dict[Tuple[int, str], int] = {}
+        # (guild_id, kind) -> (channel_id, seed task) while the history read is running
+        self._seeding: Dict[Tuple[int, str], Tuple[int, asyncio.Task]] = {}
+        # (guild_id, kind) -> {message_id: entry}
+        self._entries: Dict[Tuple[int, str], Dict[int, TranscriptEntry]] = {}
+        # (guild_id, kind) -> {number: entry}
+        self._by_number: Dict[Tuple[int, str], Dict[int, TranscriptEntry]] = {}
+
+    @staticmethod
+    def _find_channel(guild: discord.Guild, kind: str) -> Optional[discord.TextChannel]:
+        return next((c for c in guild.text_channels if kind.lower() in c.name.lower()), None)
+
+    def _add(self, key: Tuple[int, str], entry: TranscriptEntry):
+        self._entries.setdefault(key, {})[entry.message_id] = entry
+        if entry.number is not None:
+            numbers = self._by_number.setdefault(key, {})
+            existing = numbers.get(entry.number)
+            # Re-uploads of the same ticket: the newest message wins
+            if existing is None or existing.message_id < entry.message_id:
+                numbers[entry.number] = entry
+
+    async def seed(self, guild: discord.Guild, kind: str):
+        """Read the transcript channel for `kind` once; later calls are no-ops."""
+        key = (guild.id, kind)
+        if key in self._channels:
+            return
+        in_flight = self._seeding.get(key)
+        if in_flight is None:
+            channel = self._find_channel(guild, kind)
+            if not channel or not channel.permissions_for(guild.me).read_message_history:
+                return
+            in_flight = (channel.id, asyncio.create_task(self._read_history(key, channel)))
+            self._seeding[key] = in_flight
+        # Shielded: a caller giving up (e.g. a cancelled interaction) must not abort the shared read
+        await asyncio.shield(in_flight[1])
+
+    async def _read_history(self, key: Tuple[int, str], channel: discord.TextChannel):
+        try:
+            self._entries.setdefault(key, {})
+            async for message in channel.history(limit=self.seed_limit):
+                entry = build_transcript_entry(message, channel.name)
+                if entry:
+                    self._add(key, entry)
+            self._channels[key] = channel.id
+        except discord.Forbidden:
+            self._channels[key] = channel.id
+            print(f"No permission to read history in {channel.name}")
+        except Exception as e:
+            # Leave the pair unseeded so the next request retries
+            print(f"Error fetching transcripts from {channel.name}: {e}")
+        finally:
+            self._seeding.pop(key, None)
+
+    def ingest_message(self, message: discord.Message):
+        """Add a newly posted transcript if it landed in a catalogued channel."""
+        if not message.guild or not message.attachments:
+            return
+        for kind in ("report", "ticket"):
+            key = (message.guild.id, kind)
+            seeding = self._seeding.get(key)
+            if self._channels.get(key) == message.channel.id or (seeding and seeding[0] == message.channel.id):
+                entry = build_transcript_entry(message, message.channel.name)
+                if entry:
+                    self._add(key, entry)
+
+    async def get_links(self, guild: discord.Guild, kind: str, limit: int = 23) -> List[str]:
+        """Newest transcript links for `kind` as `[label](<url>)` markdown."""
+        await self.seed(guild, kind)
+        entries = self._entries.get((guild.id, kind), {})
+        newest = sorted(entries, reverse=True)[:limit]
+        return [entries[message_id].link for message_id in newest]
+
+    async def find_by_number(self, guild: discord.Guild, kind: str, number: int) -> Optional[TranscriptEntry]:
+        await self.seed(guild, kind)
+        return self._by_number.get((guild.id, kind), {}).get(number)
+
+
+# Create global instance
+transcript_catalog = TranscriptCatalog()